@@ -0,0 +1,246 @@
+"""
+Switch the test-mode status callbacks to a batched and/or gzipped transport.
+
+Modes:
+  gzip           keep one POST per callback node, gzip the JSON body
+  batched        replace Send Test Callback with one "Send Final Status" POST
+                 carrying audit, content and scoring together
+  batched-gzip   both
+
+Applies to the nodes created by transform_workflow.py (Send Test Callback)
+and fix_nodes.py (Send Test Result). Send Failure Callback is left alone:
+its payload is a few hundred bytes and gains nothing from compression.
+
+gzip needs zlib in the Code node sandbox: NODE_FUNCTION_ALLOW_BUILTIN=zlib
+on the n8n instance. /api/test-callback accepts Content-Encoding: gzip.
+
+Usage:
+  python apply_callback_transport.py "DEV Skywide  Content (23).json" --mode batched-gzip
+"""
+import argparse
+import json
+import sys
+
+from n8n_utils import CODE_TYPE, gen_id, load_workflow, node_index, save_workflow
+
+CALLBACK_URL = "https://skywide-content-flow.vercel.app/api/test-callback"
+MODES = ("gzip", "batched", "batched-gzip")
+
+SCORING_NODES = [
+    "2nd Scoring Agent2", "2nd Scoring Agent3",
+    "1st Scoring Agent2", "1st Scoring Agent3",
+    "Scoring7", "Scoring1",
+]
+
+SEND_JS = r"""
+// === Send (transport: __MODE__) ===
+const COMPRESS = __COMPRESS__;
+const json = JSON.stringify(payload);
+const rawBytes = Buffer.byteLength(json, 'utf-8');
+const headers = { 'Content-Type': 'application/json' };
+let body = json;
+if (COMPRESS) {
+    const zlib = require('zlib');
+    body = zlib.gzipSync(Buffer.from(json, 'utf-8'));
+    headers['Content-Encoding'] = 'gzip';
+}
+const sentBytes = COMPRESS ? body.length : rawBytes;
+console.log(`Callback payload: ${rawBytes} bytes raw, ${sentBytes} bytes sent`);
+
+try {
+    const response = await this.helpers.httpRequest({
+        method: 'POST',
+        url: '__URL__',
+        body,
+        headers,
+        json: false,
+        timeout: 10000
+    });
+    const result = {
+        success: true,
+__EXTRA__        raw_bytes: rawBytes,
+        sent_bytes: sentBytes,
+        api_response: response
+    };
+    return __RETURN__;
+} catch (error) {
+    console.error('Callback failed:', error.message);
+    if (error.response) {
+        console.error('Response data:', JSON.stringify(error.response.data));
+        console.error('Response status:', error.response.status);
+    }
+    throw error;
+}
+"""
+
+# Return fields fix_nodes.py's Send Test Result reported before the transport change
+SEND_TEST_RESULT_FIELDS = """        content_length: articleContent.length,
+        word_count: wordCount,
+        overall_score: auditData.overallScore,
+        scoring_source: scoringData ? 'real' : 'fallback',
+"""
+
+FINAL_STATUS_JS = r"""
+// === Coalesce audit, content and scoring into one final status ===
+const webhook = $('Webhook1').first().json.body;
+
+let audit = {};
+try {
+    const raw = $('Test Quality Audit').first().json.message?.content;
+    audit = typeof raw === 'string' ? JSON.parse(raw) : (raw || {});
+} catch (e) { console.log('Audit parse failed', e.message); }
+
+let content = '';
+try {
+    content = $('Capture Test Content').first().json.article_content || '';
+} catch (e) {}
+
+let scoring = null;
+for (const name of __SCORING_NODES__) {
+    try {
+        const raw = $(name).first().json.message?.content;
+        const parsed = typeof raw === 'string' ? JSON.parse(raw) : raw;
+        if (parsed?.overallScore !== undefined) { scoring = parsed; break; }
+    } catch (e) {}
+}
+
+const payload = {
+    request_id: webhook.request_id,
+    status: 'completed',
+    audit_data: audit,
+    content_markdown: content,
+    ...(scoring && { scoring })
+};
+"""
+
+
+def send_js(mode, extra="", per_item=False):
+    """The shared send block; per_item nodes return one item instead of a list."""
+    return (SEND_JS.replace("__MODE__", mode)
+            .replace("__COMPRESS__", "true" if mode.endswith("gzip") else "false")
+            .replace("__URL__", CALLBACK_URL)
+            .replace("__EXTRA__", extra)
+            .replace("__RETURN__", "{ json: result }" if per_item else "[{ json: result }]"))
+
+
+def field_to_js(value):
+    """JS for one HTTP body parameter, or None if it can't be converted as-is.
+
+    Literals become JSON strings and "={{ expr }}" becomes expr. Templates
+    mixing text and expressions ("=Score: {{ x }}") are refused: n8n renders
+    those with its own stringification, which plain JS would not reproduce.
+    """
+    if not isinstance(value, str) or not value.startswith("="):
+        return json.dumps(value, ensure_ascii=False)
+    expr = value[1:].strip()
+    if not (expr.startswith("{{") and expr.endswith("}}")):
+        return None
+    expr = expr[2:-2].strip()
+    if not expr or "{{" in expr or "}}" in expr:
+        return None
+    return expr
+
+
+def gzip_send_test_result(node, mode):
+    """Make fix_nodes.py's Send Test Result post through the gzip transport."""
+    code = node["parameters"]["jsCode"]
+    previous = code.find("// === Send (transport:")
+    if previous != -1:
+        start = code.rfind("const payload = {", 0, previous)
+    else:
+        start = code.find("try {\n    const response = await this.helpers.httpRequest(")
+    if start == -1:
+        print("  ! Send Test Result: unrecognised jsCode, left unchanged")
+        return False
+    payload = """const payload = {
+    request_id: requestId,
+    status: 'completed',
+    audit_data: auditData,
+    content_markdown: articleContent
+};
+"""
+    node["parameters"]["jsCode"] = code[:start] + payload + send_js(mode, SEND_TEST_RESULT_FIELDS)
+    return True
+
+
+def batch_send_test_callback(wf, node, mode):
+    """Replace the Send Test Callback HTTP node with a Send Final Status Code node."""
+    node.update({
+        "parameters": {"jsCode": FINAL_STATUS_JS.replace("__SCORING_NODES__", repr(SCORING_NODES)) + send_js(mode)},
+        "type": CODE_TYPE,
+        "typeVersion": 2,
+        "notesInFlow": True,
+        "notes": f"Final status callback ({mode})",
+    })
+    node.pop("credentials", None)
+    old_name, node["name"] = node["name"], "Send Final Status"
+    connections = wf["connections"]
+    if old_name in connections:
+        connections[node["name"]] = connections.pop(old_name)
+    for outputs in connections.values():
+        for targets in outputs.get("main") or []:
+            for t in targets or []:
+                if t["node"] == old_name:
+                    t["node"] = node["name"]
+
+
+def gzip_send_test_callback(node, mode):
+    """Keep Send Test Callback's fields but post them gzipped from a Code node.
+
+    The HTTP node runs once per item and its fields use .item, so the Code
+    node runs once for each item too.
+    """
+    fields = node["parameters"]["bodyParameters"]["parameters"]
+    entries = []
+    for field in fields:
+        expr = field_to_js(field["value"])
+        if expr is None:
+            print(f"  ! Send Test Callback: {field['name']} is not a single {{{{ }}}} expression, left unchanged")
+            return False
+        entries.append(f"    {json.dumps(field['name'])}: {expr}")
+    payload = "const payload = {\n" + ",\n".join(entries) + "\n};\n"
+    node.update({
+        "parameters": {"mode": "runOnceForEachItem", "jsCode": payload + send_js(mode, per_item=True)},
+        "type": CODE_TYPE,
+        "typeVersion": 2,
+        "id": node.get("id") or gen_id(),
+    })
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workflow")
+    parser.add_argument("--mode", choices=MODES, default="batched-gzip")
+    parser.add_argument("-o", "--output", help="Output path (default: overwrite input)")
+    args = parser.parse_args()
+
+    wf = load_workflow(args.workflow)
+    by_name = node_index(wf)
+    changed = 0
+
+    if "Send Test Result" in by_name:
+        if gzip_send_test_result(by_name["Send Test Result"], args.mode):
+            print(f"  ~ Send Test Result -> {args.mode} transport")
+            changed += 1
+
+    if "Send Test Callback" in by_name:
+        node = by_name["Send Test Callback"]
+        if args.mode.startswith("batched"):
+            batch_send_test_callback(wf, node, args.mode)
+            print(f"  ~ Send Test Callback -> Send Final Status ({args.mode})")
+            changed += 1
+        elif gzip_send_test_callback(node, args.mode):
+            print(f"  ~ Send Test Callback -> {args.mode} transport")
+            changed += 1
+
+    if not changed:
+        print("WARNING: No test callback nodes found. Run transform_workflow.py / fix_nodes.py first.")
+        sys.exit(0)
+
+    save_workflow(wf, args.output or args.workflow)
+    print(f"\n✅ Updated {changed} callback node(s). Re-import into n8n.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Route the Perplexity fact checkers through fact_claim_cache.py.
+
+Run after inject_fact_checkers.py. Adds HTTP Request nodes posting
+{"client", "text"} to <service>/fact-check:
+
+  Pre-Draft Claim Cache    replaces the Pre-Draft Fact Checker. Its only
+                           output is the report, so the brief's claims go to
+                           sonar-pro only when unseen or expired; Keyword
+                           Strategist (and --parallel draft prompts) read
+                           `report` where they read the checker's answer
+  Post-Draft Claim Cache   runs in front of the Post-Draft Fact Checker with
+                           brief + draft. The checker still receives the
+                           draft, because it returns the corrected article,
+                           but its report slot now holds the cached verdicts
+                           for every claim, so it only searches the ones
+                           marked NOT CHECKED
+
+The service fails the node when it is unreachable, like the checkers did.
+
+Usage:
+  python fact_claim_cache.py serve --host 0.0.0.0
+  python apply_claim_cache.py "TEST Skywide Content (Prompt Review).json" --service http://host.docker.internal:8788
+"""
+import argparse
+import sys
+import urllib.parse
+
+from n8n_utils import HTTP_TYPE, gen_id, load_workflow, node_index, save_workflow
+
+DEFAULT_SERVICE = "http://localhost:8788"
+PRE_DRAFT_NAME = "Pre-Draft Fact Checker"
+POST_DRAFT_NAME = "Post-Draft Fact Checker"
+PRE_CACHE_NAME = "Pre-Draft Claim Cache"
+POST_CACHE_NAME = "Post-Draft Claim Cache"
+
+CLIENT_EXPR = "$('Webhook1').first().json.body.client_name"
+BRIEF_EXPR = "$('Webhook1').first().json.body.creative_brief"
+DRAFT_EXPR = ("($('Data Check & Research Gaps1').item.json.message?.content || "
+              "$('Data Check & Research Gaps1').item.json.choices?.[0]?.message?.content || "
+              "$('Data Check & Research Gaps1').item.json.text || '')")
+
+PRE_DRAFT_SLOT = ("PRE-DRAFT FACT CHECKER REPORT (treat claims listed here as ground truth):\n"
+                  "{{ $('Keyword Strategist').first().json.fact_check_report }}")
+POST_DRAFT_SLOT = ("CLAIM CACHE REPORT (verdicts for the claims in the brief and draft; treat them as ground "
+                   "truth and only search the web for claims marked NOT CHECKED):\n"
+                   f"{{{{ $('{POST_CACHE_NAME}').first().json.report }}}}")
+
+
+def cache_node(name, service, text_expr, position):
+    return {
+        "parameters": {
+            "method": "POST",
+            "url": f"{service}/fact-check",
+            "sendBody": True,
+            "specifyBody": "json",
+            "jsonBody": f"={{{{ JSON.stringify({{ client: {CLIENT_EXPR}, text: {text_expr} }}) }}}}",
+            "options": {"timeout": 600000},
+        },
+        "type": HTTP_TYPE,
+        "typeVersion": 4.2,
+        "position": [position[0], position[1] - 160],
+        "id": gen_id(),
+        "name": name,
+        "notesInFlow": True,
+        "notes": "Claim-level fact-check cache (fact_claim_cache.py serve)",
+    }
+
+
+def retarget_readers(wf, old, new):
+    """Point reads of the checker's answer at the cache's `report`; returns the nodes changed."""
+    changed = []
+    for node in wf["nodes"]:
+        params = node.get("parameters", {})
+        for key, value in params.items():
+            if key == "jsCode" and f"$('{old}')" in value:
+                # Keyword Strategist: raw = $('<checker>').first().json; raw.message?.content || ...
+                params[key] = value.replace("= raw.message?.content ||", "= raw.report || raw.message?.content ||") \
+                                   .replace(f"$('{old}')", f"$('{new}')")
+                changed.append(node["name"])
+        for message in (params.get("messages") or {}).get("values", []):
+            if f"$('{old}')" in message.get("content", ""):
+                # --parallel draft prompts: the checker's message?.content || choices?.[0]... chain
+                message["content"] = message["content"] \
+                    .replace(f"$('{old}').first().json.message?.content", f"$('{new}').first().json.report") \
+                    .replace(f"$('{old}')", f"$('{new}')")
+                changed.append(node["name"])
+    return changed
+
+
+def replace_pre_draft(wf, service):
+    """Swap the Pre-Draft Fact Checker for the cache node, keeping its edges."""
+    checker = node_index(wf)[PRE_DRAFT_NAME]
+    wf["nodes"].remove(checker)
+    wf["nodes"].append(cache_node(PRE_CACHE_NAME, service, BRIEF_EXPR, checker["position"]))
+    conns = wf["connections"]
+    conns[PRE_CACHE_NAME] = conns.pop(PRE_DRAFT_NAME, {"main": [[]]})
+    for outputs in conns.values():
+        for targets in outputs.get("main") or []:
+            for t in targets or []:
+                if t["node"] == PRE_DRAFT_NAME:
+                    t["node"] = PRE_CACHE_NAME
+    return retarget_readers(wf, PRE_DRAFT_NAME, PRE_CACHE_NAME)
+
+
+def front_post_draft(wf, service):
+    """Put the cache node between the checker's inputs and the checker, and fill its report slot."""
+    checker = node_index(wf)[POST_DRAFT_NAME]
+    message = checker["parameters"]["messages"]["message"][-1]
+    if PRE_DRAFT_SLOT not in message["content"]:
+        raise ValueError(f"{POST_DRAFT_NAME} has no pre-draft report slot; re-run inject_fact_checkers.py")
+    text_expr = f"{BRIEF_EXPR} + '\\n\\n' + {DRAFT_EXPR}"
+    wf["nodes"].append(cache_node(POST_CACHE_NAME, service, text_expr, checker["position"]))
+    conns = wf["connections"]
+    for outputs in conns.values():
+        for targets in outputs.get("main") or []:
+            for t in targets or []:
+                if t["node"] == POST_DRAFT_NAME:
+                    t["node"] = POST_CACHE_NAME
+    conns[POST_CACHE_NAME] = {"main": [[{"node": POST_DRAFT_NAME, "type": "main", "index": 0}]]}
+    message["content"] = message["content"].replace(PRE_DRAFT_SLOT, POST_DRAFT_SLOT)
+
+
+def apply(wf, service=DEFAULT_SERVICE):
+    """Returns the changes made; cache nodes already in the workflow are left alone."""
+    service = service.rstrip("/")
+    by_name = node_index(wf)
+    changes = []
+    if PRE_DRAFT_NAME in by_name and PRE_CACHE_NAME not in by_name:
+        readers = replace_pre_draft(wf, service)
+        changes.append(f"{PRE_DRAFT_NAME} -> {PRE_CACHE_NAME} (read by {', '.join(readers) or 'nothing'})")
+    if POST_DRAFT_NAME in by_name and POST_CACHE_NAME not in by_name:
+        front_post_draft(wf, service)
+        changes.append(f"{POST_CACHE_NAME} in front of {POST_DRAFT_NAME}")
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workflow")
+    parser.add_argument("-o", "--output", help="Output path (default: overwrite input)")
+    parser.add_argument("--service", default=DEFAULT_SERVICE, help="Claim cache URL as seen from the n8n instance")
+    args = parser.parse_args()
+
+    wf = load_workflow(args.workflow)
+    by_name = node_index(wf)
+    if PRE_DRAFT_NAME not in by_name and POST_DRAFT_NAME not in by_name:
+        print("❌ No fact checkers in the workflow. Run inject_fact_checkers.py first.")
+        sys.exit(1)
+    try:
+        changes = apply(wf, args.service)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if not changes:
+        print("WARNING: Fact checkers already go through the claim cache. Skipping.")
+        sys.exit(0)
+    for change in changes:
+        print(f"  ~ {change}")
+
+    save_workflow(wf, args.output or args.workflow)
+    print(f"\n✅ {len(changes)} fact checker(s) routed through {args.service.rstrip('/')}/fact-check")
+    if urllib.parse.urlparse(args.service).hostname not in ("localhost", "127.0.0.1"):
+        print("WARNING: the claim cache binds 127.0.0.1 by default; pass serve --host <interface n8n can reach>")
+
+
+if __name__ == "__main__":
+    main()
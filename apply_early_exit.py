@@ -0,0 +1,169 @@
+"""
+Apply early-exit thresholds from score_iterations.py to the improvement loops.
+
+For each Check Max Iterations IF found by score_iterations.improvement_loops:
+  - the $runIndex counter Set (Max Iterations2/3) also records the score it
+    was reached with (`score`)
+  - the Check IF gets two more OR conditions next to `runs >= 4`:
+      early_exit_plateau  the last in-loop improvement pass gained
+                          < min_gain points (never on the first check, so
+                          a flat 1st Improvement LLM pass is not cut)
+      early_exit_gap      target - score > reach_gain x remaining runs,
+                          i.e. the target is out of reach even at the
+                          optimistic per-iteration gain
+
+An early exit leaves through the same true output as hitting the iteration
+cap. In PROD v23 that output of Check Max Iterations2/3 is not connected:
+the article's path ENDS there, with no Google Doc and no Signal Completion.
+Today only articles that use up all their runs end that way; with early exit
+every article the rules stop does too. So a loop whose true output is empty
+is refused: connect that output first, or pass --allow-dead-end to accept
+that early exits end the article there.
+
+Thresholds must come from data: a loop is only edited when its model entry
+has "source": "data" (enough looped articles in score_iterations.py), or
+when both --min-gain and --reach-gain are given (--reach-gain alone with
+--no-plateau). Targets and the run cap are read from the workflow being
+edited. Running it again replaces the conditions instead of stacking them.
+
+Usage:
+  python score_iterations.py exports/*.json -o iteration_model.json
+  python apply_early_exit.py "PROD Skywide Content v23.json" --model iteration_model.json
+  python apply_early_exit.py "TEST Skywide Content (Prompt Review).json" --min-gain 1 --reach-gain 6
+  python apply_early_exit.py "PROD Skywide Content v23.json" --no-plateau --reach-gain 8 --allow-dead-end
+"""
+import argparse
+import json
+import os
+import sys
+
+from n8n_utils import load_workflow, node_index, save_workflow
+from score_iterations import improvement_loops
+
+CONDITION_PREFIX = "early_exit_"
+
+
+def early_exit_conditions(loop, min_gain, reach_gain):
+    """IF v2 filter conditions for one loop's Check node."""
+    counter = loop["counter"]
+    max_runs = loop["max_runs"] or 4
+    conditions = []
+    if min_gain is not None:
+        # Previous score: the counter's previous run. The first check (after the 1st Improvement
+        # LLM pass) and a missing score on either side never count as a plateau.
+        previous = f"($('{counter}').all(0, $runIndex - 1)[0].json.score || -100)"
+        conditions.append({
+            "id": f"{CONDITION_PREFIX}plateau",
+            "leftValue": f"={{{{ $runIndex > 0 && $json.score > 0 ? $json.score - {previous} : 100 }}}}",
+            "rightValue": min_gain,
+            "operator": {"type": "number", "operation": "lt"},
+        })
+    conditions.append({
+        "id": f"{CONDITION_PREFIX}gap",
+        "leftValue": f"={{{{ $json.score > 0 ? {loop['target']:g} - $json.score : 0 }}}}",
+        "rightValue": f"={{{{ {reach_gain:g} * ({max_runs} - Number($json.runs)) }}}}",
+        "operator": {"type": "number", "operation": "gt"},
+    })
+    return conditions
+
+
+def loop_thresholds(model, min_gain=None, reach_gain=None, no_plateau=False):
+    """(min_gain, reach_gain, source) for one loop, or None when they would not come from data or flags."""
+    from_data = bool(model) and model.get("source") == "data"
+    if from_data:
+        min_gain = model["min_gain"] if min_gain is None else min_gain
+        reach_gain = model["reach_gain"] if reach_gain is None else reach_gain
+        source = f"{model['looped']} looped article(s)"
+    elif reach_gain is None or (min_gain is None and not no_plateau):
+        return None
+    else:
+        source = "given thresholds"
+    return (None if no_plateau else min_gain), reach_gain, source
+
+
+def exit_nodes(wf, loop):
+    """Nodes the Check IF's true output (where early exits leave) is connected to."""
+    main = wf.get("connections", {}).get(loop["check"], {}).get("main") or []
+    return [c["node"] for c in (main[0] if main else None) or []]
+
+
+def apply_loop(wf, loop, min_gain, reach_gain, note):
+    ix = node_index(wf)
+    assignments = ix[loop["counter"]]["parameters"].setdefault("assignments", {}).setdefault("assignments", [])
+    assignments[:] = [a for a in assignments if a.get("name") != "score"]
+    assignments.append({
+        "id": f"{CONDITION_PREFIX}score",
+        "name": "score",
+        "value": "={{ Number($json.message?.content?.overallScore) || 0 }}",
+        "type": "number",
+    })
+    check = ix[loop["check"]]
+    conditions = check["parameters"]["conditions"]
+    conditions["conditions"] = [c for c in conditions.get("conditions", [])
+                                if not str(c.get("id", "")).startswith(CONDITION_PREFIX)]
+    conditions["conditions"].extend(early_exit_conditions(loop, min_gain, reach_gain))
+    conditions["combinator"] = "or"
+    check["notes"] = note
+    check["notesInFlow"] = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workflow")
+    parser.add_argument("-o", "--output", help="Output path (default: '<workflow> (early exit).json')")
+    parser.add_argument("--model", help="Model JSON from score_iterations.py -o")
+    parser.add_argument("--min-gain", type=float, help="Override the plateau cutoff (points per pass)")
+    parser.add_argument("--reach-gain", type=float, help="Override the optimistic gain per remaining run")
+    parser.add_argument("--no-plateau", action="store_true", help="Only add the out-of-reach rule")
+    parser.add_argument("--allow-dead-end", action="store_true",
+                        help="Apply even where the Check IF's true output is empty (the article ends there)")
+    args = parser.parse_args()
+
+    wf = load_workflow(args.workflow)
+    loops = improvement_loops(wf)
+    if not loops:
+        print("❌ No improvement loops in this workflow")
+        sys.exit(1)
+    models = {}
+    if args.model:
+        with open(args.model, "r", encoding="utf-8") as f:
+            models = json.load(f).get("loops", {})
+
+    plans, refused = [], 0
+    for loop in loops:
+        model = models.get(loop["check"])
+        thresholds = loop_thresholds(model, args.min_gain, args.reach_gain, args.no_plateau)
+        if not thresholds:
+            refused += 1
+            why = ("no --model" if not args.model else "not in the model" if not model
+                   else f"model source is '{model.get('source')}'")
+            print(f"❌ {loop['check']}: {why}; thresholds must come from data "
+                  f"(score_iterations.py -o) or from both --min-gain and --reach-gain")
+        elif not exit_nodes(wf, loop) and not args.allow_dead_end:
+            refused += 1
+            print(f"❌ {loop['check']}: true output is empty, so an early exit would end the article with no "
+                  f"Google Doc and no Signal Completion; connect it or pass --allow-dead-end")
+        else:
+            plans.append((loop, model, thresholds))
+    if refused:
+        sys.exit(1)
+
+    for loop, model, (min_gain, reach_gain, source) in plans:
+        if model and model.get("target") != loop["target"]:
+            print(f"WARNING: {loop['check']} target is {loop['target']:g} here but {model.get('target')} in the model")
+        plateau = f"gain < {min_gain:g} or " if min_gain is not None else ""
+        note = f"Early exit ({source}): {plateau}{loop['target']:g} - score > {reach_gain:g} x remaining runs"
+        exits = exit_nodes(wf, loop)
+        note += f" -> {', '.join(exits)}" if exits else ". True output is EMPTY: an exit ends the article here"
+        apply_loop(wf, loop, min_gain, reach_gain, note)
+        print(f"  ~ {loop['counter']} + score, {loop['check']}: {note}")
+        if not exits:
+            print(f"  ! {loop['check']}: early exits end the path with no Google Doc and no Signal Completion")
+
+    output = args.output or f"{os.path.splitext(args.workflow)[0]} (early exit).json"
+    save_workflow(wf, output)
+    print(f"\n✅ Early exit on {len(loops)} loop(s) -> {output}")
+
+
+if __name__ == "__main__":
+    main()
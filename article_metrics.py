@@ -0,0 +1,338 @@
+"""
+Batch quality metrics for generated articles.
+
+Replaces hand checks on outputs like final_article.txt / content-output.txt.
+The whole corpus is tokenised once into a single array of vocabulary ids;
+every metric is then computed over slices of that array, and per-word work
+(syllable counts) is done once per vocabulary entry rather than per
+occurrence, so thousands of articles take seconds.
+
+Per article:
+  - words (headings + body, Meta Title/Description lines excluded) vs the
+    requested word_count
+  - heading structure: H1/H2/H3 counts, skipped levels
+  - Keyword Strategist targets (primary = first of primary_keywords, the
+    rest secondary, as in src/n8n_scripts/keyword_strategist.js): primary
+    density vs the 1.5% target and its required placements (H1, first 50
+    words, an H2, final paragraph), secondary keywords used, banned phrases
+  - readability: Flesch reading ease and Flesch-Kincaid grade of the body
+
+Inputs are .txt/.md articles, JSON rows from content_requests (raw_content,
+word_count, primary_keywords), directories of either, or --supabase to pull
+the rows straight from the database (NEXT_PUBLIC_SUPABASE_URL and
+SUPABASE_SERVICE_ROLE_KEY from the environment, like the Next.js app).
+
+Usage:
+  python article_metrics.py final_article.txt content-output.txt --keywords "implantation symptoms" --target-words 1200
+  python article_metrics.py latest_full_row.json latest_article_check.json
+  python article_metrics.py --supabase 5000 -o article_metrics.csv
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import urllib.request
+from array import array
+from collections import Counter, defaultdict
+
+from keyword_strategist import split_keywords
+from n8n_utils import supabase_credentials
+
+WORD = re.compile(r"[a-z0-9]+(?:['’][a-z]+)*")
+SENTENCE_END = re.compile(r"[.!?]+(?=[\s\"')\]*_]|$)")
+HEADING = re.compile(r"^\s*(#{1,6})\s+(.*)$")
+META_LINE = re.compile(r"^\s*\**\s*meta (?:title|description)\s*\**\s*:", re.IGNORECASE)
+LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+URL = re.compile(r"https?://\S+")
+VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+
+# From keyword_strategist.js
+DENSITY_TARGET = 1.5
+INTRO_WORDS = 50
+BANNED_PHRASES = ["Additionally", "Let's dive in", "In conclusion", "The bottom line", "Moreover", "Furthermore"]
+
+ARTICLE_EXTENSIONS = (".txt", ".md", ".json")
+SUPABASE_SELECT = "id,article_title,client_name,raw_content,word_count,primary_keywords"
+SUPABASE_PAGE = 1000
+
+
+def keyword_targets(primary_keywords):
+    """(primary, [secondary]) the way the Keyword Strategist node splits primary_keywords."""
+    if isinstance(primary_keywords, list):
+        primary_keywords = ", ".join(k for k in primary_keywords if k)
+    terms = split_keywords(primary_keywords)
+    return (terms[0] if terms else ""), terms[1:]
+
+
+def syllables(word):
+    if word.isdigit():
+        return len(word) if len(word) < 3 else 3
+    count = len(VOWEL_GROUPS.findall(word))
+    if count > 1 and word.endswith("e") and not word.endswith(("le", "ee", "ye")):
+        count -= 1
+    return max(1, count)
+
+
+def _clean(text):
+    # content-output.txt style dumps keep their newlines escaped
+    if text.count("\\n") > text.count("\n"):
+        text = text.replace("\\n", "\n")
+    text = LINK.sub(r"\1", text)
+    return URL.sub(" ", text)
+
+
+class Corpus:
+    """All articles tokenised into one id array; articles are spans of it."""
+
+    def __init__(self):
+        self.vocab = defaultdict(lambda: len(self.vocab))
+        self.ids = array("l")
+        self.articles = []
+
+    def _tokenise(self, text):
+        start = len(self.ids)
+        self.ids.extend(map(self.vocab.__getitem__, WORD.findall(text.lower())))
+        return start, len(self.ids)
+
+    def add(self, text, title, source, target_words=None, primary_keywords=""):
+        start = len(self.ids)
+        headings, paragraphs, sentences = [], [], 0
+        in_paragraph = False
+        for line in _clean(text).splitlines():
+            if not line.strip() or META_LINE.match(line):
+                in_paragraph = False
+                continue
+            heading = HEADING.match(line)
+            if heading:
+                headings.append((len(heading.group(1)),) + self._tokenise(heading.group(2)))
+                in_paragraph = False
+                continue
+            span = self._tokenise(line)
+            if span[0] == span[1]:
+                continue
+            # A list item or a line without a full stop still counts as one sentence
+            sentences += len(SENTENCE_END.findall(line)) or 1
+            if in_paragraph:
+                paragraphs[-1] = (paragraphs[-1][0], span[1])
+            else:
+                paragraphs.append(span)
+            in_paragraph = True
+        primary, secondary = keyword_targets(primary_keywords)
+        self.articles.append({
+            "source": source, "title": title, "target": int(target_words) if target_words else None,
+            "primary": primary, "secondary": secondary,
+            "span": (start, len(self.ids)), "headings": headings, "paragraphs": paragraphs,
+            "sentences": sentences,
+        })
+
+    def phrase(self, text):
+        """Vocabulary ids of a phrase, or None if some word never occurs in the corpus."""
+        words = WORD.findall(text.lower())
+        if not words or any(w not in self.vocab for w in words):
+            return None
+        return array("l", (self.vocab[w] for w in words))
+
+    def occurrences(self, phrase, start, end):
+        if phrase is None or end <= start:
+            return 0
+        segment = self.ids[start:end]
+        if len(phrase) == 1:
+            return segment.count(phrase[0])
+        found, i, n = 0, 0, len(phrase)
+        while True:
+            try:
+                i = segment.index(phrase[0], i)
+            except ValueError:
+                return found
+            if segment[i:i + n] == phrase:
+                found += 1
+                i += n
+            else:
+                i += 1
+
+    def metrics(self, tolerance=0.1):
+        # Once per vocabulary entry, looked up per token
+        syllable_table = array("l", map(syllables, sorted(self.vocab, key=self.vocab.get)))
+        banned = [self.phrase(p) for p in BANNED_PHRASES]
+        rows = []
+        for art in self.articles:
+            start, end = art["span"]
+            words = end - start
+            heading_words = sum(e - s for _, s, e in art["headings"])
+            heading_syllables = sum(sum(map(syllable_table.__getitem__, self.ids[s:e])) for _, s, e in art["headings"])
+            body_words = words - heading_words
+            body_syllables = sum(map(syllable_table.__getitem__, self.ids[start:end])) - heading_syllables
+            levels = Counter(level for level, _, _ in art["headings"])
+            row = {
+                "source": art["source"], "title": art["title"], "words": words, "target": art["target"],
+                "h1": levels[1], "h2": levels[2], "h3": levels[3],
+                "primary": art["primary"], "primary_count": 0, "density": 0.0,
+                "secondary_used": 0, "secondary": len(art["secondary"]),
+                "banned": sum(self.occurrences(p, start, end) for p in banned),
+                "sentences": art["sentences"], "flesch": None, "fk_grade": None, "flags": [],
+            }
+            flags = row["flags"]
+
+            if art["target"]:
+                ratio = words / art["target"]
+                row["ratio"] = round(ratio, 2)
+                if abs(ratio - 1) > tolerance:
+                    flags.append(f"{words} words vs {art['target']} target")
+            if levels[1] != 1:
+                flags.append(f"{levels[1]} H1s")
+            previous = 1
+            for level, _, _ in art["headings"]:
+                if level > previous + 1:
+                    flags.append(f"H{level} under H{previous}")
+                    break
+                previous = level
+
+            if art["primary"]:
+                primary = self.phrase(art["primary"])
+                row["primary_count"] = count = self.occurrences(primary, start, end)
+                row["density"] = round(count / words * 100, 2) if words else 0.0
+                if not DENSITY_TARGET / 2 <= row["density"] <= DENSITY_TARGET * 2:
+                    flags.append(f"primary density {row['density']}% (target {DENSITY_TARGET}%)")
+                h1 = [(s, e) for level, s, e in art["headings"] if level == 1]
+                h2 = [(s, e) for level, s, e in art["headings"] if level == 2]
+                body_start = art["paragraphs"][0][0] if art["paragraphs"] else end
+                checks = {
+                    "H1": any(self.occurrences(primary, s, e) for s, e in h1),
+                    f"first {INTRO_WORDS} words": self.occurrences(
+                        primary, body_start, min(end, body_start + INTRO_WORDS + len(primary or ()) - 1)),
+                    "an H2": any(self.occurrences(primary, s, e) for s, e in h2),
+                    "final paragraph": bool(art["paragraphs"]) and self.occurrences(primary, *art["paragraphs"][-1]),
+                }
+                flags.extend(f"primary not in {where}" for where, ok in checks.items() if not ok)
+            row["secondary_used"] = sum(1 for k in art["secondary"] if self.occurrences(self.phrase(k), start, end))
+            if row["banned"]:
+                flags.append(f"{row['banned']} banned phrase(s)")
+
+            if body_words and art["sentences"]:
+                per_sentence = body_words / art["sentences"]
+                per_word = body_syllables / body_words
+                row["flesch"] = round(206.835 - 1.015 * per_sentence - 84.6 * per_word, 1)
+                row["fk_grade"] = round(0.39 * per_sentence + 11.8 * per_word - 15.59, 1)
+            rows.append(row)
+        return rows
+
+
+def _row_article(row, source):
+    title = row.get("article_title") or row.get("title") or source
+    return row.get("raw_content"), title, row.get("word_count"), row.get("primary_keywords") or ""
+
+
+def load_articles(paths, target_words=None, keywords=""):
+    """Yield (text, title, source, target_words, primary_keywords)."""
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(folder, name) for folder, _, names in os.walk(path)
+                           for name in names if name.endswith(ARTICLE_EXTENSIONS))
+            yield from load_articles(files, target_words, keywords)
+        elif path.endswith(".json"):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            rows = data if isinstance(data, list) else [data]
+            for i, row in enumerate(rows):
+                if isinstance(row, dict) and row.get("raw_content"):
+                    text, title, target, kw = _row_article(row, f"{path}[{i}]")
+                    yield text, title, f"{path}[{i}]" if len(rows) > 1 else path, target or target_words, kw or keywords
+        else:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                yield f.read(), os.path.basename(path), path, target_words, keywords
+
+
+def fetch_supabase(limit):
+    url, key = supabase_credentials()
+    fetched = 0
+    while fetched < limit:
+        page = min(SUPABASE_PAGE, limit - fetched)
+        req = urllib.request.Request(f"{url}/rest/v1/content_requests?select={SUPABASE_SELECT}"
+                                     f"&raw_content=not.is.null&order=created_at.desc&limit={page}&offset={fetched}")
+        req.add_header("apikey", key)
+        req.add_header("Authorization", f"Bearer {key}")
+        with urllib.request.urlopen(req, timeout=60) as response:
+            rows = json.loads(response.read().decode())
+        for row in rows:
+            text, title, target, kw = _row_article(row, row["id"])
+            yield text, title, f"content_requests/{row['id']}", target, kw
+        fetched += len(rows)
+        if len(rows) < page:
+            return
+
+
+def write_rows(rows, path):
+    if path.endswith(".csv"):
+        fields = [k for k in rows[0] if k != "flags"] + ["ratio", "flags"]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(dict.fromkeys(fields)))
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(dict(row, flags="; ".join(row["flags"])))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Article files, content_requests JSON rows, or directories")
+    parser.add_argument("--supabase", type=int, metavar="N", help="Also score the latest N content_requests rows")
+    parser.add_argument("--keywords", default="", help="primary_keywords for inputs that don't carry their own")
+    parser.add_argument("--target-words", type=int, help="Word count target for inputs without word_count")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed word count deviation (default 10%%)")
+    parser.add_argument("--show", type=int, default=40, help="Articles to list individually")
+    parser.add_argument("-o", "--output", help="Write per-article metrics (.json or .csv)")
+    args = parser.parse_args()
+    if not args.paths and not args.supabase:
+        parser.error("give article paths and/or --supabase N")
+
+    sources = list(load_articles(args.paths, args.target_words, args.keywords))
+    if args.supabase:
+        sources.extend(fetch_supabase(args.supabase))
+    if not sources:
+        print("❌ No articles found")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    corpus = Corpus()
+    for text, title, source, target, kw in sources:
+        corpus.add(text, title, source, target, kw)
+    tokenised = time.perf_counter()
+    rows = corpus.metrics(args.tolerance)
+    finished = time.perf_counter()
+
+    for row in rows[:args.show]:
+        icon = "✅" if not row["flags"] else "WARNING:"
+        target = f"/{row['target']}" if row["target"] else ""
+        print(f"{icon} {row['title'][:60]} — {row['words']}{target} words, H1/H2/H3 {row['h1']}/{row['h2']}/{row['h3']}, "
+              f"'{row['primary']}' {row['density']}%, Flesch {row['flesch']} (grade {row['fk_grade']})")
+        for flag in row["flags"]:
+            print(f"  ! {flag}")
+    if len(rows) > args.show:
+        print(f"... {len(rows) - args.show} more (use -o to write them all)")
+
+    print(f"\n{len(rows)} article(s), {len(corpus.ids):,} words, {len(corpus.vocab):,} distinct: "
+          f"tokenised in {tokenised - started:.2f}s, metrics in {finished - tokenised:.2f}s")
+    targeted = [r for r in rows if r["target"]]
+    if targeted:
+        on_target = sum(1 for r in targeted if abs(r["words"] / r["target"] - 1) <= args.tolerance)
+        print(f"Word count within {args.tolerance:.0%} of target: {on_target}/{len(targeted)}")
+    scored = [r["flesch"] for r in rows if r["flesch"] is not None]
+    if scored:
+        print(f"Flesch reading ease: median {statistics.median(scored):.1f}, "
+              f"grade median {statistics.median(r['fk_grade'] for r in rows if r['fk_grade'] is not None):.1f}")
+    flag_counts = Counter(re.sub(r"\b\d[\d.,]*", "N", flag) for r in rows for flag in r["flags"])
+    for flag, n in flag_counts.most_common(10):
+        print(f"  {n:>5} × {flag}")
+    if args.output:
+        write_rows(rows, args.output)
+        print(f"✅ Metrics -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
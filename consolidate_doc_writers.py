@@ -0,0 +1,426 @@
+"""
+Replace the per-path Google Docs create + update pairs with one shared writer.
+
+Every doc path today is two nodes and two API round-trips: "Create a
+documentN" (Drive files.create into the run's folder) then "Update a
+documentN" (Docs batchUpdate inserting the score summary and article).
+This transform turns each pair into a "Doc Content N" Set node that only
+computes the title, folder and text (the update node's expressions, moved
+as they are), all feeding one shared subgraph:
+
+  Doc Content N -> Build Doc Upload (Code) -> Write Google Doc (HTTP) -> Route Doc Completion (Switch)
+
+Write Google Doc creates the document in the folder with its text in a
+single Drive multipart upload (text converted to a Google Doc), using the
+Docs nodes' own credential. The path tag rides along in appProperties, so
+the Switch sends each result on to that path's old successors (the Signal
+Completion nodes). Downstream `$json.id` still gets the document id.
+
+Workflows already run through transform_workflow.py have an "Is Test
+Exit N?" IF in front of each create node; those collapse into a single
+"Is Test Exit?" in front of the shared writer.
+
+--bench replays the doc writes of both layouts against a local stand-in
+for the Drive / Docs APIs, with per-call latency from a heavy-tailed
+distribution, and compares calls and latency per document.
+
+Usage:
+  python consolidate_doc_writers.py "PROD Skywide Content v23.json"
+  python consolidate_doc_writers.py "TEST Skywide Content (Prompt Review).json" -o "TEST (shared doc writer).json"
+  python consolidate_doc_writers.py "PROD Skywide Content v23.json" --bench 200 --concurrency 12
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from n8n_utils import (
+    CODE_TYPE, GOOGLE_DOCS_TYPE, HTTP_TYPE, IF_TYPE, SET_TYPE, gen_id, load_workflow, percentile, save_workflow,
+)
+
+SWITCH_TYPE = "n8n-nodes-base.switch"
+BUILD_NAME = "Build Doc Upload"
+WRITER_NAME = "Write Google Doc"
+ROUTER_NAME = "Route Doc Completion"
+TEST_EXIT_NAME = "Is Test Exit?"
+TEST_EXIT_PATTERN = re.compile(r"^Is Test Exit \d+\?$")
+PATH_PROPERTY = "skywide_doc_path"
+UPLOAD_URL = ("https://www.googleapis.com/upload/drive/v3/files?uploadType=multipart&supportsAllDrives=true"
+              "&fields=id,name,webViewLink,appProperties")
+DOC_MIME = "application/vnd.google-apps.document"
+
+BUILD_CODE = """// One multipart body: file metadata + the text Drive converts into the document
+const boundary = 'skywide_doc_' + Math.random().toString(36).slice(2);
+const metadata = {
+  name: $json.doc_title,
+  mimeType: '%s',
+  parents: [$json.doc_folder_id],
+  appProperties: { %s: String($json.doc_path) },
+};
+const body = [
+  `--${boundary}`,
+  'Content-Type: application/json; charset=UTF-8',
+  '',
+  JSON.stringify(metadata),
+  `--${boundary}`,
+  'Content-Type: text/plain; charset=UTF-8',
+  '',
+  $json.doc_text ?? '',
+  `--${boundary}--`,
+  '',
+].join('\\r\\n');
+return { json: { ...$json, upload_boundary: boundary, upload_body: body } };
+""" % (DOC_MIME, PATH_PROPERTY)
+
+
+def doc_pairs(wf):
+    """[(create node, update node, path tag)] for create -> update pairs that can be merged."""
+    by_name = {n["name"]: n for n in wf["nodes"]}
+    pairs, tags = [], set()
+    for node in wf["nodes"]:
+        if node["type"] != GOOGLE_DOCS_TYPE or node["parameters"].get("operation", "create") != "create":
+            continue
+        outputs = wf["connections"].get(node["name"], {}).get("main") or []
+        targets = [t["node"] for group in outputs for t in group or []]
+        if len(targets) != 1 or by_name[targets[0]]["type"] != GOOGLE_DOCS_TYPE:
+            print(f"  ! {node['name']}: not followed by a single update node, left as is")
+            continue
+        update = by_name[targets[0]]
+        actions = update["parameters"].get("actionsUi", {}).get("actionFields", [])
+        if (update["parameters"].get("operation") != "update"
+                or update["parameters"].get("documentURL") != "={{ $json.id }}"
+                or not actions or any(a.get("action") != "insert" for a in actions)):
+            print(f"  ! {update['name']}: not a plain insert into the new document, left as is")
+            continue
+        tag = re.search(r"(\d*)$", node["name"]).group(1) or "0"
+        while tag in tags:
+            tag += "b"
+        tags.add(tag)
+        pairs.append((node, update, tag))
+    return pairs
+
+
+def _text_expression(actions):
+    """The update node's insert texts joined into one Set value (expression if any part is one)."""
+    texts = [a.get("text", "") for a in actions]
+    if not any(t.startswith("=") for t in texts):
+        return "".join(texts)
+    return "=" + "".join(t[1:] if t.startswith("=") else t for t in texts)
+
+
+def _folder_expression(value):
+    if isinstance(value, dict):
+        value = value.get("value", "")
+    return value
+
+
+def _assignment(name, value):
+    return {"id": gen_id(), "name": name, "value": value, "type": "string"}
+
+
+def _redirect(wf, old, new):
+    """Point every edge into `old` at `new` instead."""
+    for outputs in wf["connections"].values():
+        for groups in outputs.values():
+            for targets in groups or []:
+                for t in targets or []:
+                    if t["node"] == old:
+                        t["node"] = new
+
+
+def _edge(name):
+    return {"node": name, "type": "main", "index": 0}
+
+
+def consolidate(wf):
+    """Rewrite the workflow in place; returns the merged (create, update, tag) pairs."""
+    names = {n["name"] for n in wf["nodes"]}
+    for name in (BUILD_NAME, WRITER_NAME, ROUTER_NAME):
+        if name in names:
+            raise ValueError(f"'{name}' already exists; workflow already consolidated?")
+    pairs = doc_pairs(wf)
+    if not pairs:
+        return pairs
+
+    connections = wf["connections"]
+    removed, content_nodes, routes = set(), [], []
+    for create, update, tag in pairs:
+        content = {
+            "parameters": {
+                "assignments": {"assignments": [
+                    _assignment("doc_title", create["parameters"].get("title", "")),
+                    _assignment("doc_folder_id", _folder_expression(create["parameters"].get("folderId", ""))),
+                    _assignment("doc_text", _text_expression(update["parameters"]["actionsUi"]["actionFields"])),
+                    _assignment("doc_path", tag),
+                ]},
+                "includeOtherFields": True,
+                "options": {},
+            },
+            "type": SET_TYPE,
+            "typeVersion": 3.4,
+            "position": create["position"],
+            "id": gen_id(),
+            "name": f"Doc Content {tag}",
+            "notesInFlow": True,
+            "notes": f"Was {create['name']} + {update['name']}",
+        }
+        wf["nodes"].append(content)
+        content_nodes.append(content)
+        _redirect(wf, create["name"], content["name"])
+        connections[content["name"]] = {"main": [[_edge(BUILD_NAME)]]}
+        routes.append((tag, (connections.pop(update["name"], {}).get("main") or [[]])[0] or []))
+        connections.pop(create["name"], None)
+        removed.update((create["name"], update["name"]))
+        # Anything that read the old doc nodes reads the shared writer's response instead
+        for node in wf["nodes"]:
+            text = json.dumps(node.get("parameters", {}), ensure_ascii=False)
+            for old in (create["name"], update["name"]):
+                for quote in ("'", '"'):
+                    text = text.replace(f"$({quote}{old}{quote})", f"$({quote}{WRITER_NAME}{quote})")
+            node["parameters"] = json.loads(text)
+    wf["nodes"] = [n for n in wf["nodes"] if n["name"] not in removed]
+
+    xs = [n["position"][0] for n in content_nodes]
+    ys = [n["position"][1] for n in content_nodes]
+    x, y = max(xs) + 300, int(statistics.mean(ys))
+    credentials = next((c.get("credentials") for c, _, _ in pairs if c.get("credentials")), None)
+    credential_type = next(iter(credentials)) if credentials else "googleDocsOAuth2Api"
+    wf["nodes"].append({
+        "parameters": {"mode": "runOnceForEachItem", "jsCode": BUILD_CODE},
+        "type": CODE_TYPE, "typeVersion": 2, "position": [x, y], "id": gen_id(), "name": BUILD_NAME,
+    })
+    writer = {
+        "parameters": {
+            "method": "POST",
+            "url": UPLOAD_URL,
+            "authentication": "predefinedCredentialType",
+            "nodeCredentialType": credential_type,
+            "sendBody": True,
+            "contentType": "raw",
+            "rawContentType": "={{ 'multipart/related; boundary=' + $json.upload_boundary }}",
+            "body": "={{ $json.upload_body }}",
+            "options": {},
+        },
+        "type": HTTP_TYPE, "typeVersion": 4.2, "position": [x + 250, y], "id": gen_id(), "name": WRITER_NAME,
+        "notesInFlow": True,
+        "notes": "Creates the doc in the folder with its content in one request",
+    }
+    if credentials:
+        writer["credentials"] = credentials
+    wf["nodes"].append(writer)
+    connections[BUILD_NAME] = {"main": [[_edge(WRITER_NAME)]]}
+
+    routed = [(tag, targets) for tag, targets in routes if targets]
+    if routed:
+        wf["nodes"].append({
+            "parameters": {
+                "rules": {"values": [{
+                    "conditions": {
+                        "options": {"caseSensitive": True, "leftValue": "", "typeValidation": "strict", "version": 2},
+                        "conditions": [{
+                            "id": gen_id(),
+                            "leftValue": f"={{{{ $json.appProperties.{PATH_PROPERTY} }}}}",
+                            "rightValue": tag,
+                            "operator": {"type": "string", "operation": "equals"},
+                        }],
+                        "combinator": "and",
+                    },
+                    "renameOutput": True,
+                    "outputKey": f"Doc {tag}",
+                } for tag, _ in routed]},
+                "options": {},
+            },
+            "type": SWITCH_TYPE, "typeVersion": 3.2, "position": [x + 500, y], "id": gen_id(), "name": ROUTER_NAME,
+        })
+        connections[WRITER_NAME] = {"main": [[_edge(ROUTER_NAME)]]}
+        connections[ROUTER_NAME] = {"main": [[dict(t) for t in targets] for _, targets in routed]}
+
+    collapse_test_exits(wf, [n["name"] for n in content_nodes], (x - 250, y))
+    return pairs
+
+
+def collapse_test_exits(wf, content_names, position):
+    """Replace per-path "Is Test Exit N?" IFs in front of the doc content nodes with one in front of the writer."""
+    connections = wf["connections"]
+    exits, true_targets = [], None
+    for node in wf["nodes"]:
+        if node["type"] != IF_TYPE or not TEST_EXIT_PATTERN.match(node["name"]):
+            continue
+        main = connections.get(node["name"], {}).get("main") or []
+        false = [t["node"] for t in (main[1] if len(main) > 1 else []) or []]
+        true = sorted(t["node"] for t in (main[0] if main else []) or [])
+        if len(false) != 1 or false[0] not in content_names or (true_targets is not None and true != true_targets):
+            return
+        exits.append(node)
+        true_targets = true
+    if not exits:
+        return
+    template = exits[0]
+    for node in exits:
+        _redirect(wf, node["name"], connections[node["name"]]["main"][1][0]["node"])
+        connections.pop(node["name"])
+    wf["nodes"] = [n for n in wf["nodes"] if n not in exits]
+    test_exit = json.loads(json.dumps(template))
+    test_exit.update(id=gen_id(), name=TEST_EXIT_NAME, position=list(position),
+                     notes="Test→Audit, Prod→shared doc writer")
+    wf["nodes"].append(test_exit)
+    for name in content_names:
+        connections[name] = {"main": [[_edge(TEST_EXIT_NAME)]]}
+    connections[TEST_EXIT_NAME] = {"main": [[_edge(t) for t in true_targets], [_edge(BUILD_NAME)]]}
+    print(f"  ~ {len(exits)} Is Test Exit N? node(s) -> one '{TEST_EXIT_NAME}' in front of the writer")
+
+
+# ---- benchmark against a local Drive / Docs stand-in ----
+
+class DocsApiStub(BaseHTTPRequestHandler):
+    """Drive files.create, Drive multipart upload and Docs batchUpdate with sampled latency."""
+    median_ms = 250.0
+    sigma = 0.6
+    ms_per_kb = 0.5
+    rng = random.Random(7)
+    lock = threading.Lock()
+    calls = {}
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.startswith("/upload/drive/v3/files"):
+            kind = "drive.upload"
+            tag = re.search(rb'"%s":\s*"([^"]*)"' % PATH_PROPERTY.encode(), body)
+            reply = {"id": uuid.uuid4().hex, "appProperties": {PATH_PROPERTY: tag.group(1).decode() if tag else ""}}
+        elif self.path.startswith("/drive/v3/files"):
+            kind = "drive.create"
+            reply = {"id": uuid.uuid4().hex, "name": json.loads(body).get("name")}
+        elif self.path.startswith("/v1/documents/") and self.path.endswith(":batchUpdate"):
+            kind = "docs.batchUpdate"
+            reply = {"documentId": self.path.split("/")[3].split(":")[0], "replies": [{}]}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        with self.lock:
+            DocsApiStub.calls[kind] = DocsApiStub.calls.get(kind, 0) + 1
+            delay = self.rng.lognormvariate(0, self.sigma) * self.median_ms + len(body) / 1024 * self.ms_per_kb
+        time.sleep(delay / 1000)
+        data = json.dumps(reply).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _post(base, path, body, content_type="application/json"):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(base + path, data=data, method="POST", headers={"Content-Type": content_type})
+    with urllib.request.urlopen(req, timeout=60) as response:
+        return json.loads(response.read())
+
+
+def write_pair(base, title, text):
+    """Today's layout: create in the folder, then batchUpdate the text in."""
+    doc = _post(base, "/drive/v3/files?supportsAllDrives=true",
+                {"name": title, "mimeType": DOC_MIME, "parents": ["folder"]})
+    _post(base, f"/v1/documents/{doc['id']}:batchUpdate",
+          {"requests": [{"insertText": {"text": text, "endOfSegmentLocation": {}}}]})
+
+
+def write_shared(base, title, text, tag):
+    """Shared writer: one multipart upload, same body as Build Doc Upload."""
+    boundary = "skywide_doc_" + uuid.uuid4().hex[:10]
+    metadata = {"name": title, "mimeType": DOC_MIME, "parents": ["folder"], "appProperties": {PATH_PROPERTY: tag}}
+    body = "\r\n".join([f"--{boundary}", "Content-Type: application/json; charset=UTF-8", "", json.dumps(metadata),
+                        f"--{boundary}", "Content-Type: text/plain; charset=UTF-8", "", text, f"--{boundary}--", ""])
+    _post(base, "/upload/drive/v3/files?uploadType=multipart", body.encode("utf-8"),
+          f"multipart/related; boundary={boundary}")
+
+
+def bench(pairs, runs, concurrency, text):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DocsApiStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    tags = [tag for _, _, tag in pairs]
+    jobs = [(run, tag) for run in range(runs) for tag in tags]
+    print(f"Docs API stand-in on :{server.server_port}: per-call latency lognormal, median "
+          f"{DocsApiStub.median_ms:.0f}ms (sigma {DocsApiStub.sigma}) + {DocsApiStub.ms_per_kb}ms/KB")
+    print(f"{runs} run(s) x {len(tags)} doc path(s), {len(text) / 1024:.0f}KB article, concurrency {concurrency}\n")
+
+    results = {}
+    for label, write in (("create + update", lambda job: write_pair(base, f"Run {job[0]}", text)),
+                         ("shared writer", lambda job: write_shared(base, f"Run {job[0]}", text, job[1]))):
+        DocsApiStub.calls = {}
+        DocsApiStub.rng.seed(7)
+
+        def timed(job):
+            start = time.perf_counter()
+            write(job)
+            return (time.perf_counter() - start) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, jobs))
+        wall = time.perf_counter() - started
+        calls = sum(DocsApiStub.calls.values())
+        results[label] = latencies
+        print(f"{label:<16} {calls:>5} API calls ({calls / len(jobs):.1f}/doc)  p50 {statistics.median(latencies):6.0f}ms  "
+              f"p95 {percentile(latencies, 95):6.0f}ms  p99 {percentile(latencies, 99):6.0f}ms  "
+              f"max {max(latencies):6.0f}ms  wall {wall:.1f}s")
+    server.shutdown()
+    before, after = results["create + update"], results["shared writer"]
+    print(f"\nPer document: p50 {statistics.median(before) / statistics.median(after):.1f}x, "
+          f"p95 {percentile(before, 95) / percentile(after, 95):.1f}x faster with the shared writer")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workflow")
+    parser.add_argument("-o", "--output", help="Output path (default: '<workflow> (shared doc writer).json')")
+    parser.add_argument("--bench", type=int, metavar="RUNS", help="Benchmark both layouts instead of writing")
+    parser.add_argument("--concurrency", type=int, default=8, help="Doc writes in flight during --bench")
+    parser.add_argument("--median-ms", type=float, default=DocsApiStub.median_ms, help="Stand-in median latency/call")
+    parser.add_argument("--article", default="final_article.txt", help="Text written to each doc during --bench")
+    args = parser.parse_args()
+
+    wf = load_workflow(args.workflow)
+    if args.bench:
+        pairs = doc_pairs(wf)
+        if not pairs:
+            print("❌ No create + update doc pairs in this workflow")
+            sys.exit(1)
+        DocsApiStub.median_ms = args.median_ms
+        with open(args.article, "r", encoding="utf-8") as f:
+            text = f.read()
+        bench(pairs, args.bench, args.concurrency, text)
+        return
+
+    before = len(wf["nodes"])
+    try:
+        pairs = consolidate(wf)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if not pairs:
+        print("Nothing to consolidate")
+        return
+    for create, update, tag in pairs:
+        print(f"  ~ {create['name']} + {update['name']} -> Doc Content {tag}")
+    print(f"  + {BUILD_NAME}, {WRITER_NAME}" + (f", {ROUTER_NAME}" if ROUTER_NAME in wf["connections"] else ""))
+    output = args.output or f"{os.path.splitext(args.workflow)[0]} (shared doc writer).json"
+    save_workflow(wf, output)
+    print(f"\n✅ {len(pairs) * 2} Google Docs nodes -> 1 shared writer ({before} -> {len(wf['nodes'])} nodes): {output}")
+    print("API calls per document: 2 -> 1")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+End-to-end latency harness: test request in -> /api/test-callback out.
+
+Starts a local n8n stand-in that
+  - accepts POST /webhook/<path> with the body /api/proxy-n8n forwards
+    (the A/B test modal payload, request_status 'test') and answers
+    immediately, like Webhook1 with its default "respond on received"
+  - replays the node timeline of an execution export (each node run starts
+    at its recorded offset, divided by --speed)
+  - then posts the final status the way Send Test Callback does, using the
+    transports from simulate_callback.py (plain, gzip, batched...)
+
+By default callbacks go to a local receiver standing in for
+/api/test-callback; pass --callback-url to hit the real route instead. To
+include the Next.js proxy hop, run the app with N8N_BASE_URL pointing at
+the stub and pass --entry http://localhost:3000/api/proxy-n8n.
+
+Fires N concurrent test requests and reports per-request latency, the
+latency percentiles and throughput. --n8n-concurrency caps how many
+executions the stub runs at once (n8n's execution concurrency limit).
+
+Usage:
+  python e2e_latency_harness.py execution_2764_full.json -n 20 --speed 120
+  python e2e_latency_harness.py execution_2764_full.json -n 50 --speed 600 --n8n-concurrency 5 --transport batched-gzip
+"""
+import argparse
+import gzip
+import json
+import statistics
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from n8n_utils import load_execution, percentile, timestamp_ms
+from simulate_callback import MODES, _Receiver, build_requests, payload
+
+WEBHOOK_PATH = "content-engine-test-unique"
+
+
+def node_timeline(execution):
+    """[(offset_ms, node, duration_ms)] for every node run, in start order."""
+    started = timestamp_ms(execution["startedAt"])
+    timeline = []
+    for name, runs in execution["data"]["resultData"]["runData"].items():
+        for run in runs:
+            if run.get("startTime"):
+                timeline.append((run["startTime"] - started, name, run.get("executionTime", 0) or 0))
+    timeline.sort()
+    end = timestamp_ms(execution["stoppedAt"]) - started
+    return timeline, end
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent = {}
+        self.callback_done = {}
+
+    def mark(self, field, request_id):
+        with self.lock:
+            getattr(self, field)[request_id] = time.perf_counter()
+
+
+class _CallbackReceiver(_Receiver):
+    """simulate_callback's receiver, recording when each request_id completed."""
+    results = None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if "gzip" in (self.headers.get("Content-Encoding") or ""):
+            body = gzip.decompress(body)
+        # Every transport sends the whole result in one POST
+        self.results.mark("callback_done", json.loads(body)["request_id"])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"success": true}')
+
+
+class N8nStub(BaseHTTPRequestHandler):
+    timeline = []
+    end_ms = 0
+    speed = 1.0
+    callback_url = ""
+    transport = "plain"
+    slots = threading.BoundedSemaphore(1000)
+    results = None
+    track_callbacks = False
+
+    def do_POST(self):
+        if not self.path.startswith("/webhook/"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        threading.Thread(target=self.execute, args=(body,), daemon=True).start()
+        data = b'{"message": "Workflow was started"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    @classmethod
+    def execute(cls, body):
+        with cls.slots:
+            start = time.perf_counter()
+            for offset_ms, _, duration_ms in cls.timeline:
+                # Each node run starts at its recorded offset and holds the worker for its duration
+                wait = (offset_ms + duration_ms) / 1000 / cls.speed - (time.perf_counter() - start)
+                if wait > 0:
+                    time.sleep(wait)
+            remaining = cls.end_ms / 1000 / cls.speed - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+        final = dict(payload, request_id=body.get("request_id"))
+        for data, headers in build_requests(cls.transport, final):
+            req = urllib.request.Request(cls.callback_url, data=data, method="POST", headers=headers)
+            try:
+                with urllib.request.urlopen(req, timeout=30) as response:
+                    response.read()
+            except Exception as e:
+                print(f"  ❌ callback for {body.get('request_id')} failed: {e}")
+        if cls.track_callbacks:
+            cls.results.mark("callback_done", body.get("request_id"))
+
+    def log_message(self, *args):
+        pass
+
+
+def build_test_request(request_id):
+    """Body the A/B test modal posts to /api/proxy-n8n."""
+    return {
+        "path": WEBHOOK_PATH,
+        "request_id": request_id,
+        "runId": str(uuid.uuid4()),
+        "title": "Latency harness",
+        "client_name": "Harness",
+        "creative_brief": "Latency harness brief",
+        "word_count": "1200",
+        "primary_keywords": "latency",
+        "is_ab_test": True,
+        "request_status": "test",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def run_harness(execution, n, speed, transport, n8n_concurrency, entry=None, callback_url=None, timeout=None,
+                stub_port=0):
+    timeline, end_ms = node_timeline(execution)
+    results = Results()
+
+    receiver = None
+    if not callback_url:
+        _CallbackReceiver.results = results
+        receiver = ThreadingHTTPServer(("127.0.0.1", 0), _CallbackReceiver)
+        threading.Thread(target=receiver.serve_forever, daemon=True).start()
+        callback_url = f"http://127.0.0.1:{receiver.server_port}/api/test-callback"
+
+    N8nStub.timeline, N8nStub.end_ms, N8nStub.speed = timeline, end_ms, speed
+    N8nStub.callback_url, N8nStub.transport, N8nStub.results = callback_url, transport, results
+    N8nStub.slots = threading.BoundedSemaphore(n8n_concurrency)
+    # Against a real callback route the stub's own "callback answered" time is the end point
+    N8nStub.track_callbacks = receiver is None
+    stub = ThreadingHTTPServer(("127.0.0.1", stub_port), N8nStub)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    entry_url = entry or f"http://127.0.0.1:{stub.server_port}/webhook/{WEBHOOK_PATH}"
+
+    print(f"Replaying execution {execution.get('id')}: {len(timeline)} node runs, "
+          f"{end_ms / 1000:.0f}s recorded -> {end_ms / 1000 / speed:.1f}s at x{speed:g}")
+    print(f"n8n stub on :{stub.server_port} (concurrency {n8n_concurrency}), callbacks -> {callback_url} ({transport})")
+    if entry:
+        print(f"Entry: {entry} (N8N_BASE_URL should be http://127.0.0.1:{stub.server_port})")
+    print(f"Firing {n} concurrent test requests...\n")
+
+    request_ids = [str(uuid.uuid4()) for _ in range(n)]
+
+    def fire(request_id):
+        body = build_test_request(request_id)
+        if not entry:
+            body.pop("path")
+        req = urllib.request.Request(entry_url, data=json.dumps(body).encode("utf-8"), method="POST",
+                                     headers={"Content-Type": "application/json"})
+        results.mark("sent", request_id)
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(n, 64)) as pool:
+        list(pool.map(fire, request_ids))
+
+    deadline = started + (timeout or (end_ms / 1000 / speed) * (n / n8n_concurrency + 1) + 30)
+    while len(results.callback_done) < n and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    finished = time.perf_counter()
+    stub.shutdown()
+    if receiver:
+        receiver.shutdown()
+
+    latencies = []
+    for i, request_id in enumerate(request_ids, 1):
+        if request_id in results.callback_done:
+            latency = results.callback_done[request_id] - results.sent[request_id]
+            latencies.append(latency)
+            print(f"  #{i:<3} {request_id[:8]}  {latency:8.2f}s  ({latency * speed:7.0f}s real-time)")
+        else:
+            print(f"  #{i:<3} {request_id[:8]}  ❌ no callback before timeout")
+
+    if not latencies:
+        print("\n❌ No callbacks received.")
+        return None
+    wall = finished - started
+    summary = {
+        "completed": len(latencies),
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "max": max(latencies),
+        "throughput_per_min": len(latencies) / wall * 60,
+    }
+    print(f"\n{len(latencies)}/{n} completed in {wall:.1f}s")
+    print(f"Latency p50 {summary['p50']:.2f}s  p95 {summary['p95']:.2f}s  max {summary['max']:.2f}s "
+          f"(x{speed:g} real-time: p50 {summary['p50'] * speed / 60:.1f} min)")
+    print(f"Throughput {summary['throughput_per_min']:.1f} requests/min "
+          f"({summary['throughput_per_min'] / speed * 60:.1f}/hour real-time)")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("execution", help="Execution export whose node timings are replayed")
+    parser.add_argument("-n", "--requests", type=int, default=10, help="Concurrent test requests")
+    parser.add_argument("--speed", type=float, default=60, help="Replay speed-up factor (1 = real time)")
+    parser.add_argument("--transport", choices=MODES, default="plain", help="Callback transport")
+    parser.add_argument("--n8n-concurrency", type=int, default=10, help="Executions the stub runs at once")
+    parser.add_argument("--entry", help="Send requests here instead of the stub webhook (e.g. /api/proxy-n8n)")
+    parser.add_argument("--callback-url", help="Real /api/test-callback URL (default: local receiver)")
+    parser.add_argument("--timeout", type=float, help="Seconds to wait for callbacks")
+    parser.add_argument("--stub-port", type=int, default=0, help="Fixed port for the n8n stub (for N8N_BASE_URL)")
+    args = parser.parse_args()
+
+    run_harness(load_execution(args.execution), args.requests, args.speed, args.transport,
+                args.n8n_concurrency, args.entry, args.callback_url, args.timeout, args.stub_port)
+
+
+if __name__ == "__main__":
+    main()
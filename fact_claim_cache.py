@@ -0,0 +1,580 @@
+"""
+Claim-level fact-check cache for the Perplexity fact checkers.
+
+The Pre-Draft and Post-Draft Fact Checkers (inject_fact_checkers.py) send a
+whole brief or draft to sonar-pro and re-verify the same legal citations,
+statistics and entities for every article of a client. This stage splits
+the text into checkable claims first, normalises them, and keeps verdicts in
+a local SQLite store keyed by client + normalised claim:
+
+  verified_claims  (client, claim_key) -> claim, status, verdict, correction,
+                   sources, checked_at, expires_at, hits
+
+A claim is checkable when it carries something a fact checker would look
+up: a number, percentage, money amount, year, legal/code citation (§, CFR,
+U.S.C., Act, Rule) or an acronym entity (VA, BACB, NCEES). Normalisation
+folds case, quotes, dashes, commas, markdown, [n] citation markers,
+"percent" and leading connectives, so "Per 38 C.F.R. § 3.321, ..." and
+"per 38 CFR §3.321 ..." share one entry.
+
+Only unseen or expired claims go to Perplexity, in numbered batches that
+ask for a JSON verdict per claim. Cached and fresh verdicts are merged, in
+text order, into a report in the checkers' own format (**Claim:** /
+**Status:** blocks), ready for the "CRITICAL FACT-CHECK REPORT" slot of the
+draft prompts. Verdicts expire by status: supported after 90 days,
+corrected / refuted after 30, unverified after 7.
+
+  check   fact-check text files for one client, print the merged report
+  serve   POST /fact-check {"client", "text"} -> {"report", "claims", ...}
+          for the HTTP Request nodes apply_claim_cache.py puts in place of
+          the Pre-Draft and in front of the Post-Draft Fact Checker
+  stats   cached claims per client and status
+  bench   replay the texts recorded executions sent to the Pre-Draft and
+          Post-Draft Fact Checkers (brief, brief + Data Check report)
+          through a local sonar-pro stub, with and without the cache
+
+There is no seeding from recorded Pre-Draft reports: their **Claim:** lines
+are Perplexity's paraphrases, which never normalise to a sentence of the
+brief, so the cache only fills from its own verifications.
+
+--base-url also takes the llm_cache_proxy.py route
+(http://127.0.0.1:8787/perplexity). The key comes from --api-key or
+PERPLEXITY_API_KEY.
+
+Usage:
+  python fact_claim_cache.py check brief.txt --client "Helping Hands Family"
+  python fact_claim_cache.py serve --port 8788 [--host 127.0.0.1]
+  python fact_claim_cache.py stats
+  python fact_claim_cache.py bench exports/*.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from n8n_utils import load_execution, percentile, run_output
+
+DB_PATH = "fact_claims.sqlite"
+DEFAULT_BASE_URL = "https://api.perplexity.ai"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8788
+MODEL = "sonar-pro"
+BATCH_SIZE = 20
+
+TTL_DAYS = {"supported": 90, "corrected": 30, "refuted": 30, "unverified": 7}
+STATUS_MARK = {
+    "supported": "✅ **SUPPORTED**",
+    "corrected": "⚠️ **CORRECTED**",
+    "unverified": "⚠️ **UNVERIFIED**",
+    "refuted": "❌ **REFUTED**",
+    "unchecked": "⚠️ **NOT CHECKED**",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verified_claims (
+    client TEXT NOT NULL,
+    claim_key TEXT NOT NULL,
+    claim TEXT NOT NULL,
+    status TEXT NOT NULL,
+    verdict TEXT,
+    correction TEXT,
+    sources TEXT,
+    checked_at TEXT NOT NULL,
+    expires_at TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (client, claim_key)
+);
+CREATE INDEX IF NOT EXISTS idx_claims_expiry ON verified_claims (client, expires_at);
+"""
+
+VERIFY_PROMPT = (
+    "You are a ruthless Fact-Checker. You will receive numbered factual claims taken from "
+    "content written for one client. Verify each claim independently using web search "
+    "against official primary sources (statutes, regulations, agencies, licensing boards, "
+    "peer-reviewed studies). Pay special attention to legal and code citations, hours, "
+    "limits and quotas, retention periods, statistics and penalties, and named people or "
+    "organisations.\n\n"
+    "Reply with ONLY a JSON array, one object per claim, no commentary:\n"
+    '[{"id": 1, "status": "supported|corrected|unverified|refuted", '
+    '"verdict": "one sentence on what the primary source says", '
+    '"correction": "the accurate sentence, or empty when supported", '
+    '"sources": [1, 2]}]\n'
+    "sources are indexes into your citations. Use \"unverified\" when no primary source "
+    "confirms the claim, \"corrected\" when a detail is wrong but fixable, and \"refuted\" "
+    "when the claim is false."
+)
+
+CITATION_MARK = re.compile(r"(?:\[\d+\])+")
+MARKDOWN = re.compile(r"\*\*|__|`|^\s*(?:#{1,6}|[-*+]|\d+[.)])\s+", re.M)
+SENTENCE_END = re.compile(r"[.!?][\"'”’)]*\s+(?=[\"“(]?[A-Z0-9])")
+ABBREVIATION = re.compile(r"(?:\b[A-Za-z]|\b(?:Dr|Mr|Mrs|Ms|Jr|Sr|St|No|Nos|vs|etc|Inc|Ltd|Co|Corp|"
+                          r"Sec|Art|Fig|Vol|approx|Rev|Stat|Ann|Admin|Reg|Gov|Dept)|e\.g|i\.e|U\.S|C\.F\.R)\.$")
+CHECKABLE = re.compile(
+    r"\d|%|\$|§|\bpercent\b|\bper cent\b|\b(?:CFR|C\.F\.R|U\.S\.C|USC|Act|Code|Rule|Regulation|"
+    r"Statute|Section|Title)\b|\b[A-Z]{2,}s?\b")
+LEADING_CONNECTIVE = re.compile(r"^(?:however|additionally|in addition|also|moreover|furthermore|importantly|"
+                                r"for example|for instance|in fact|notably|as a result|overall|today),\s+")
+MIN_WORDS, MAX_WORDS = 5, 60
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _iso(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def client_key(client):
+    return " ".join((client or "").lower().split())
+
+
+def normalise_claim(text):
+    """Canonical claim text: the part of the cache key that survives rewording of trivia."""
+    text = unicodedata.normalize("NFKC", text)
+    text = text.translate(str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'", "–": "-", "—": "-",
+                                         "‑": "-", " ": " "}))
+    text = CITATION_MARK.sub("", MARKDOWN.sub("", text)).lower()
+    text = re.sub(r"\bper ?cent\b", "%", text)
+    text = re.sub(r"(\d)\s+%", r"\1%", text)
+    text = re.sub(r"(?<=\d),(?=\d{3}\b)", "", text)
+    text = re.sub(r"\bc\.f\.r\.?", "cfr", text)
+    text = re.sub(r"\bu\.s\.c\.?", "usc", text)
+    text = re.sub(r"§+\s*", "§", text)
+    text = re.sub(r"\s*&\s*", " and ", text)
+    text = LEADING_CONNECTIVE.sub("", " ".join(text.split()).strip(" \"'"))
+    text = " ".join(text.replace(",", " ").split())
+    return text.rstrip(" .;:!?\"'")
+
+
+def claim_key(normalised):
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()[:16]
+
+
+def split_sentences(text):
+    """Sentences of prose, markdown and [n] markers stripped; headings and meta lines dropped."""
+    for block in re.split(r"\n\s*\n|\n(?=\s*(?:#|[-*+]\s|\d+[.)]\s))", text):
+        block = block.strip()
+        if not block or block.startswith("#") or re.match(r"^(?:meta (?:title|description)|title):", block, re.I):
+            continue
+        block = " ".join(CITATION_MARK.sub("", MARKDOWN.sub("", block)).split())
+        start = 0
+        for match in SENTENCE_END.finditer(block):
+            if ABBREVIATION.search(block[start:match.start() + 1]):
+                continue
+            yield block[start:match.start() + 1].strip()
+            start = match.end()
+        if block[start:].strip():
+            yield block[start:].strip()
+
+
+def extract_claims(text):
+    """Checkable claims in text order, deduplicated on their normalised form."""
+    claims, seen = [], set()
+    for sentence in split_sentences(text):
+        words = len(sentence.split())
+        if not MIN_WORDS <= words <= MAX_WORDS or not CHECKABLE.search(sentence):
+            continue
+        normalised = normalise_claim(sentence)
+        key = claim_key(normalised)
+        if key in seen:
+            continue
+        seen.add(key)
+        claims.append({"claim": sentence, "normalised": normalised, "key": key})
+    return claims
+
+
+class ClaimCache:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def lookup(self, client, claims, now=None):
+        """-> ({key: cached row} for live entries, [claims to verify], number of expired entries)."""
+        now = _iso(now or _now())
+        client = client_key(client)
+        keys = [c["key"] for c in claims]
+        rows = {}
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                cur = self.db.execute(
+                    f"SELECT claim_key, claim, status, verdict, correction, sources, checked_at, expires_at "
+                    f"FROM verified_claims WHERE client = ? AND claim_key IN ({','.join('?' * len(chunk))})",
+                    [client, *chunk])
+                for key, claim, status, verdict, correction, sources, checked_at, expires_at in cur:
+                    rows[key] = {"claim": claim, "status": status, "verdict": verdict, "correction": correction,
+                                 "sources": json.loads(sources or "[]"), "checked_at": checked_at,
+                                 "expires_at": expires_at}
+            hits = {k: row for k, row in rows.items() if row["expires_at"] > now}
+            if hits:
+                self.db.executemany("UPDATE verified_claims SET hits = hits + 1 WHERE client = ? AND claim_key = ?",
+                                    [(client, k) for k in hits])
+                self.db.commit()
+        misses = [c for c in claims if c["key"] not in hits]
+        return hits, misses, len(rows) - len(hits)
+
+    def store(self, client, claims, verdicts, now=None):
+        """Cache verdicts ({key: verdict}) for claims; claims without a verdict are not cached."""
+        now = now or _now()
+        rows = []
+        for c in claims:
+            v = verdicts.get(c["key"])
+            if not v or v["status"] not in TTL_DAYS:
+                continue
+            rows.append((client_key(client), c["key"], c["normalised"], v["status"], v.get("verdict", ""),
+                         v.get("correction", ""), json.dumps(v.get("sources", [])), _iso(now),
+                         _iso(now + timedelta(days=TTL_DAYS[v["status"]]))))
+        with self.lock:
+            self.db.executemany(
+                "INSERT INTO verified_claims (client, claim_key, claim, status, verdict, correction, sources, "
+                "checked_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (client, claim_key) DO UPDATE SET status = excluded.status, "
+                "verdict = excluded.verdict, correction = excluded.correction, sources = excluded.sources, "
+                "checked_at = excluded.checked_at, expires_at = excluded.expires_at", rows)
+            self.db.commit()
+        return len(rows)
+
+    def stats(self, now=None):
+        now = _iso(now or _now())
+        return self.db.execute(
+            "SELECT client, status, COUNT(*), SUM(expires_at <= ?), SUM(hits) FROM verified_claims "
+            "GROUP BY client, status ORDER BY client, status", (now,)).fetchall()
+
+
+def _post_json(url, body, api_key=None, timeout=600):
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), headers=headers, method="POST")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def parse_verdicts(response, batch):
+    """{claim key: verdict} from a chat completion answering one numbered batch."""
+    content = (response.get("choices") or [{}])[0].get("message", {}).get("content", "")
+    citations = response.get("citations") or []
+    start, end = content.find("["), content.rfind("]")
+    try:
+        items = json.loads(content[start:end + 1]) if start != -1 else []
+    except ValueError:
+        items = []
+    verdicts = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            claim = batch[int(item.get("id")) - 1]
+        except (TypeError, ValueError, IndexError):
+            continue
+        status = str(item.get("status", "")).lower()
+        sources = []
+        for s in item.get("sources") or []:
+            if isinstance(s, int) and 1 <= s <= len(citations):
+                sources.append(citations[s - 1])
+            elif isinstance(s, str) and s.startswith("http"):
+                sources.append(s)
+        verdicts[claim["key"]] = {"status": status if status in TTL_DAYS else "unverified",
+                                  "verdict": str(item.get("verdict") or ""),
+                                  "correction": str(item.get("correction") or ""), "sources": sources}
+    return verdicts
+
+
+def verify_claims(claims, client, base_url=DEFAULT_BASE_URL, api_key=None, model=MODEL,
+                  batch_size=BATCH_SIZE, workers=4):
+    """Send claims to Perplexity in numbered batches -> ({key: verdict}, requests sent)."""
+    batches = [claims[i:i + batch_size] for i in range(0, len(claims), batch_size)]
+
+    def one(batch):
+        listing = "\n".join(f"{n}. {c['claim']}" for n, c in enumerate(batch, 1))
+        body = {"model": model, "temperature": 0, "messages": [
+            {"role": "system", "content": VERIFY_PROMPT},
+            {"role": "user", "content": f"Client: {client}\n\nClaims to verify:\n{listing}"}]}
+        try:
+            return parse_verdicts(_post_json(f"{base_url.rstrip('/')}/chat/completions", body, api_key), batch)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            print(f"WARNING: verification batch of {len(batch)} claim(s) failed: {e}", file=sys.stderr)
+            return {}
+
+    verdicts = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches) or 1))) as pool:
+        for result in pool.map(one, batches):
+            verdicts.update(result)
+    return verdicts, len(batches)
+
+
+def render_report(entries):
+    """Merged report in the fact checkers' **Claim:** / **Status:** format."""
+    lines = ["## Fact-Check Report", ""]
+    for n, e in enumerate(entries, 1):
+        origin = f"cached, verified {e['checked_at'][:10]}" if e.get("cached") else "verified now"
+        lines.append(f"### Claim {n}")
+        lines.append("")
+        lines.append(f"**Claim:** “{e['claim']}”")
+        lines.append("")
+        if e.get("verdict"):
+            lines.append(f"- **Verification:** {e['verdict']}")
+        lines.append(f"- **Status:** {STATUS_MARK.get(e['status'], e['status'])} ({origin})"
+                     if e["status"] != "unchecked" else f"- **Status:** {STATUS_MARK['unchecked']}")
+        if e.get("correction") and e["status"] != "supported":
+            lines.append(f"- **Correction:** {e['correction']}")
+        if e.get("sources"):
+            lines.append(f"- **Sources:** {', '.join(e['sources'])}")
+        lines.append("")
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def fact_check(text, client, cache, verify, now=None):
+    """Extract claims, verify only unseen/expired ones via verify(claims) -> ({key: verdict}, requests)."""
+    now = now or _now()
+    claims = extract_claims(text)
+    hits, misses, expired = cache.lookup(client, claims, now)
+    verdicts, requests = verify(misses) if misses else ({}, 0)
+    cache.store(client, misses, verdicts, now)
+    entries = []
+    for c in claims:
+        if c["key"] in hits:
+            entries.append({**hits[c["key"]], "claim": c["claim"], "cached": True})
+        elif c["key"] in verdicts:
+            entries.append({**verdicts[c["key"]], "claim": c["claim"], "checked_at": _iso(now), "cached": False})
+        else:
+            entries.append({"claim": c["claim"], "status": "unchecked"})
+    return {
+        "report": render_report(entries),
+        "claims": entries,
+        "stats": {"claims": len(claims), "cached": len(hits), "expired": expired, "sent": len(misses),
+                  "verified": len(verdicts), "requests": requests},
+    }
+
+
+class FactCheckHandler(BaseHTTPRequestHandler):
+    cache = None
+    verify_options = {}
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/fact-check":
+            self._reply(404, {"error": "POST /fact-check"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self._reply(400, {"error": "invalid JSON"})
+            return
+        client, text = body.get("client"), body.get("text")
+        if not client or not isinstance(text, str):
+            self._reply(400, {"error": "client and text are required"})
+            return
+        result = fact_check(text, client, self.cache,
+                            lambda claims: verify_claims(claims, client, **self.verify_options))
+        s = result["stats"]
+        print(f"  {client}: {s['claims']} claim(s), {s['cached']} cached, {s['sent']} sent "
+              f"({s['expired']} expired) in {s['requests']} request(s)")
+        self._reply(200, result)
+
+    def _reply(self, status, data):
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class SonarStub(BaseHTTPRequestHandler):
+    """sonar-pro /chat/completions stand-in: JSON verdicts per numbered claim, latency per claim."""
+    median_ms = 400.0
+    ms_per_claim = 40.0
+    sigma = 0.4
+    rng = random.Random(7)
+    lock = threading.Lock()
+    calls = 0
+    claims = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        user = next((m["content"] for m in body.get("messages", []) if m.get("role") == "user"), "")
+        numbered = re.findall(r"^(\d+)\. (.+)$", user, re.M)
+        verdicts = []
+        for n, claim in numbered:
+            # Deterministic: percentages are "unverified", everything else "supported"
+            status = "unverified" if "%" in claim or "percent" in claim.lower() else "supported"
+            verdicts.append({"id": int(n), "status": status, "verdict": f"Stub verdict for claim {n}.",
+                             "correction": "" if status == "supported" else "Qualify or remove this figure.",
+                             "sources": [1]})
+        with self.lock:
+            SonarStub.calls += 1
+            SonarStub.claims += len(numbered)
+            delay = self.rng.lognormvariate(0, self.sigma) * self.median_ms + len(numbered) * self.ms_per_claim
+        time.sleep(delay / 1000)
+        data = json.dumps({
+            "id": "stub", "model": body.get("model"), "object": "chat.completion",
+            "citations": ["https://example.gov/primary-source"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(verdicts)}}],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def fact_check_inputs(execution, client=None):
+    """(client, texts) the Pre-Draft and Post-Draft Fact Checkers were sent in a recorded run, in order."""
+    body = (run_output(execution, "Webhook1") or [{}])[0].get("json", {}).get("body") or {}
+    client = client or body.get("client_name")
+    brief = body.get("creative_brief") or ""
+    runs = execution["data"]["resultData"]["runData"]
+    texts = [brief for _ in runs.get("Pre-Draft Fact Checker") or []]
+    for run in range(len(runs.get("Post-Draft Fact Checker") or [])):
+        gaps = (run_output(execution, "Data Check & Research Gaps1", run) or [{}])[0].get("json", {})
+        report = gaps.get("message", {}).get("content") or \
+            ((gaps.get("choices") or [{}])[0].get("message") or {}).get("content") or gaps.get("text", "")
+        texts.append(f"{brief}\n\n{report}")
+    return client, [t for t in texts if t.strip()]
+
+
+def bench(inputs, batch_size, workers):
+    """Replay [(client, text)] in order, each text through a fresh cache and through one shared cache."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SonarStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    clients = {client_key(client) for client, _ in inputs}
+    print(f"sonar-pro stand-in on :{server.server_port}: lognormal median {SonarStub.median_ms:.0f}ms/request "
+          f"+ {SonarStub.ms_per_claim:.0f}ms/claim")
+    print(f"{len(inputs)} fact-check input(s) for {len(clients)} client(s), "
+          f"~{statistics.mean(len(extract_claims(t)) for _, t in inputs):.0f} claim(s) each, "
+          f"batches of {batch_size}\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, persistent in (("no cache", False), ("claim cache", True)):
+            SonarStub.calls = SonarStub.claims = 0
+            SonarStub.rng.seed(7)
+            shared = ClaimCache(os.path.join(tmp, "bench.sqlite")) if persistent else None
+            latencies = []
+            for i, (client, text) in enumerate(inputs):
+                cache = shared or ClaimCache(os.path.join(tmp, f"fresh_{i}.sqlite"))
+                start = time.perf_counter()
+                fact_check(text, client, cache,
+                           lambda claims: verify_claims(claims, client, base, None, MODEL, batch_size, workers))
+                latencies.append((time.perf_counter() - start) * 1000)
+            results[label] = (latencies, SonarStub.calls, SonarStub.claims)
+            print(f"{label:<12} {SonarStub.calls:>4} request(s)  {SonarStub.claims:>5} claim(s) sent  "
+                  f"p50 {statistics.median(latencies):6.0f}ms  p95 {percentile(latencies, 95):6.0f}ms  "
+                  f"total {sum(latencies) / 1000:.1f}s")
+    server.shutdown()
+    (before, _, sent_before), (after, _, sent_after) = results["no cache"], results["claim cache"]
+    print(f"\nClaims sent to Perplexity: {sent_before} -> {sent_after} "
+          f"({1 - sent_after / max(sent_before, 1):.0%} fewer); per input p50 "
+          f"{statistics.median(before) / max(statistics.median(after), 1):.1f}x faster")
+    return sent_before, sent_after
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="Perplexity API base (or the cache proxy route)")
+    parser.add_argument("--api-key", default=os.environ.get("PERPLEXITY_API_KEY"))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Claims per Perplexity request")
+    parser.add_argument("--workers", type=int, default=4, help="Perplexity requests in flight")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("check", help="Fact-check text files for one client")
+    check.add_argument("files", nargs="+")
+    check.add_argument("--client", required=True)
+    check.add_argument("-o", "--output", help="Write the merged report here")
+    serve = sub.add_parser("serve", help="Serve POST /fact-check")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to bind (default: {DEFAULT_HOST})")
+    sub.add_parser("stats", help="Cached claims per client and status")
+    bench_cmd = sub.add_parser("bench", help="Replay recorded fact-check inputs through a local sonar-pro stub")
+    bench_cmd.add_argument("files", nargs="+", help="Execution exports, oldest first")
+    bench_cmd.add_argument("--client", help="Override the client (default: Webhook1 client_name)")
+    bench_cmd.add_argument("--median-ms", type=float, default=SonarStub.median_ms, help="Stand-in median latency/request")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        SonarStub.median_ms = args.median_ms
+        inputs = []
+        for path in args.files:
+            client, texts = fact_check_inputs(load_execution(path), args.client)
+            if not client or not texts:
+                print(f"  - {path}: no fact-check input" + ("" if client else " or client name"))
+                continue
+            print(f"  + {path}: {len(texts)} input(s) for '{client}'")
+            inputs.extend((client, text) for text in texts)
+        if not inputs:
+            print("❌ Nothing to replay")
+            sys.exit(1)
+        print()
+        bench(inputs, args.batch_size, args.workers)
+        return
+
+    cache = ClaimCache(args.db)
+    verify_options = {"base_url": args.base_url, "api_key": args.api_key, "batch_size": args.batch_size,
+                      "workers": args.workers}
+    if args.command == "check":
+        if not args.api_key and args.base_url == DEFAULT_BASE_URL:
+            print("WARNING: no PERPLEXITY_API_KEY; only cached verdicts will be available")
+        reports = []
+        for path in args.files:
+            with open(path, "r", encoding="utf-8") as f:
+                result = fact_check(f.read(), args.client, cache,
+                                    lambda claims: verify_claims(claims, args.client, **verify_options))
+            s = result["stats"]
+            print(f"  {path}: {s['claims']} claim(s), {s['cached']} cached, {s['sent']} sent to Perplexity "
+                  f"({s['expired']} expired, {s['verified']} verified)")
+            reports.append(result["report"])
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write("\n".join(reports))
+            print(f"\n✅ Report written to {args.output}")
+        else:
+            print("\n" + "\n".join(reports))
+    elif args.command == "serve":
+        FactCheckHandler.cache = cache
+        FactCheckHandler.verify_options = verify_options
+        server = ThreadingHTTPServer((args.host, args.port), FactCheckHandler)
+        print(f"Claim cache on http://{args.host}:{args.port}/fact-check -> {args.base_url} ({args.db})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "stats":
+        rows = cache.stats()
+        if not rows:
+            print("Cache is empty")
+            return
+        print(f"{'client':<35} {'status':<11} {'claims':>6} {'expired':>7} {'hits':>6}")
+        for client, status, n, expired, hits in rows:
+            print(f"{client[:35]:<35} {status:<11} {n:>6} {expired or 0:>7} {hits or 0:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """Update Send Test Result to capture real scoring data from upstream agents."""
 import json
 
+from workflow_validator import check_workflow
+
 filepath = r"DEV Skywide  Content (20).json"
 with open(filepath, "r", encoding="utf-8") as f:
     wf = json.load(f)
@@ -139,6 +141,7 @@ try {
         print("  Updated Send Test Result with real scoring capture")
         break
 
+check_workflow(wf, filepath)
 with open(filepath, "w", encoding="utf-8") as f:
     json.dump(wf, f, indent=2, ensure_ascii=False)
 
@@ -1,6 +1,8 @@
 import json
 import re
 
+from workflow_validator import check_workflow
+
 file_path = r'c:\Users\A.hydar\Documents\production\Skywide-project-main\DEV Skywide  Content (TEST v23).json'
 
 target_qa_nodes = [
@@ -89,6 +91,7 @@ try:
             count += 1
             print(f"Updated node: {node['name']}")
 
+    check_workflow(data, file_path)
     with open(file_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
 
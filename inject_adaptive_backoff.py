@@ -0,0 +1,168 @@
+"""
+Replace fixed Wait nodes in front of LLM nodes with adaptive backoff.
+
+Each Wait -> LLM pair becomes:
+
+  source -> LLM --(error output)--> Backoff <LLM> (Code) -> Backoff Wait <LLM> -> LLM
+
+The LLM node routes failures to its error output. The Backoff code node only
+retries rate-limit errors (429 / overloaded), with exponential delay + jitter,
+and re-emits the LLM's original input so `$json` expressions keep resolving.
+Successful calls no longer pay any idle time.
+
+Base delay is derived from the Wait durations observed in execution exports.
+
+Usage:
+  python inject_adaptive_backoff.py "PROD Skywide Content v23.json" --execution execution_2764_full.json
+"""
+import argparse
+import statistics
+import sys
+
+from n8n_utils import (
+    CODE_TYPE, LLM_CHAIN_TYPES, LLM_TYPES, WAIT_TYPE,
+    bypass_node, gen_id, load_execution, load_workflow, node_index,
+    node_timings, predecessors, save_workflow, successors,
+)
+
+DEFAULT_BASE_MS = 5000
+DEFAULT_MAX_ATTEMPTS = 4
+
+BACKOFF_CODE = r"""// Adaptive backoff for __LLM__: only rate-limit errors are retried
+const err = $json.error || $json;
+const text = JSON.stringify(err).toLowerCase();
+const rateLimited = /\b429\b|rate.?limit|too many requests|overloaded|\b529\b/.test(text);
+const attempt = $runIndex + 1;
+
+if (!rateLimited || attempt > __MAX_ATTEMPTS__) {
+  throw new Error(`__LLM__ failed after ${attempt} attempt(s): ${err.message || text.slice(0, 300)}`);
+}
+
+const delayMs = Math.min(__BASE_MS__ * 2 ** (attempt - 1), __CAP_MS__);
+const jitterMs = Math.random() * delayMs * 0.2;
+console.log(`Rate limited on __LLM__, attempt ${attempt}, backing off ${Math.round(delayMs + jitterMs)}ms`);
+
+// Re-emit the LLM's original input so its $json expressions still resolve
+return [{ json: { ...$('__SOURCE__').first().json, backoff_seconds: Math.round((delayMs + jitterMs) / 100) / 10 } }];
+"""
+
+
+def observed_waits(executions, wait_names):
+    """Durations (ms) of the given Wait nodes across all exports, plus per-execution idle totals."""
+    waits, per_execution = [], []
+    for execution in executions:
+        total = 0
+        for name, times in node_timings(execution).items():
+            if name in wait_names:
+                waits.extend(times)
+                total += sum(times)
+        per_execution.append((execution.get("id"), total))
+    return waits, per_execution
+
+
+def wait_llm_pairs(wf):
+    """(wait, llm, source) for each Wait node whose single target is an LLM node."""
+    by_name = node_index(wf)
+    succ, pred = successors(wf), predecessors(wf)
+    pairs = []
+    for node in wf["nodes"]:
+        if node["type"] != WAIT_TYPE:
+            continue
+        targets = succ.get(node["name"], [])
+        sources = pred.get(node["name"], [])
+        if len(targets) != 1 or len(sources) != 1:
+            print(f"  ! Skipping {node['name']}: expected one source and one target")
+            continue
+        target = by_name[targets[0]]
+        if target["type"] not in LLM_TYPES | LLM_CHAIN_TYPES:
+            print(f"  ! Skipping {node['name']}: {target['name']} is not an LLM node")
+            continue
+        pairs.append((node["name"], target["name"], sources[0]))
+    return pairs
+
+
+def inject(wf, pairs, base_ms, max_attempts):
+    by_name = node_index(wf)
+    cap_ms = base_ms * 2 ** (max_attempts - 1)
+    for wait_name, llm_name, source in pairs:
+        bypass_node(wf, wait_name)
+        llm = by_name[llm_name]
+        # Retries are owned by the backoff loop now, so a 429 isn't retried twice
+        llm["onError"] = "continueErrorOutput"
+        for key in ("retryOnFail", "maxTries", "waitBetweenTries"):
+            llm.pop(key, None)
+        x, y = llm["position"]
+
+        code_name = f"Backoff {llm_name}"
+        wait_name_new = f"Backoff Wait {llm_name}"
+        js = (BACKOFF_CODE.replace("__LLM__", llm_name)
+              .replace("__SOURCE__", source)
+              .replace("__MAX_ATTEMPTS__", str(max_attempts))
+              .replace("__BASE_MS__", str(base_ms))
+              .replace("__CAP_MS__", str(cap_ms)))
+        wf["nodes"].append({
+            "parameters": {"jsCode": js},
+            "type": CODE_TYPE,
+            "typeVersion": 2,
+            "position": [x + 200, y + 300],
+            "id": gen_id(),
+            "name": code_name,
+            "notesInFlow": True,
+            "notes": f"429 backoff (replaces {wait_name})",
+        })
+        wf["nodes"].append({
+            "parameters": {"resume": "timeInterval", "amount": "={{ $json.backoff_seconds }}", "unit": "seconds"},
+            "type": WAIT_TYPE,
+            "typeVersion": 1.1,
+            "position": [x, y + 300],
+            "id": gen_id(),
+            "name": wait_name_new,
+            "webhookId": gen_id(),
+        })
+
+        main = wf["connections"].setdefault(llm_name, {}).setdefault("main", [[]])
+        while len(main) < 2:
+            main.append([])
+        main[1] = [{"node": code_name, "type": "main", "index": 0}]
+        wf["connections"][code_name] = {"main": [[{"node": wait_name_new, "type": "main", "index": 0}]]}
+        wf["connections"][wait_name_new] = {"main": [[{"node": llm_name, "type": "main", "index": 0}]]}
+        print(f"  ~ {wait_name} -> backoff loop on {llm_name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workflow")
+    parser.add_argument("-o", "--output", help="Output path (default: overwrite input)")
+    parser.add_argument("--execution", action="append", default=[],
+                        help="Execution export(s) to derive delays from (repeatable)")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    args = parser.parse_args()
+
+    wf = load_workflow(args.workflow)
+    if any(n["name"].startswith("Backoff ") for n in wf["nodes"]):
+        print("WARNING: Workflow already has backoff nodes. Skipping to avoid duplicates.")
+        sys.exit(0)
+
+    pairs = wait_llm_pairs(wf)
+    executions = [load_execution(p) for p in args.execution]
+    # Only the Waits being replaced: skipped ones keep their delay in every run
+    waits, per_execution = observed_waits(executions, {wait for wait, _, _ in pairs})
+    base_ms = int(statistics.median(waits)) if waits else DEFAULT_BASE_MS
+    print(f"Base backoff: {base_ms}ms (median of {len(waits)} observed waits), "
+          f"max {args.max_attempts} attempts")
+
+    inject(wf, pairs, base_ms, args.max_attempts)
+
+    save_workflow(wf, args.output or args.workflow)
+    print(f"\n✅ Replaced {len(pairs)} Wait nodes. Re-import into n8n.")
+
+    if per_execution:
+        print("\nIdle time removed per run (no rate limit hit):")
+        for exec_id, total in per_execution:
+            print(f"  execution {exec_id}: {total / 1000:.1f}s")
+        avg = sum(t for _, t in per_execution) / len(per_execution)
+        print(f"  average: {avg / 1000:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,59 @@
+import copy
 import json
+import sys
 import uuid
 
+from n8n_utils import load_execution, execution_wall_ms, node_timings, predecessors, reachable, successors, timestamp_ms
+from workflow_validator import check_workflow
+
+# --parallel: run the Pre-Draft Fact Checker on its own branch off Parse Creative Brief (LLM),
+# joined by a Merge in front of the draft generators, instead of serially before Keyword Strategist.
+# --timing <execution export>: print the serial vs parallel timing for that run and exit.
+WORKFLOW = 'TEST Skywide Content (Prompt Review).json'
+PRE_DRAFT_NAME = 'Pre-Draft Fact Checker'
+POST_DRAFT_NAME = 'Post-Draft Fact Checker'
+REPORT_MARKER = "CRITICAL FACT-CHECK REPORT (OVERRIDE BRIEF FACTS):\n"
+DRAFT_NODES = ['OpenAI Draft (GPT-4O)1', 'Claude Draft (Claude Opus 3)1']
+MERGE_NAME = 'Merge Fact Check'
+
 def generate_id():
     return str(uuid.uuid4())
 
-with open('TEST Skywide Content (Prompt Review).json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+def report_timing(path):
+    execution = load_execution(path)
+    wf = execution['workflowData']
+    runs = execution['data']['resultData']['runData']
+    timings = node_timings(execution)
+    checker = 'Pre-Draft Fact Checker'
+    if checker not in runs:
+        print(f"No {checker} runs in {path}")
+        return
 
-# --- 1. Pre-Draft Fact Checker ---
-pre_draft_id = generate_id()
-pre_draft_name = 'Pre-Draft Fact Checker'
+    # Nodes between Parse Creative Brief (LLM) and the drafts, other than the checker
+    succ, pred = successors(wf), predecessors(wf)
+    draft_sources = {p for d in DRAFT_NODES for p in pred.get(d, [])}
+    upstream = set().union(*(reachable(s, pred) | {s} for s in draft_sources))
+    branch = (reachable('Parse Creative Brief (LLM)', succ) & upstream) - {checker, MERGE_NAME}
 
-pre_draft_node = {
+    checker_ms = timings[checker][0]
+    branch_ms = sum((timings.get(n) or [0])[0] for n in branch)
+    print(f"Execution {execution.get('id')} ({execution_wall_ms(execution) / 1000:.1f}s wall clock)")
+    print(f"  {checker}: {checker_ms / 1000:.1f}s")
+    print(f"  Keyword Strategist branch ({len(branch)} nodes): {branch_ms / 1000:.1f}s")
+    print(f"  Serial layout:   {(checker_ms + branch_ms) / 1000:.1f}s to the drafts")
+    print(f"  Parallel layout: {max(checker_ms, branch_ms) / 1000:.1f}s to the drafts "
+          f"(saves {min(checker_ms, branch_ms) / 1000:.1f}s when the branches overlap)")
+
+    # Each extra checker run re-triggers the whole downstream pipeline
+    starts = sorted(r['startTime'] for r in runs[checker])
+    if len(starts) > 1:
+        dup_ms = timestamp_ms(execution['stoppedAt']) - starts[1]
+        sources = [s.get('previousNode') for r in runs[checker] for s in r.get('source') or []]
+        print(f"  ! {checker} ran {len(starts)}x (from {', '.join(sources)}); "
+              f"the duplicate pass took ~{dup_ms / 1000:.1f}s. The Merge layout runs it once.")
+
+# --- 1. Pre-Draft Fact Checker ---
+PRE_DRAFT_NODE = {
   "parameters": {
     "model": "sonar-pro",
     "messages": {
@@ -30,8 +72,7 @@ pre_draft_node = {
   "type": "n8n-nodes-base.perplexity",
   "typeVersion": 1,
   "position": [0, 0],
-  "id": pre_draft_id,
-  "name": pre_draft_name,
+  "name": PRE_DRAFT_NAME,
   "credentials": {
     "perplexityApi": {
       "id": "iuHSBzk6FDLpyJRT",
@@ -40,38 +81,52 @@ pre_draft_node = {
   }
 }
 
-for n in data['nodes']:
-    if n['name'] == 'Parse Creative Brief (LLM)':
-        pre_draft_node['position'] = [n['position'][0] + 150, n['position'][1] + 100]
-
-# Rewire Parse Creative Brief (LLM) -> Pre-Draft Fact Checker -> Keyword Strategist
-if 'Parse Creative Brief (LLM)' in data['connections']:
-    conns = data['connections']['Parse Creative Brief (LLM)']['main'][0]
-    new_conns = [c for c in conns if c['node'] != 'Keyword Strategist']
-    new_conns.append({
-        "node": pre_draft_name,
-        "type": "main",
-        "index": 0
-    })
-    data['connections']['Parse Creative Brief (LLM)']['main'][0] = new_conns
-
-data['connections'][pre_draft_name] = {
-    "main": [
-        [
-            {
-                "node": "Keyword Strategist",
-                "type": "main",
-                "index": 0
-            }
+PARALLEL_REPORT_EXPR = ("{{ $('Pre-Draft Fact Checker').first().json.message?.content || "
+                        "$('Pre-Draft Fact Checker').first().json.choices?.[0]?.message?.content || '' }}")
+SERIAL_REPORT_EXPR = "{{ $('Keyword Strategist').first().json.fact_check_report || '' }}"
+
+
+def _node(data, name):
+    return next((n for n in data['nodes'] if n['name'] == name), None)
+
+
+def _new_node(data, template, anchor):
+    node = copy.deepcopy(template)
+    node['id'] = generate_id()
+    source = _node(data, anchor)
+    if source:
+        node['position'] = [source['position'][0] + 150, source['position'][1] + 100]
+    data['nodes'].append(node)
+    return node
+
+
+def rewire_serial(data):
+    # Rewire Parse Creative Brief (LLM) -> Pre-Draft Fact Checker -> Keyword Strategist
+    if 'Parse Creative Brief (LLM)' in data['connections']:
+        conns = data['connections']['Parse Creative Brief (LLM)']['main'][0]
+        new_conns = [c for c in conns if c['node'] not in ('Keyword Strategist', PRE_DRAFT_NAME)]
+        new_conns.append({
+            "node": PRE_DRAFT_NAME,
+            "type": "main",
+            "index": 0
+        })
+        data['connections']['Parse Creative Brief (LLM)']['main'][0] = new_conns
+
+    data['connections'][PRE_DRAFT_NAME] = {
+        "main": [
+            [
+                {
+                    "node": "Keyword Strategist",
+                    "type": "main",
+                    "index": 0
+                }
+            ]
         ]
-    ]
-}
-data['nodes'].append(pre_draft_node)
+    }
 
-# Inject into Keyword Strategist code
-for n in data['nodes']:
-    if n['name'] == 'Keyword Strategist':
-        code = n['parameters']['jsCode']
+    # Inject into Keyword Strategist code
+    n = _node(data, 'Keyword Strategist')
+    if n and 'fact_check_report:' not in n['parameters']['jsCode']:
         # add extraction
         injection = """
 let factCheckReport = '';
@@ -81,27 +136,73 @@ try {
 } catch(e) { console.log('Fact check extract failed', e); }
 """
         # insert before return
+        code = n['parameters']['jsCode']
         code = code.replace("return {\n  json: {", injection + "\nreturn {\n  json: {\n    fact_check_report: factCheckReport,")
         n['parameters']['jsCode'] = code
 
-# Inject into Draft Prompts
-def inject_draft(node_name):
-    for n in data['nodes']:
-        if n['name'] == node_name:
-            if 'messages' in n.get('parameters', {}) and 'values' in n['parameters']['messages']:
-                for val in n['parameters']['messages']['values']:
-                    if val.get('role') == 'system':
-                        val['content'] += "\n\nCRITICAL FACT-CHECK REPORT (OVERRIDE BRIEF FACTS):\n{{ $('Keyword Strategist').first().json.fact_check_report || '' }}"
 
-inject_draft('OpenAI Draft (GPT-4O)1')
-inject_draft('Claude Draft (Claude Opus 3)1')
+def rewire_parallel(data):
+    # Parse Creative Brief (LLM) -> Pre-Draft Fact Checker -> Merge Fact Check (input 2)
+    # <draft source, e.g. Clean1>                         -> Merge Fact Check (input 1) -> drafts
+    conns = data['connections']
+    # The checker only reads Parse Creative Brief (LLM); any other edge into it would start
+    # a second full pipeline pass, so those sources go straight to where the checker went.
+    # Parse Creative Brief (LLM) keeps its edge and also feeds those targets (a serial layout's
+    # Keyword Strategist would otherwise lose its only input).
+    old_targets = [t for t in conns.pop(PRE_DRAFT_NAME, {}).get('main', [[]])[0] if t['node'] != MERGE_NAME]
+    for source, outputs in conns.items():
+        for idx, targets in enumerate(outputs.get('main') or []):
+            if not targets or not any(t['node'] == PRE_DRAFT_NAME for t in targets):
+                continue
+            kept = [t for t in targets if source == 'Parse Creative Brief (LLM)' or t['node'] != PRE_DRAFT_NAME]
+            kept += [dict(t) for t in old_targets if t not in kept]
+            outputs['main'][idx] = kept
+    parse_main = conns.setdefault('Parse Creative Brief (LLM)', {'main': [[]]})['main']
+    if not any(t['node'] == PRE_DRAFT_NAME for t in parse_main[0]):
+        parse_main[0].append({"node": PRE_DRAFT_NAME, "type": "main", "index": 0})
 
+    merge_node = _node(data, MERGE_NAME)
+    if not merge_node:
+        merge_node = {
+            "parameters": {
+                "mode": "chooseBranch",
+                "chooseBranchMode": "waitForAll",
+                "output": "specifiedInput",
+                "useDataOfInput": 1
+            },
+            "type": "n8n-nodes-base.merge",
+            "typeVersion": 3.2,
+            "position": [0, 0],
+            "id": generate_id(),
+            "name": MERGE_NAME,
+            "notesInFlow": True,
+            "notes": "Waits for the Pre-Draft Fact Checker branch, passes input 1 through"
+        }
+        data['nodes'].append(merge_node)
+    for source, outputs in list(conns.items()):
+        if source == MERGE_NAME:
+            continue
+        for idx, targets in enumerate(outputs.get('main') or []):
+            if targets and any(t['node'] in DRAFT_NODES for t in targets):
+                outputs['main'][idx] = [t for t in targets if t['node'] not in DRAFT_NODES]
+                outputs['main'][idx].append({"node": MERGE_NAME, "type": "main", "index": 0})
+                merge_node['position'] = [_node(data, source)['position'][0] + 150, _node(data, source)['position'][1]]
+    conns[PRE_DRAFT_NAME] = {"main": [[{"node": MERGE_NAME, "type": "main", "index": 1}]]}
+    conns[MERGE_NAME] = {"main": [[{"node": d, "type": "main", "index": 0} for d in DRAFT_NODES]]}
+
+
+# Inject into Draft Prompts; a report slot left by an earlier run is pointed at the new source
+def inject_draft(data, node_name, fact_check_expr):
+    n = _node(data, node_name)
+    if n and 'messages' in n.get('parameters', {}) and 'values' in n['parameters']['messages']:
+        for val in n['parameters']['messages']['values']:
+            if val.get('role') == 'system':
+                val['content'] = val['content'].split("\n\n" + REPORT_MARKER)[0]
+                val['content'] += "\n\n" + REPORT_MARKER + fact_check_expr
 
-# --- 2. Post-Draft Fact Checker ---
-post_draft_id = generate_id()
-post_draft_name = 'Post-Draft Fact Checker'
 
-post_draft_node = {
+# --- 2. Post-Draft Fact Checker ---
+POST_DRAFT_NODE = {
   "parameters": {
     "model": "sonar-pro",
     "messages": {
@@ -120,8 +221,7 @@ post_draft_node = {
   "type": "n8n-nodes-base.perplexity",
   "typeVersion": 1,
   "position": [0, 0],
-  "id": post_draft_id,
-  "name": post_draft_name,
+  "name": POST_DRAFT_NAME,
   "credentials": {
     "perplexityApi": {
       "id": "iuHSBzk6FDLpyJRT",
@@ -130,46 +230,77 @@ post_draft_node = {
   }
 }
 
-for n in data['nodes']:
-    if n['name'] == 'Data Check & Research Gaps1':
-        post_draft_node['position'] = [n['position'][0] + 150, n['position'][1] + 100]
-
-# Rewire Data Check & Research Gaps1 -> Post-Draft Fact Checker -> Keyword Checks
-old_targets = data['connections'].get('Data Check & Research Gaps1', {}).get('main', [[]])[0]
-data['connections']['Data Check & Research Gaps1'] = {
-    "main": [
-        [
-            {
-                "node": post_draft_name,
-                "type": "main",
-                "index": 0
-            }
-        ]
-    ]
-}
-
-data['connections'][post_draft_name] = {
-    "main": [
-        old_targets
-    ]
-}
-data['nodes'].append(post_draft_node)
 
 # Important: Update Keyword Checks to read from Post-Draft Fact Checker instead of $json (because $json will automatically be the output of Post-Draft Fact Checker, but wait: does Keyword Check use $json.choices[0].message.content?)
 # Since Post-Draft Fact Checker is a Perplexity node, its output format might be `message.content` or `choices[0].message.content`.
 # Let's ensure the keyword check nodes handle it safely or leave as $json.choices[0] which Perplexity uses.
-def fix_keyword_input(node_name):
-    for n in data['nodes']:
-        if n['name'] == node_name:
-            if 'messages' in n.get('parameters', {}) and 'values' in n['parameters']['messages']:
-                for val in n['parameters']['messages']['values']:
-                    if val.get('role') != 'system':
-                        val['content'] = val['content'].replace("{{ $json.choices[0].message.content }}", "{{ $json.message?.content || $json.choices?.[0]?.message?.content || $json.text }}")
+def fix_keyword_input(data, node_name):
+    n = _node(data, node_name)
+    if n and 'messages' in n.get('parameters', {}) and 'values' in n['parameters']['messages']:
+        for val in n['parameters']['messages']['values']:
+            if val.get('role') != 'system':
+                val['content'] = val['content'].replace("{{ $json.choices[0].message.content }}", "{{ $json.message?.content || $json.choices?.[0]?.message?.content || $json.text }}")
+
+
+def inject_post_draft(data):
+    # Rewire Data Check & Research Gaps1 -> Post-Draft Fact Checker -> Keyword Checks
+    old_targets = data['connections'].get('Data Check & Research Gaps1', {}).get('main', [[]])[0]
+    data['connections']['Data Check & Research Gaps1'] = {
+        "main": [
+            [
+                {
+                    "node": POST_DRAFT_NAME,
+                    "type": "main",
+                    "index": 0
+                }
+            ]
+        ]
+    }
+
+    data['connections'][POST_DRAFT_NAME] = {
+        "main": [
+            old_targets
+        ]
+    }
+    _new_node(data, POST_DRAFT_NODE, 'Data Check & Research Gaps1')
+
+    fix_keyword_input(data, 'OpenAI Keyword Check + Semantic Gap1')
+    fix_keyword_input(data, 'Claude Keyword Check + Semantic Gap1')
+
+
+def inject(data, parallel=False):
+    """Add or rewire both checkers. Checkers already in the workflow are reused, so re-running is a no-op."""
+    if parallel:
+        rewire_parallel(data)
+        fact_check_expr = PARALLEL_REPORT_EXPR
+    else:
+        rewire_serial(data)
+        fact_check_expr = SERIAL_REPORT_EXPR
+    if not _node(data, PRE_DRAFT_NAME):
+        _new_node(data, PRE_DRAFT_NODE, 'Parse Creative Brief (LLM)')
+    for draft in DRAFT_NODES:
+        inject_draft(data, draft, fact_check_expr)
+
+    if not _node(data, POST_DRAFT_NAME):
+        inject_post_draft(data)
+    return data
+
+
+def main():
+    if '--timing' in sys.argv:
+        report_timing(sys.argv[sys.argv.index('--timing') + 1])
+        sys.exit(0)
+
+    with open(WORKFLOW, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    inject(data, '--parallel' in sys.argv)
+
+    check_workflow(data, WORKFLOW)
+    with open(WORKFLOW, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
 
-fix_keyword_input('OpenAI Keyword Check + Semantic Gap1')
-fix_keyword_input('Claude Keyword Check + Semantic Gap1')
+    print("SUCCESS")
 
-with open('TEST Skywide Content (Prompt Review).json', 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2)
 
-print("SUCCESS")
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import json
 import uuid
 
+from workflow_validator import check_workflow
+
 # Load the workflow
 input_file = "DEV Skywide  Content (20).json"
 output_file = "DEV Skywide  Content (21).json"
@@ -77,6 +79,7 @@ workflow['name'] = "DEV Skywide  Content (21)"
 # The Implementation plan said: "Update system prompts in Content Generator nodes"
 # We can do that here too if we want to be fancy, but let's stick to the node injection first.
 
+check_workflow(workflow, output_file)
 with open(output_file, 'w', encoding='utf-8') as f:
     json.dump(workflow, f, indent=2)
 
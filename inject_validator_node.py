@@ -2,6 +2,8 @@ import json
 import uuid
 import copy
 
+from workflow_validator import check_workflow
+
 # Load the workflow (Version 22)
 input_file = "DEV Skywide  Content (22).json"
 output_file = "DEV Skywide  Content (23).json"
@@ -78,6 +80,7 @@ if source_node in connections:
 
 workflow['name'] = "DEV Skywide  Content (23)"
 
+check_workflow(workflow, output_file)
 with open(output_file, 'w', encoding='utf-8') as f:
     json.dump(workflow, f, indent=2)
 
@@ -0,0 +1,342 @@
+"""
+Python port of the Keyword Strategist Code node (src/n8n_scripts/keyword_strategist.js).
+
+keyword_strategy_node(json) returns exactly what the node returns for an
+item: the input fields plus `keyword_strategy` (primary, secondary, map,
+system_prompt_injection), so a strategy can be seen for any brief without
+a workflow run. The constant parts of the map and the prompt template are
+built once at import; per request only the keyword split and the
+interpolation are left.
+
+Batch mode runs every request of a corpus (all_content_requests.json by
+default) across worker processes and indexes the resulting terms: how
+many requests get a primary keyword, secondary counts, and which terms
+recur across requests and clients.
+
+all_content_requests.json only holds ids and titles, so rows without
+primary_keywords are filled in from content_requests in Supabase
+(NEXT_PUBLIC_SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY from the environment;
+--offline skips this). Arrays are joined with ", " the way the revise
+route builds the webhook body.
+
+--check-parity runs the same inputs through the JS file with node and
+compares the outputs. Pointing --js at an edited copy of the script shows
+which requests a strategy change would affect.
+
+Usage:
+  python keyword_strategist.py --keywords "implantation symptoms, implantation cramps"
+  python keyword_strategist.py --batch all_content_requests.json --check-parity
+  python keyword_strategist.py --batch latest_full_row.json --offline -o strategies.jsonl
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from n8n_utils import supabase_credentials
+
+JS_PATH = os.path.join("src", "n8n_scripts", "keyword_strategist.js")
+DEFAULT_CORPUS = "all_content_requests.json"
+IN_CHUNK = 100
+
+# What String.prototype.trim() strips (str.strip() differs on \ufeff, \x1c-\x1f and \x85)
+JS_WHITESPACE = ("\t\n\v\f\r \u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+                 "\u2028\u2029\u202f\u205f\u3000\ufeff")
+
+PRIMARY_PLACEMENTS = [
+    "H1 Title",
+    "First 50 Words (Introduction)",
+    "At least one H2 Subheading",
+    "Final Paragraph (Conclusion)",
+]
+SECONDARY_PLACEMENTS = ["Body Paragraph", "H3 (Optional)"]
+CONSTRAINTS = {
+    "banned_phrases": [
+        "Additionally",
+        "Let's dive in",
+        "In conclusion",
+        "The bottom line",
+        "Moreover",
+        "Furthermore",
+    ],
+    "paragraph_rule": "Max 3 sentences. No two consecutive paragraphs starting with the same word.",
+    "voice_rule": "Write as 'We' (the contractor). Use 'You' for the reader.",
+}
+
+INJECTION_TEMPLATE = """
+### KEYWORD ORCHESTRATION INSTRUCTIONS
+You must strictly follow this placement map for SEO optimization while maintaining Contractor Voice.
+
+1. **PRIMARY KEYWORD:** "{primary}"
+   - **MANDATORY:** Must appear in the **first 50 words** of the intro.
+   - **MANDATORY:** Must appear in at least one **H2 subheading**.
+   - **MANDATORY:** Must appear in the **final paragraph**.
+   - **Constraint:** Do not just insert it. Anchor it with authority: *"In our experience with {primary}..."* or *"When we handle {primary}..."*
+
+2. **SECONDARY KEYWORDS:**
+   {secondary}
+
+3. **EDITORIAL VOICE Rules (Billy's List):**
+   - **FORBIDDEN:** Do not use "Additionally", "Let's dive in", "In conclusion", or "The bottom line".
+   - **VOICE:** Use "We" (contractor perspective).
+   - **LENGTH:** Max 3 sentences per paragraph.
+"""
+
+# JS node runner: the script body becomes a function of `items`, like the Code node
+JS_RUNNER = """
+const fs = require('fs');
+const run = new Function('items', fs.readFileSync(process.argv[1], 'utf8'));
+const inputs = JSON.parse(fs.readFileSync(0, 'utf8'));
+process.stdout.write(JSON.stringify(inputs.map(json => {
+  try { return { result: run([{ json }]) }; } catch (e) { return { error: String(e) }; }
+})));
+"""
+
+
+def split_keywords(raw):
+    """primary_keywords -> [terms], as `(raw || "").split(',').map(trim).filter(nonEmpty)`."""
+    if not raw:
+        raw = ""
+    if not isinstance(raw, str):
+        raise TypeError("rawKeywords.split is not a function")
+    return [k for k in (part.strip(JS_WHITESPACE) for part in raw.split(",")) if k]
+
+
+def keyword_strategy(raw_keywords):
+    keywords = split_keywords(raw_keywords)
+    primary = keywords[0] if keywords else ""
+    secondary = keywords[1:]
+    placement_map = {
+        "primary": {
+            "term": primary,
+            "required_placements": list(PRIMARY_PLACEMENTS),
+            "density_target": "1.5%",
+            "voice_anchor": "Use with 'In our experience' or 'From the field'",
+        },
+        "secondary": [{
+            "term": k,
+            "required_placements": list(SECONDARY_PLACEMENTS),
+            "voice_anchor": "Contextual mention",
+        } for k in secondary],
+        "constraints": {**CONSTRAINTS, "banned_phrases": list(CONSTRAINTS["banned_phrases"])},
+    }
+    injection = INJECTION_TEMPLATE.format(
+        primary=primary, secondary="\n   ".join(f'- "{k}" (Distribute naturally in body)' for k in secondary))
+    return {
+        "primary": primary,
+        "secondary": secondary,
+        "map": placement_map,
+        "system_prompt_injection": injection,
+    }
+
+
+def keyword_strategy_node(json_item):
+    """The node's output for one item: `{json: {...inputData, keyword_strategy}}`."""
+    input_data = json_item.get("body") or json_item
+    output = dict(input_data)
+    output["keyword_strategy"] = keyword_strategy(input_data.get("primary_keywords"))
+    return {"json": output}
+
+
+def webhook_body(row):
+    """A content_requests row as the webhook sees it (keyword arrays joined like the revise route)."""
+    body = dict(row)
+    for field in ("primary_keywords", "secondary_keywords", "semantic_themes"):
+        if isinstance(body.get(field), list):
+            body[field] = ", ".join(body[field])
+    return body
+
+
+def _safe_node(body):
+    try:
+        return {"result": keyword_strategy_node(body)}
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def evaluate(bodies, workers=None):
+    """Run the port over many request bodies in worker processes; results in input order."""
+    if workers == 1 or len(bodies) < 200:
+        return [_safe_node(b) for b in bodies]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_safe_node, bodies, chunksize=max(1, len(bodies) // (workers * 4))))
+
+
+def run_js(bodies, js_path=JS_PATH):
+    """Run the JS node over the same bodies with node; results in input order."""
+    proc = subprocess.run(["node", "-e", JS_RUNNER, os.path.abspath(js_path)], input=json.dumps(bodies),
+                          capture_output=True, text=True, encoding="utf-8")
+    if proc.returncode != 0:
+        raise RuntimeError(f"node failed: {proc.stderr.strip()[:500]}")
+    return json.loads(proc.stdout)
+
+
+def _first_difference(mine, theirs, path):
+    """(path, python value, js value) at the first point two JSON values differ."""
+    if isinstance(mine, dict) and isinstance(theirs, dict) and list(mine) == list(theirs):
+        for key in mine:
+            if mine[key] != theirs[key]:
+                return _first_difference(mine[key], theirs[key], f"{path}.{key}")
+    if isinstance(mine, list) and isinstance(theirs, list) and len(mine) == len(theirs):
+        for i, (a, b) in enumerate(zip(mine, theirs)):
+            if a != b:
+                return _first_difference(a, b, f"{path}[{i}]")
+    return path, mine, theirs
+
+
+def check_parity(bodies, results, js_path=JS_PATH):
+    """[(index, path, python value, js value)] for every mismatch."""
+    mismatches = []
+    for i, (py, js) in enumerate(zip(results, run_js(bodies, js_path))):
+        if ("error" in py) != ("error" in js):
+            mismatches.append((i, "error", py.get("error"), js.get("error")))
+            continue
+        if "error" in py:
+            continue
+        mine, theirs = py["result"]["json"], js["result"]["json"]
+        for field in sorted(set(mine["keyword_strategy"]) | set(theirs["keyword_strategy"])):
+            if mine["keyword_strategy"].get(field) != theirs["keyword_strategy"].get(field):
+                mismatches.append((i,) + _first_difference(mine["keyword_strategy"].get(field),
+                                                           theirs["keyword_strategy"].get(field), field))
+        rest = sorted(k for k in set(mine) | set(theirs) if k != "keyword_strategy" and mine.get(k) != theirs.get(k))
+        if rest or list(mine) != list(theirs):
+            mismatches.append((i, "fields", rest or list(mine), list(theirs)))
+    return mismatches
+
+
+class TermIndex:
+    """Primary / secondary terms -> request indexes, for corpus-wide views of a strategy."""
+
+    def __init__(self, bodies, results):
+        self.primary = defaultdict(list)
+        self.secondary = defaultdict(list)
+        self.clients = defaultdict(set)
+        self.secondary_counts = Counter()
+        self.errors = []
+        for i, (body, res) in enumerate(zip(bodies, results)):
+            if "error" in res:
+                self.errors.append((i, res["error"]))
+                continue
+            strategy = res["result"]["json"]["keyword_strategy"]
+            self.secondary_counts[len(strategy["secondary"])] += 1
+            if strategy["primary"]:
+                term = strategy["primary"].lower()
+                self.primary[term].append(i)
+                self.clients[term].add((body.get("client_name") or "").strip())
+            for k in strategy["secondary"]:
+                self.secondary[k.lower()].append(i)
+
+    def without_primary(self, total):
+        return total - len(self.errors) - sum(len(v) for v in self.primary.values())
+
+    def recurring(self, top=10):
+        """Primary terms used by more than one request, most used first."""
+        repeated = [(term, ids) for term, ids in self.primary.items() if len(ids) > 1]
+        return sorted(repeated, key=lambda kv: -len(kv[1]))[:top]
+
+
+def _supabase_get(query):
+    url, key = supabase_credentials()
+    req = urllib.request.Request(f"{url}/rest/v1/content_requests?{query}")
+    req.add_header("apikey", key)
+    req.add_header("Authorization", f"Bearer {key}")
+    with urllib.request.urlopen(req, timeout=60) as response:
+        return json.loads(response.read().decode())
+
+
+def hydrate(rows):
+    """Fill in primary_keywords (and the other brief fields) for rows that only carry an id."""
+    missing = [r["id"] for r in rows if "primary_keywords" not in r and r.get("id")]
+    found = {}
+    for i in range(0, len(missing), IN_CHUNK):
+        chunk = ",".join(missing[i:i + IN_CHUNK])
+        query = f"select=id,primary_keywords,secondary_keywords,semantic_themes&id=in.({urllib.parse.quote(chunk)})"
+        for row in _supabase_get(query):
+            found[row["id"]] = row
+    return [dict(r, **found.get(r.get("id"), {})) for r in rows], len(found)
+
+
+def load_rows(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keywords", help="Print the strategy for one primary_keywords string")
+    parser.add_argument("--batch", nargs="?", const=DEFAULT_CORPUS, help="Evaluate every request in a JSON file")
+    parser.add_argument("--offline", action="store_true", help="Don't fetch missing keywords from Supabase")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--check-parity", action="store_true", help="Compare against the JS node run with node")
+    parser.add_argument("--js", default=JS_PATH, help="JS file to compare against")
+    parser.add_argument("-o", "--output", help="Write one node output per line (JSONL)")
+    args = parser.parse_args()
+
+    if args.keywords is not None:
+        body = {"primary_keywords": args.keywords}
+        result = keyword_strategy_node(body)
+        print(json.dumps(result["json"]["keyword_strategy"], indent=2, ensure_ascii=False))
+        if args.check_parity:
+            mismatches = check_parity([body], [{"result": result}], args.js)
+            print("✅ Matches the JS node" if not mismatches else f"❌ {len(mismatches)} mismatch(es): {mismatches}")
+        return
+    if not args.batch:
+        parser.error("give --keywords or --batch")
+
+    rows = load_rows(args.batch)
+    if not args.offline and any("primary_keywords" not in r for r in rows):
+        try:
+            rows, filled = hydrate(rows)
+            print(f"Fetched keywords for {filled}/{len(rows)} request(s) from content_requests")
+        except Exception as e:
+            print(f"WARNING: could not fetch keywords from Supabase ({e}); evaluating rows as they are")
+    bodies = [webhook_body(r) for r in rows]
+
+    started = time.perf_counter()
+    results = evaluate(bodies, args.workers)
+    elapsed = time.perf_counter() - started
+    index = TermIndex(bodies, results)
+
+    print(f"\n{len(bodies)} request(s) evaluated in {elapsed * 1000:.0f}ms")
+    print(f"  with a primary keyword: {len(bodies) - index.without_primary(len(bodies)) - len(index.errors)}")
+    print(f"  without (empty strategy): {index.without_primary(len(bodies))}")
+    print(f"  secondary keywords per request: "
+          + ", ".join(f"{n}: {c}" for n, c in sorted(index.secondary_counts.items())))
+    print(f"  distinct primary terms: {len(index.primary)}, distinct secondary terms: {len(index.secondary)}")
+    for term, ids in index.recurring():
+        clients = sorted(c for c in index.clients[term] if c)
+        shown = ", ".join(clients[:5]) + (f" +{len(clients) - 5} more" if len(clients) > 5 else "")
+        print(f"  ~ '{term}' is primary for {len(ids)} requests across {len(clients)} client(s) ({shown or '-'})")
+    for i, error in index.errors[:10]:
+        print(f"  ! request {rows[i].get('id', i)}: {error}")
+
+    if args.check_parity:
+        started = time.perf_counter()
+        mismatches = check_parity(bodies, results, args.js)
+        print(f"\nParity vs {args.js} ({time.perf_counter() - started:.1f}s with node):")
+        if not mismatches:
+            print(f"✅ All {len(bodies)} outputs identical")
+        for i, field, mine, theirs in mismatches[:20]:
+            print(f"  ❌ {rows[i].get('id', i)} {field}: python={json.dumps(mine)[:120]} js={json.dumps(theirs)[:120]}")
+        if len(mismatches) > 20:
+            print(f"  ... {len(mismatches) - 20} more")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for res in results:
+                f.write(json.dumps(res.get("result") or res, ensure_ascii=False) + "\n")
+        print(f"✅ Strategies -> {args.output}")
+    if args.check_parity and mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
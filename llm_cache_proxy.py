@@ -0,0 +1,393 @@
+"""
+Content-addressed LLM response cache for DEV/TEST runs.
+
+A local proxy in front of OpenAI, Anthropic and Perplexity. Each chat request
+is keyed by a hash of provider, model, every generation parameter
+(temperature, max_tokens, thinking, tools, ...) and the prompt,
+so an unchanged brief + prompt returns the stored completion instantly and
+only edited nodes pay real latency and cost.
+
+  /openai/...      -> https://api.openai.com/...
+  /anthropic/...   -> https://api.anthropic.com/...
+  /perplexity/...  -> https://api.perplexity.ai/...
+
+Prompts are normalised to LangChain's "System: ...\\nHuman: ..." text (the
+form recorded in execution exports) with ISO timestamps masked, so a run a
+day later still hits. Streaming requests and non-chat endpoints pass through
+uncached. API keys are forwarded upstream on a miss and never stored.
+
+`seed` fills the cache from recorded chat-model sub-node runs (Anthropic /
+OpenAI Chat Model*), which carry the exact prompt and completion. The
+OpenAI message and Perplexity nodes don't record their request, so they
+fill the cache on their first run through the proxy. A seeded entry only
+hits when the client sends exactly the recorded generation parameters.
+
+The proxy listens on 127.0.0.1 unless --host says otherwise; it forwards
+whatever API key a caller sends, so don't expose it beyond the n8n host.
+
+Point a workflow at the proxy with point_llm_at_cache.py.
+
+Usage:
+  python llm_cache_proxy.py seed execution_2764_full.json
+  python llm_cache_proxy.py serve --port 8787 [--host 127.0.0.1] [--offline]
+  python llm_cache_proxy.py stats
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from n8n_utils import load_execution, node_index
+
+CACHE_DIR = ".llm_cache"
+STATS_FILE = "stats.jsonl"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+
+UPSTREAMS = {
+    "openai": "https://api.openai.com",
+    "anthropic": "https://api.anthropic.com",
+    "perplexity": "https://api.perplexity.ai",
+}
+
+# Request fields that are not generation parameters; everything else is part of the key
+NON_KEY_FIELDS = {"model", "messages", "system", "stream", "stream_options", "metadata", "user"}
+
+# LangChain client settings recorded in a chat model's options (connection, not generation)
+LANGCHAIN_CLIENT_OPTIONS = {
+    "model", "anthropic_api_key", "anthropic_api_url", "api_key", "openai_api_key", "client_options",
+    "configuration", "max_retries", "timeout", "streaming", "invocation_kwargs", "model_kwargs",
+}
+
+FORWARD_HEADERS = ("authorization", "x-api-key", "anthropic-version", "anthropic-beta",
+                   "openai-organization", "openai-project", "content-type")
+
+ROLE_PREFIX = {"system": "System", "developer": "System", "user": "Human", "assistant": "AI", "tool": "Tool"}
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?")
+
+SEED_TYPES = {
+    "@n8n/n8n-nodes-langchain.lmChatAnthropic": "anthropic",
+    "@n8n/n8n-nodes-langchain.lmChatOpenAi": "openai",
+}
+
+
+def _text(content):
+    """Flatten a message/system content (string or list of blocks) to text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(b.get("text", "") if isinstance(b, dict) else str(b) for b in content)
+    return "" if content is None else json.dumps(content, sort_keys=True)
+
+
+def prompt_text(provider, body):
+    """Request messages as LangChain buffer text: 'System: ...\\nHuman: ...'."""
+    lines = []
+    if provider == "anthropic" and body.get("system"):
+        lines.append(f"System: {_text(body['system'])}")
+    for message in body.get("messages") or []:
+        role = ROLE_PREFIX.get(message.get("role"), message.get("role"))
+        lines.append(f"{role}: {_text(message.get('content'))}")
+    return "\n".join(lines)
+
+
+def generation_params(body):
+    """Every request field that can change the completion."""
+    return {k: v for k, v in body.items() if k not in NON_KEY_FIELDS and v is not None}
+
+
+def recorded_params(options):
+    """The generation parameters a LangChain chat model sent, from its recorded options.
+
+    invocation_kwargs / model_kwargs are applied last, as LangChain does, so
+    e.g. Anthropic's thinking budget and its max_tokens override end up in the key.
+    """
+    params = {k: v for k, v in options.items() if k not in LANGCHAIN_CLIENT_OPTIONS}
+    params.update(options.get("model_kwargs") or {})
+    params.update(options.get("invocation_kwargs") or {})
+    return params
+
+
+def cache_key(provider, model, params, prompt):
+    canonical = {
+        "provider": provider,
+        "model": model,
+        "params": generation_params(params),
+        "prompt": TIMESTAMP_PATTERN.sub("<ts>", prompt),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def request_key(provider, body):
+    return cache_key(provider, body.get("model"), body, prompt_text(provider, body))
+
+
+def cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], f"{key}.json")
+
+
+def cache_get(cache_dir, key):
+    try:
+        with open(cache_path(cache_dir, key), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cache_put(cache_dir, key, record):
+    path = cache_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def synthetic_response(provider, model, text, usage):
+    """Provider-shaped completion for a recorded generation."""
+    prompt_tokens = usage.get("promptTokens", 0)
+    completion_tokens = usage.get("completionTokens", 0)
+    if provider == "anthropic":
+        return {
+            "id": "msg_cached",
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": prompt_tokens, "output_tokens": completion_tokens},
+        }
+    return {
+        "id": "chatcmpl-cached",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+def seed_from_execution(execution, cache_dir):
+    """Store every recorded chat-model generation. Returns (added, skipped)."""
+    by_name = node_index(execution.get("workflowData") or {"nodes": []})
+    added = skipped = 0
+    for name, runs in execution["data"]["resultData"]["runData"].items():
+        node = by_name.get(name)
+        provider = SEED_TYPES.get(node["type"]) if node else None
+        if not provider:
+            continue
+        for run in runs:
+            try:
+                request = run["inputOverride"]["ai_languageModel"][0][0]["json"]
+                result = run["data"]["ai_languageModel"][0][0]["json"]
+                text = result["response"]["generations"][0][0]["text"]
+            except (KeyError, IndexError, TypeError):
+                skipped += 1
+                continue
+            # Tool-call turns (structured output agents) have no text to replay
+            if not text:
+                skipped += 1
+                continue
+            options = request.get("options") or {}
+            model = options.get("model")
+            for prompt in request.get("messages") or []:
+                key = cache_key(provider, model, recorded_params(options), prompt)
+                cache_put(cache_dir, key, {
+                    "provider": provider,
+                    "model": model,
+                    "source": f"execution {execution.get('id')} / {name}",
+                    "latency_ms": run.get("executionTime", 0),
+                    "response": synthetic_response(provider, model, text, result.get("tokenUsage") or {}),
+                })
+                added += 1
+    return added, skipped
+
+
+class CacheProxy(BaseHTTPRequestHandler):
+    cache_dir = CACHE_DIR
+    offline = False
+    upstreams = UPSTREAMS
+    lock = threading.Lock()
+    counters = {"hits": 0, "misses": 0, "passthrough": 0, "saved_ms": 0}
+
+    def do_GET(self):
+        if self.path == "/__stats":
+            with self.lock:
+                stats = dict(self.counters)
+            looked_up = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / looked_up if looked_up else 0
+            return self._reply(200, json.dumps(stats).encode("utf-8"))
+        self._forward(b"")
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        provider, _ = self._route()
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            body = {}
+        cacheable = provider and isinstance(body, dict) and body.get("messages") and not body.get("stream")
+        if not cacheable:
+            self._count("passthrough")
+            return self._forward(raw)
+
+        key = request_key(provider, body)
+        record = cache_get(self.cache_dir, key)
+        if record:
+            self._count("hits", saved_ms=record.get("latency_ms", 0))
+            self._log(provider, body, key, "hit", record.get("latency_ms", 0))
+            return self._reply(200, json.dumps(record["response"]).encode("utf-8"), cache="hit")
+
+        self._count("misses")
+        if self.offline:
+            self._log(provider, body, key, "miss", 0)
+            msg = {"error": {"type": "cache_miss", "message": f"llm cache miss for {key[:12]} (proxy is offline)"}}
+            return self._reply(504, json.dumps(msg).encode("utf-8"), cache="miss")
+
+        start = time.perf_counter()
+        status, data = self._forward(raw, reply=False)
+        latency_ms = int((time.perf_counter() - start) * 1000)
+        if status == 200:
+            try:
+                cache_put(self.cache_dir, key, {
+                    "provider": provider,
+                    "model": body.get("model"),
+                    "source": "live",
+                    "latency_ms": latency_ms,
+                    "response": json.loads(data),
+                })
+            except ValueError:
+                pass
+        self._log(provider, body, key, "miss", latency_ms)
+        self._reply(status, data, cache="miss")
+
+    def _route(self):
+        prefix, _, rest = self.path.lstrip("/").partition("/")
+        if prefix in self.upstreams:
+            return prefix, "/" + rest
+        return None, self.path
+
+    def _forward(self, raw, reply=True):
+        provider, path = self._route()
+        if not provider:
+            return self._reply(404, b'{"error": "unknown provider prefix"}') if reply else (404, b"")
+        headers = {k: v for k, v in self.headers.items() if k.lower() in FORWARD_HEADERS}
+        req = urllib.request.Request(self.upstreams[provider] + path, data=raw or None,
+                                     method=self.command, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=600) as response:
+                status, data = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, data = e.code, e.read()
+        except (urllib.error.URLError, OSError) as e:
+            status, data = 502, json.dumps({"error": {"message": f"upstream error: {e}"}}).encode("utf-8")
+        if reply:
+            self._reply(status, data)
+        return status, data
+
+    def _reply(self, status, data, cache=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if cache:
+            self.send_header("X-LLM-Cache", cache)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _count(self, field, saved_ms=0):
+        with self.lock:
+            self.counters[field] += 1
+            self.counters["saved_ms"] += saved_ms
+
+    def _log(self, provider, body, key, result, latency_ms):
+        line = json.dumps({"ts": time.time(), "provider": provider, "model": body.get("model"),
+                           "key": key, "result": result, "latency_ms": latency_ms})
+        with self.lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(os.path.join(self.cache_dir, STATS_FILE), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        print(f"  {result.upper():<4} {provider:<10} {body.get('model') or '?':<28} {key[:12]} {latency_ms / 1000:.1f}s")
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(host, port, cache_dir, offline):
+    CacheProxy.cache_dir = cache_dir
+    CacheProxy.offline = offline
+    server = ThreadingHTTPServer((host, port), CacheProxy)
+    print(f"LLM cache proxy on http://{host}:{port} (cache: {cache_dir}{', offline' if offline else ''})")
+    for provider in UPSTREAMS:
+        print(f"  /{provider}/... -> {UPSTREAMS[provider]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        c = CacheProxy.counters
+        looked_up = c["hits"] + c["misses"]
+        if looked_up:
+            print(f"\n{c['hits']}/{looked_up} hits ({c['hits'] / looked_up:.0%}), "
+                  f"{c['saved_ms'] / 1000:.1f}s of LLM latency saved")
+
+
+def report(cache_dir):
+    """Hit rate and time saved, per model and overall, from the proxy's request log."""
+    path = os.path.join(cache_dir, STATS_FILE)
+    if not os.path.exists(path):
+        print(f"No requests logged yet ({path})")
+        return
+    per_model = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            row = per_model.setdefault(f"{entry['provider']}/{entry['model']}", [0, 0, 0])
+            if entry["result"] == "hit":
+                row[0] += 1
+                row[2] += entry["latency_ms"]
+            else:
+                row[1] += 1
+
+    print(f"{'model':<40}{'hits':>6}{'misses':>8}{'hit rate':>10}{'saved':>10}")
+    totals = [0, 0, 0]
+    for model, (hits, misses, saved) in sorted(per_model.items()):
+        print(f"{model:<40}{hits:>6}{misses:>8}{hits / (hits + misses):>10.0%}{saved / 1000:>9.1f}s")
+        totals = [totals[0] + hits, totals[1] + misses, totals[2] + saved]
+    hits, misses, saved = totals
+    print(f"{'total':<40}{hits:>6}{misses:>8}{hits / (hits + misses):>10.0%}{saved / 1000:>9.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed = sub.add_parser("seed", help="Fill the cache from execution exports")
+    seed.add_argument("executions", nargs="+")
+    run = sub.add_parser("serve", help="Run the caching proxy")
+    run.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to bind (default: {DEFAULT_HOST})")
+    run.add_argument("--port", type=int, default=DEFAULT_PORT)
+    run.add_argument("--offline", action="store_true", help="Never call upstream; misses return 504")
+    sub.add_parser("stats", help="Hit rate and time saved from the request log")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        for path in args.executions:
+            added, skipped = seed_from_execution(load_execution(path), args.cache_dir)
+            print(f"✅ {path}: {added} completion(s) cached, {skipped} run(s) without replayable text")
+    elif args.command == "serve":
+        serve(args.host, args.port, args.cache_dir, args.offline)
+    else:
+        report(args.cache_dir)
+
+
+if __name__ == "__main__":
+    main()
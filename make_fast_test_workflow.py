@@ -0,0 +1,241 @@
+"""
+Derive a "fast test" workflow from any production workflow.
+
+  - Wait nodes are dropped (sources wired straight to their targets)
+  - Check Max Iterations / QA rewrite loops are capped at one improvement pass
+  - LLM nodes are swapped to a fast model tier
+  - Google Docs / Drive nodes are stubbed with Set nodes that emit a fake id
+
+With --execution, the recorded node timings of a production run are used to
+report the expected latency saving per category.
+
+Usage:
+  python make_fast_test_workflow.py "PROD Skywide Content v23.json"
+  python make_fast_test_workflow.py "PROD Skywide Content v23.json" --execution execution_2764_full.json
+"""
+import argparse
+import os
+import sys
+
+from n8n_utils import (
+    GOOGLE_DOCS_TYPE, GOOGLE_DRIVE_TYPE, IF_TYPE, LLM_CHAIN_TYPES, LLM_TYPES,
+    PERPLEXITY_TYPE, SET_TYPE, WAIT_TYPE,
+    bypass_node, load_execution, load_workflow, node_index, node_timings,
+    predecessors, reachable, save_workflow, sub_nodes, successors, execution_wall_ms,
+)
+
+# Fast tier per provider (provider -> model id)
+FAST_MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-3-5-haiku-latest",
+    "perplexity": "sonar",
+}
+
+# Expected latency of the fast tier relative to the production model
+DEFAULT_LLM_FACTOR = 0.35
+
+MAX_ITERATIONS_GATES = ("Check Max Iterations",)
+
+
+def provider_of(node_type):
+    if node_type == PERPLEXITY_TYPE:
+        return "perplexity"
+    if "Anthropic" in node_type:
+        return "anthropic"
+    if "openAi" in node_type or "OpenAi" in node_type:
+        return "openai"
+    return None
+
+
+def swap_model(node, fast_models):
+    provider = provider_of(node["type"])
+    if not provider:
+        return None
+    fast = fast_models[provider]
+    params = node.setdefault("parameters", {})
+    for key in ("modelId", "model"):
+        val = params.get(key)
+        if isinstance(val, dict):
+            old = val.get("value")
+            val["value"] = fast
+            val["mode"] = "id"
+            val.pop("cachedResultName", None)
+            return old
+        if isinstance(val, str):
+            params[key] = fast
+            return val
+    return None
+
+
+def stub_google_node(node):
+    """Turn a Docs/Drive node into a Set node that passes input through plus a fake id."""
+    stub_id = "fast-test-" + node["name"].lower().replace(" ", "-")
+    node["parameters"] = {
+        "assignments": {"assignments": [
+            {"id": "fast_test_stub_id", "name": "id", "value": stub_id, "type": "string"},
+            {"id": "fast_test_stub_doc", "name": "documentId", "value": stub_id, "type": "string"},
+        ]},
+        "includeOtherFields": True,
+        "options": {},
+    }
+    node["type"] = SET_TYPE
+    node["typeVersion"] = 3.4
+    node.pop("credentials", None)
+    node.pop("webhookId", None)
+    node["notesInFlow"] = True
+    node["notes"] = "FAST TEST stub (Google API call removed)"
+
+
+def loop_body(wf, gate):
+    """Nodes on a cycle through `gate` (reachable from it and able to reach it)."""
+    body = reachable(gate, successors(wf)) & reachable(gate, predecessors(wf))
+    return body | {gate} if body else body
+
+
+def cap_loops(wf, iterations):
+    """Cap improvement loops. Returns {gate name: set of loop body nodes}."""
+    loops = {}
+    for node in wf["nodes"]:
+        name = node["name"]
+        if node["type"] != IF_TYPE:
+            continue
+        if name.startswith(MAX_ITERATIONS_GATES):
+            for cond in node["parameters"]["conditions"].get("conditions", []):
+                if cond.get("leftValue", "").strip() == "={{ $json.runs }}":
+                    cond["rightValue"] = iterations
+            loops[name] = loop_body(wf, name)
+        elif "maxIterations" in str(node["parameters"]):
+            loops[name] = loop_body(wf, name)
+
+    # QA rewrite loops read their limit from Clean1.maxIterations
+    for node in wf["nodes"]:
+        for a in node.get("parameters", {}).get("assignments", {}).get("assignments", []):
+            if a.get("name") == "maxIterations":
+                a["value"] = iterations
+    return {gate: body for gate, body in loops.items() if body}
+
+
+def transform(wf, fast_models, iterations):
+    changes = {"waits": [], "loops": {}, "llm": {}, "stubs": []}
+
+    for node in [n for n in wf["nodes"] if n["type"] == WAIT_TYPE]:
+        bypass_node(wf, node["name"])
+        changes["waits"].append(node["name"])
+
+    changes["loops"] = cap_loops(wf, iterations)
+
+    for node in wf["nodes"]:
+        if node["type"] in LLM_TYPES:
+            old = swap_model(node, fast_models)
+            if old:
+                changes["llm"][node["name"]] = old
+        elif node["type"] in (GOOGLE_DOCS_TYPE, GOOGLE_DRIVE_TYPE):
+            stub_google_node(node)
+            changes["stubs"].append(node["name"])
+    return changes
+
+
+def estimate_savings(original, execution, changes, iterations, llm_factor):
+    """Expected saving (ms) per category, based on recorded executionTime."""
+    timings = node_timings(execution)
+    run_data = execution["data"]["resultData"]["runData"]
+    # Prefer the workflow snapshot stored with the run; node names may have drifted since
+    original = execution.get("workflowData") or original
+    subs = sub_nodes(original)
+    by_name = node_index(original)
+    # Only root nodes: sub-node time is already inside its parent's executionTime
+    totals = {name: sum(ts) for name, ts in timings.items() if name not in subs}
+    retained = dict(totals)
+    savings = {"waits": 0, "stubs": 0, "loops": 0, "llm": 0}
+
+    for name in changes["waits"] + changes["stubs"]:
+        key = "waits" if name in changes["waits"] else "stubs"
+        savings[key] += retained.pop(name, 0)
+
+    for gate, body in changes["loops"].items():
+        gate_runs = len(timings.get(gate, []))
+        # Entries: runs of loop nodes triggered from outside the loop
+        entries = sum(
+            1 for name in body for r in run_data.get(name, [])
+            if any(s.get("previousNode") not in body for s in r.get("source") or [])
+        )
+        allowed = entries * (iterations + 1)
+        if gate_runs <= allowed or not gate_runs:
+            continue
+        keep = allowed / gate_runs
+        for name in body:
+            if name in retained:
+                cut = retained[name] * (1 - keep)
+                savings["loops"] += cut
+                retained[name] -= cut
+
+    for name, ms in retained.items():
+        node = by_name.get(name)
+        if node and node["type"] in LLM_TYPES | LLM_CHAIN_TYPES:
+            savings["llm"] += ms * (1 - llm_factor)
+
+    return {k: int(v) for k, v in savings.items()}, sum(totals.values())
+
+
+def print_report(changes, savings=None, baseline_ms=0, wall_ms=0):
+    print(f"  - Dropped {len(changes['waits'])} Wait nodes: {', '.join(changes['waits'])}")
+    for gate, body in changes["loops"].items():
+        print(f"  ~ Capped loop at {gate} ({len(body)} nodes)")
+    print(f"  ~ Swapped {len(changes['llm'])} LLM nodes to the fast tier")
+    print(f"  ~ Stubbed {len(changes['stubs'])} Google Docs/Drive nodes")
+    if savings is None:
+        return
+    total = sum(savings.values())
+    print("\nExpected latency savings (from recorded execution):")
+    for key, label in (("waits", "Wait nodes"), ("loops", "Improvement loops"),
+                       ("llm", "Fast LLM tier"), ("stubs", "Docs/Drive stubs")):
+        print(f"  {label:<20} {savings[key] / 1000:>8.1f}s")
+    print(f"  {'Total':<20} {total / 1000:>8.1f}s")
+    print(f"\n  Production node time: {baseline_ms / 1000:.1f}s (wall clock {wall_ms / 1000:.1f}s)")
+    print(f"  Projected fast test:  {max(baseline_ms - total, 0) / 1000:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workflow", help="Production workflow JSON (or execution export)")
+    parser.add_argument("-o", "--output", help="Output path (default: '<input> (FAST TEST).json')")
+    parser.add_argument("--execution", help="Execution export used for the latency report")
+    parser.add_argument("--iterations", type=int, default=1, help="Improvement passes allowed per loop")
+    parser.add_argument("--openai-model", default=FAST_MODELS["openai"])
+    parser.add_argument("--anthropic-model", default=FAST_MODELS["anthropic"])
+    parser.add_argument("--perplexity-model", default=FAST_MODELS["perplexity"])
+    parser.add_argument("--llm-factor", type=float, default=DEFAULT_LLM_FACTOR,
+                        help="Fast tier latency as a fraction of production latency")
+    args = parser.parse_args()
+
+    original = load_workflow(args.workflow)
+    wf = load_workflow(args.workflow)
+    if any("FAST TEST" in (n.get("notes") or "") for n in wf["nodes"]):
+        print("WARNING: Workflow is already a fast test profile. Skipping.")
+        sys.exit(0)
+
+    fast_models = {
+        "openai": args.openai_model,
+        "anthropic": args.anthropic_model,
+        "perplexity": args.perplexity_model,
+    }
+    print(f"Building fast test profile... ({len(wf['nodes'])} nodes)")
+    changes = transform(wf, fast_models, args.iterations)
+
+    if wf.get("name"):
+        wf["name"] = f"{wf['name']} (FAST TEST)"
+    output = args.output or f"{os.path.splitext(args.workflow)[0]} (FAST TEST).json"
+
+    if args.execution:
+        execution = load_execution(args.execution)
+        savings, baseline = estimate_savings(original, execution, changes, args.iterations, args.llm_factor)
+        print_report(changes, savings, baseline, execution_wall_ms(execution))
+    else:
+        print_report(changes)
+
+    save_workflow(wf, output)
+    print(f"\n✅ Wrote {output} ({len(wf['nodes'])} nodes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Shared helpers for the n8n workflow scripts.
+Loading/saving workflow JSON, indexing the connection graph, hashing nodes
+and reading per-node timings out of execution exports (e.g.
+execution_2764_full.json).
+"""
+import hashlib
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+
+WAIT_TYPE = "n8n-nodes-base.wait"
+IF_TYPE = "n8n-nodes-base.if"
+MERGE_TYPE = "n8n-nodes-base.merge"
+SET_TYPE = "n8n-nodes-base.set"
+CODE_TYPE = "n8n-nodes-base.code"
+HTTP_TYPE = "n8n-nodes-base.httpRequest"
+GOOGLE_DOCS_TYPE = "n8n-nodes-base.googleDocs"
+GOOGLE_DRIVE_TYPE = "n8n-nodes-base.googleDrive"
+PERPLEXITY_TYPE = "n8n-nodes-base.perplexity"
+
+# Nodes that talk to an LLM provider directly (own credentials + model param)
+LLM_TYPES = {
+    "@n8n/n8n-nodes-langchain.openAi",
+    "@n8n/n8n-nodes-langchain.lmChatOpenAi",
+    "@n8n/n8n-nodes-langchain.lmChatAnthropic",
+    PERPLEXITY_TYPE,
+}
+
+# Root nodes that run an LLM through an attached ai_languageModel sub-node
+LLM_CHAIN_TYPES = {
+    "@n8n/n8n-nodes-langchain.chainLlm",
+    "@n8n/n8n-nodes-langchain.agent",
+}
+
+# The node fields that define what it does (ids, positions and notes don't)
+# Node fields n8n assigns or that only affect the canvas; every other field changes how the node runs
+UNHASHED_FIELDS = ("id", "webhookId", "position", "notes")
+
+
+def gen_id():
+    return str(uuid.uuid4())
+
+
+def load_workflow(path):
+    """Load a workflow file. Execution exports are unwrapped to their workflowData."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if "workflowData" in data and "nodes" not in data:
+        return data["workflowData"]
+    return data
+
+
+def save_workflow(wf, path, validate=True):
+    """Write a workflow file, refusing structurally broken graphs (see workflow_validator.py)."""
+    if validate:
+        # Imported here: workflow_validator builds on this module
+        from workflow_validator import check_workflow
+        check_workflow(wf, path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(wf, f, indent=2, ensure_ascii=False)
+
+
+def load_execution(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_executions(data):
+    """Executions in an export: a single one, a list, or an API {data: [...]} page."""
+    if isinstance(data, dict) and isinstance(data.get("data"), list):
+        data = data["data"]
+    for execution in data if isinstance(data, list) else [data]:
+        if isinstance(execution, dict) and ((execution.get("data") or {}).get("resultData") or {}).get("runData"):
+            yield execution
+
+
+def node_index(wf):
+    return {n["name"]: n for n in wf["nodes"]}
+
+
+def model_of(node):
+    """Return the model id configured on an LLM node, or None."""
+    params = node.get("parameters", {})
+    for key in ("modelId", "model"):
+        val = params.get(key)
+        if isinstance(val, dict):
+            return val.get("value")
+        if isinstance(val, str):
+            return val
+    return None
+
+
+def json_hash(value):
+    """sha256 of a JSON value's canonical form."""
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def node_hashes(wf):
+    """name -> (hash of every node field but UNHASHED_FIELDS, position)."""
+    return {n["name"]: (json_hash({k: v for k, v in n.items() if k not in UNHASHED_FIELDS}), n.get("position"))
+            for n in wf.get("nodes", [])}
+
+
+def iter_edges(wf, conn_type="main"):
+    """Yield (source, output_index, target, target_input_index) for every edge."""
+    for source, outputs in wf.get("connections", {}).items():
+        for output_idx, targets in enumerate(outputs.get(conn_type) or []):
+            for t in targets or []:
+                yield source, output_idx, t["node"], t.get("index", 0)
+
+
+def successors(wf, conn_type="main"):
+    succ = {n["name"]: [] for n in wf["nodes"]}
+    for source, _, target, _ in iter_edges(wf, conn_type):
+        succ.setdefault(source, []).append(target)
+    return succ
+
+
+def predecessors(wf, conn_type="main"):
+    pred = {n["name"]: [] for n in wf["nodes"]}
+    for source, _, target, _ in iter_edges(wf, conn_type):
+        pred.setdefault(target, []).append(source)
+    return pred
+
+
+def reachable(start, graph):
+    """All nodes reachable from `start` in a successors/predecessors map (excluding start)."""
+    seen, stack = set(), [start]
+    while stack:
+        for nxt in graph.get(stack.pop(), []):
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    seen.discard(start)
+    return seen
+
+
+def sub_nodes(wf):
+    """Names of nodes wired only through ai_* ports (chat models, output parsers)."""
+    subs = set()
+    for source, outputs in wf.get("connections", {}).items():
+        if outputs and all(k.startswith("ai_") for k in outputs):
+            subs.add(source)
+    return subs
+
+
+def bypass_node(wf, name):
+    """Remove a single-input/single-output node and connect its sources straight to its targets."""
+    connections = wf["connections"]
+    outgoing = (connections.pop(name, {}).get("main") or [[]])[0] or []
+    for outputs in connections.values():
+        main = outputs.get("main") or []
+        for idx, targets in enumerate(main):
+            rewired = []
+            for t in targets or []:
+                if t["node"] == name:
+                    rewired.extend(dict(o) for o in outgoing)
+                else:
+                    rewired.append(t)
+            main[idx] = rewired
+    wf["nodes"] = [n for n in wf["nodes"] if n["name"] != name]
+
+
+def node_timings(execution):
+    """Map node name -> list of executionTime (ms), one entry per run."""
+    run_data = execution["data"]["resultData"]["runData"]
+    return {name: [r.get("executionTime", 0) or 0 for r in runs] for name, runs in run_data.items()}
+
+
+def timestamp_ms(ts):
+    """Epoch milliseconds for an ISO timestamp as stored in execution exports."""
+    return int(datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp() * 1000)
+
+
+def execution_wall_ms(execution):
+    """Wall-clock duration of an execution from its startedAt/stoppedAt stamps."""
+    if not execution.get("startedAt") or not execution.get("stoppedAt"):
+        return 0
+    return timestamp_ms(execution["stoppedAt"]) - timestamp_ms(execution["startedAt"])
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_output(execution, name, run=0, output=0):
+    """Return the list of {json: ...} items a node emitted on the given run/output."""
+    runs = execution["data"]["resultData"]["runData"].get(name) or []
+    if run >= len(runs):
+        return []
+    main = (runs[run].get("data") or {}).get("main") or []
+    if output >= len(main):
+        return []
+    return main[output] or []
+
+
+def supabase_credentials():
+    """(url, service role key) from the environment, as the Next.js API routes read them."""
+    url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    missing = [name for name, value in (("NEXT_PUBLIC_SUPABASE_URL", url), ("SUPABASE_SERVICE_ROLE_KEY", key))
+               if not value]
+    if missing:
+        sys.exit(f"❌ Missing Supabase credentials: set {' and '.join(missing)} (see the app's .env)")
+    return url.rstrip("/"), key
@@ -0,0 +1,262 @@
+"""
+Node-level metrics across execution exports, in a local SQLite store.
+
+`ingest` reads any number of execution exports (single executions like
+execution_2764_full.json, a JSON list of them, or an n8n API
+/executions?includeData=true response) and appends one row per node run:
+duration (executionTime), status and output size (bytes and items).
+Rows are keyed by execution, node and run, so re-ingesting a file adds
+nothing. Each execution is tagged with the version hash of the workflow
+it ran: node bodies without canvas positions, plus connections, so
+moving nodes around doesn't start a new version.
+
+  node_runs   (execution_id, workflow_id, node, run_index) -> version, date,
+              duration_ms, status, output_bytes, items
+  executions  (execution_id, workflow_id) -> version, started_at, status, wall_ms
+
+Queries:
+  versions      workflow versions seen, in order, with run counts
+  percentiles   per-node p50 / p95 / max, error rate and output size
+  trend         one node's p50 / p95 by day or by version
+  regressions   nodes whose p50 grew between consecutive versions
+
+Regressions are also checked automatically after each ingest for the
+versions it touched.
+
+Usage:
+  python node_metrics.py ingest execution_2764_full.json exports/*.json
+  python node_metrics.py percentiles --top 15
+  python node_metrics.py trend "1st Scoring Agent2" --by version
+  python node_metrics.py regressions --threshold 1.25 --min-ms 1000
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import statistics
+import sys
+from datetime import datetime, timezone
+
+from n8n_utils import execution_wall_ms, iter_executions, node_hashes, percentile, timestamp_ms
+
+DB_PATH = "node_metrics.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    execution_id TEXT NOT NULL,
+    workflow_id TEXT NOT NULL,
+    workflow_name TEXT,
+    version TEXT NOT NULL,
+    started_at TEXT,
+    date TEXT,
+    status TEXT,
+    wall_ms INTEGER,
+    source TEXT,
+    PRIMARY KEY (execution_id, workflow_id)
+);
+CREATE TABLE IF NOT EXISTS node_runs (
+    execution_id TEXT NOT NULL,
+    workflow_id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    node TEXT NOT NULL,
+    node_type TEXT,
+    run_index INTEGER NOT NULL,
+    date TEXT,
+    started_at INTEGER,
+    duration_ms INTEGER,
+    status TEXT,
+    output_bytes INTEGER,
+    items INTEGER,
+    PRIMARY KEY (execution_id, workflow_id, node, run_index)
+);
+CREATE INDEX IF NOT EXISTS node_runs_version_node ON node_runs (version, node);
+CREATE INDEX IF NOT EXISTS node_runs_node_date ON node_runs (node, date);
+CREATE INDEX IF NOT EXISTS executions_workflow_started ON executions (workflow_id, started_at);
+"""
+
+
+def workflow_version(wf):
+    """Short hash of the node bodies (positions excluded) and connections."""
+    if not wf or not wf.get("nodes"):
+        return "unknown"
+    hashes = sorted((name, digest) for name, (digest, _) in node_hashes(wf).items())
+    data = json.dumps([hashes, wf.get("connections") or {}], sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:12]
+
+
+def _date(ms):
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def node_rows(execution):
+    """One row per node run: (node, type, run_index, started_at, duration_ms, status, output_bytes, items)."""
+    types = {n["name"]: n.get("type") for n in (execution.get("workflowData") or {}).get("nodes", [])}
+    for name, runs in execution["data"]["resultData"]["runData"].items():
+        for i, run in enumerate(runs):
+            data = run.get("data") or {}
+            items = sum(len(output or []) for outputs in data.values() for output in outputs or [])
+            status = run.get("executionStatus") or ("error" if run.get("error") else "success")
+            yield (name, types.get(name), i, run.get("startTime"), run.get("executionTime") or 0, status,
+                   len(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")), items)
+
+
+class NodeMetricsStore:
+    def __init__(self, path=DB_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def ingest(self, execution, source):
+        """Add one execution; returns (version, node runs added), added = 0 if it was already stored."""
+        wf = execution.get("workflowData") or {}
+        workflow_id = execution.get("workflowId") or wf.get("id") or wf.get("name") or "unknown"
+        version = workflow_version(wf)
+        started = timestamp_ms(execution["startedAt"]) if execution.get("startedAt") else None
+        with self.db:
+            cur = self.db.execute(
+                "INSERT OR IGNORE INTO executions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(execution.get("id")), workflow_id, wf.get("name"), version, execution.get("startedAt"),
+                 _date(started) if started else None, execution.get("status"), execution_wall_ms(execution), source))
+            if not cur.rowcount:
+                return version, 0
+            rows = [(str(execution.get("id")), workflow_id, version, name, node_type, i,
+                     _date(start or started) if (start or started) else None, start, duration, status, size, items)
+                    for name, node_type, i, start, duration, status, size, items in node_rows(execution)]
+            self.db.executemany("INSERT OR IGNORE INTO node_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return version, len(rows)
+
+    def versions(self, workflow_id=None):
+        """[(workflow_id, version, first started_at, executions, workflow_name)] in first-seen order."""
+        query = ("SELECT workflow_id, version, MIN(started_at), COUNT(*), MAX(workflow_name) FROM executions "
+                 + ("WHERE workflow_id = ? " if workflow_id else "")
+                 + "GROUP BY workflow_id, version ORDER BY workflow_id, MIN(started_at)")
+        return self.db.execute(query, (workflow_id,) if workflow_id else ()).fetchall()
+
+    def durations(self, where="", params=()):
+        """{node: [duration_ms, ...]} for the matching node runs."""
+        grouped = {}
+        for node, duration in self.db.execute(f"SELECT node, duration_ms FROM node_runs {where}", params):
+            grouped.setdefault(node, []).append(duration)
+        return grouped
+
+    def percentiles(self, node=None, version=None, since=None):
+        clauses, params = [], []
+        for column, op, value in (("node", "LIKE", node), ("version", "=", version), ("date", ">=", since)):
+            if value:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        stats = {}
+        for node_name, n, errors, avg_bytes in self.db.execute(
+                f"SELECT node, COUNT(*), SUM(status != 'success'), AVG(output_bytes) FROM node_runs {where} "
+                f"GROUP BY node", params):
+            stats[node_name] = {"runs": n, "errors": errors, "avg_bytes": avg_bytes}
+        for node_name, values in self.durations(where, params).items():
+            stats[node_name].update(p50=statistics.median(values), p95=percentile(values, 95), max=max(values))
+        return stats
+
+    def trend(self, node, by="date"):
+        """[(date or version, runs, p50, p95)] for one node."""
+        column = "date" if by == "date" else "version"
+        buckets = {}
+        for key, duration in self.db.execute(
+                f"SELECT {column}, duration_ms FROM node_runs WHERE node = ? ORDER BY started_at", (node,)):
+            buckets.setdefault(key, []).append(duration)
+        return [(key, len(v), statistics.median(v), percentile(v, 95)) for key, v in buckets.items()]
+
+    def regressions(self, threshold=1.2, min_ms=500, versions=None):
+        """[(workflow_id, old version, new version, node, old p50, new p50)] between consecutive versions."""
+        flagged = []
+        by_workflow = {}
+        for workflow_id, version, *_ in self.versions():
+            by_workflow.setdefault(workflow_id, []).append(version)
+        for workflow_id, ordered in by_workflow.items():
+            for old, new in zip(ordered, ordered[1:]):
+                if versions and new not in versions and old not in versions:
+                    continue
+                before = self.durations("WHERE workflow_id = ? AND version = ?", (workflow_id, old))
+                after = self.durations("WHERE workflow_id = ? AND version = ?", (workflow_id, new))
+                for node in sorted(set(before) & set(after)):
+                    old_p50, new_p50 = statistics.median(before[node]), statistics.median(after[node])
+                    if new_p50 - old_p50 >= min_ms and new_p50 > old_p50 * threshold:
+                        flagged.append((workflow_id, old, new, node, old_p50, new_p50))
+        return flagged
+
+
+def _print_regressions(flagged):
+    for workflow_id, old, new, node, old_p50, new_p50 in flagged:
+        print(f"  ! {node}: p50 {old_p50 / 1000:.1f}s -> {new_p50 / 1000:.1f}s "
+              f"(x{new_p50 / max(old_p50, 1):.1f}) in {workflow_id} {old} -> {new}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="Append node metrics from execution exports")
+    ingest.add_argument("files", nargs="+")
+    versions = sub.add_parser("versions", help="Workflow versions seen")
+    versions.add_argument("--workflow")
+    pct = sub.add_parser("percentiles", help="Per-node latency percentiles")
+    pct.add_argument("--node", help="SQL LIKE pattern, e.g. '%%Scoring%%'")
+    pct.add_argument("--version")
+    pct.add_argument("--since", help="YYYY-MM-DD")
+    pct.add_argument("--top", type=int, default=20)
+    trend = sub.add_parser("trend", help="One node's latency over time")
+    trend.add_argument("node")
+    trend.add_argument("--by", choices=["date", "version"], default="date")
+    for p in (ingest, sub.add_parser("regressions", help="p50 regressions between consecutive versions")):
+        p.add_argument("--threshold", type=float, default=1.2, help="Flag when p50 grows by this factor")
+        p.add_argument("--min-ms", type=float, default=500, help="...and by at least this many ms")
+    args = parser.parse_args()
+    store = NodeMetricsStore(args.db)
+
+    if args.command == "ingest":
+        touched = set()
+        for path in args.files:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            executions = list(iter_executions(data))
+            if not executions:
+                print(f"- {path}: no execution data, skipped")
+                continue
+            for execution in executions:
+                version, added = store.ingest(execution, os.path.basename(path))
+                touched.add(version)
+                if added:
+                    print(f"  + {path}: execution {execution.get('id')} (version {version}), {added} node run(s)")
+                else:
+                    print(f"  = {path}: execution {execution.get('id')} already stored")
+        flagged = store.regressions(args.threshold, args.min_ms, touched)
+        if flagged:
+            print(f"\nWARNING: {len(flagged)} node(s) slower after a workflow change:")
+            _print_regressions(flagged)
+    elif args.command == "versions":
+        for workflow_id, version, first, n, name in store.versions(args.workflow):
+            print(f"{workflow_id}  {version}  first run {first}  {n:>4} execution(s)  {name or ''}")
+    elif args.command == "percentiles":
+        stats = store.percentiles(args.node, args.version, args.since)
+        if not stats:
+            print("No matching node runs")
+            sys.exit(1)
+        print(f"{'node':<45} {'runs':>5} {'p50':>8} {'p95':>8} {'max':>8} {'err':>5} {'out':>8}")
+        for node, s in sorted(stats.items(), key=lambda kv: -kv[1]["p50"])[:args.top]:
+            print(f"{node[:45]:<45} {s['runs']:>5} {s['p50'] / 1000:>7.1f}s {s['p95'] / 1000:>7.1f}s "
+                  f"{s['max'] / 1000:>7.1f}s {s['errors'] / s['runs']:>5.0%} {s['avg_bytes'] / 1024:>6.0f}KB")
+    elif args.command == "trend":
+        rows = store.trend(args.node, args.by)
+        if not rows:
+            print(f"No runs of '{args.node}'")
+            sys.exit(1)
+        for key, n, p50, p95 in rows:
+            print(f"{key}  {n:>4} run(s)  p50 {p50 / 1000:6.1f}s  p95 {p95 / 1000:6.1f}s")
+    else:
+        flagged = store.regressions(args.threshold, args.min_ms)
+        if not flagged:
+            print("✅ No p50 regressions between consecutive versions")
+        _print_regressions(flagged)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Dependency-driven parallelisation pass.
+
+Scripts like inject_keyword_node.py / inject_validator_node.py always "insert
+between" two nodes, so A -> B -> C stays sequential even when C never reads B.
+This pass combines the connection graph with real data dependencies:
+
+  - explicit:  $('X'), $("X"), $node["X"], $items("X") in parameters / jsCode
+  - implicit:  $json / $input / $binary / items -> the node's direct main predecessor
+  - paired:    $('X').item / $node["X"] resolve through the item's ancestor path,
+               so X has to stay upstream of the reader; a reader anywhere
+               below C pins B in place
+  - dynamic:   $(name) / $node[name] with a non-literal name can read any
+               node, so nothing upstream of such a node is rewritten
+
+and rewrites every chain A -> B -> C where C does not depend on B into
+
+  A -> B -> Merge <name> (input 2) -> J
+  A -> C -> ... -> Merge <name> (input 1)
+
+where J is the first downstream node that references B with .first() /
+.last() / .all(). If nothing downstream reads B the chain is left alone
+rather than turning B into a branch nothing waits for. Merge nodes pass
+input 1 through, so J's $json is unchanged.
+
+Default is a dry run that lists the rewrites and the projected critical path
+(longest path, weighted by recorded executionTime when --execution is given).
+n8n executes one node at a time per execution, so the critical path is the
+floor the run would reach if those branches overlapped. --apply refuses to
+write when the projected reduction is below --min-reduction (default 5%):
+each rewrite changes execution order, which is not worth a few seconds.
+
+Usage:
+  python parallelise_workflow.py "PROD Skywide Content v23.json" --execution execution_2764_full.json
+  python parallelise_workflow.py "PROD Skywide Content v23.json" --apply -o "PROD Skywide Content v24.json"
+"""
+import argparse
+import re
+import sys
+
+from n8n_utils import (
+    CODE_TYPE, HTTP_TYPE, GOOGLE_DOCS_TYPE, GOOGLE_DRIVE_TYPE, IF_TYPE, LLM_CHAIN_TYPES,
+    LLM_TYPES, MERGE_TYPE, WAIT_TYPE,
+    gen_id, iter_edges, load_execution, load_workflow, node_index, node_timings,
+    predecessors, reachable, save_workflow, sub_nodes, successors,
+)
+
+REF_PATTERN = re.compile(r"""\$(?:\(\s*|items\(\s*|node\[\s*)(['"])(.+?)\1""")
+PAIRED_PATTERN = re.compile(
+    r"""\$\(\s*(['"])(.+?)\1\s*\)\s*\.\s*(?:item|itemMatching|pairedItem)\b|\$node\[\s*(['"])(.+?)\3\s*\]""")
+DYNAMIC_PATTERN = re.compile(r"""\$(?:\(|items\(|node\[)\s*(?![\s'")])""")
+INPUT_PATTERN = re.compile(r"\$json|\$input|\$binary|\$item\b|\bitems\b|\$\(\s*['\"]?\s*\)")
+
+# Nodes whose output is (mostly) their input, or whose outputs mean control flow
+CONTROL_TYPES = {IF_TYPE, MERGE_TYPE, WAIT_TYPE, "n8n-nodes-base.switch", "n8n-nodes-base.filter"}
+
+# External writes stay in order: downstream "Signal Completion" calls announce them
+WRITE_TYPES = {GOOGLE_DOCS_TYPE, GOOGLE_DRIVE_TYPE}
+
+# Fallback weights (ms) when no execution export is given
+DEFAULT_WEIGHTS = {"llm": 30000, "io": 1000, "other": 10}
+
+# Stands in for every node name when a reference is not a literal
+ANY_NODE = "*"
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _strings(v)
+
+
+def node_dependencies(node):
+    """(referenced node names, names read through paired items, uses direct input)"""
+    refs, paired, uses_input = set(), set(), False
+    for text in _strings(node.get("parameters", {})):
+        refs |= {m.group(2) for m in REF_PATTERN.finditer(text)}
+        paired |= {m.group(2) or m.group(4) for m in PAIRED_PATTERN.finditer(text)}
+        if DYNAMIC_PATTERN.search(text):
+            refs.add(ANY_NODE)
+            paired.add(ANY_NODE)
+        uses_input = uses_input or bool(INPUT_PATTERN.search(text))
+    return refs, paired, uses_input
+
+
+def find_rewrite(wf):
+    """Return the first (a, a_output, b, c, join) chain that can run in parallel, or None."""
+    by_name = node_index(wf)
+    succ, pred = successors(wf), predecessors(wf)
+    deps = {name: node_dependencies(node) for name, node in by_name.items()}
+    edges = list(iter_edges(wf))
+    on_cycle = {n for n in by_name if any(s == n or n in reachable(s, succ) for s in succ[n])}
+
+    for a, a_output, b, _ in edges:
+        node_b = by_name.get(b)
+        if not node_b or node_b["type"] in CONTROL_TYPES | WRITE_TYPES or b in on_cycle:
+            continue
+        if len(pred[b]) != 1 or len(succ[b]) != 1:
+            continue
+        if len(wf["connections"][b]["main"]) != 1:
+            continue
+        c = succ[b][0]
+        node_c = by_name.get(c)
+        if not node_c or node_c["type"] in CONTROL_TYPES or len(pred[c]) != 1:
+            continue
+        c_refs, _, c_uses_input = deps[c]
+        if c_uses_input or b in c_refs or ANY_NODE in c_refs:
+            continue
+
+        downstream = reachable(c, succ) | {c}
+        # Off the Merge's pass-through input, B is no longer on the paired-item path
+        if any(deps[n][1] & {b, ANY_NODE} for n in downstream):
+            continue
+        readers = {n for n in downstream if b in deps[n][0]}
+        if not readers:
+            continue
+        join = None
+        # First reader that every other reader sits downstream of
+        for r in readers:
+            if readers - {r} <= reachable(r, succ) and len(pred[r]) == 1 \
+                    and by_name[r]["type"] != MERGE_TYPE and r not in on_cycle:
+                join = r
+                break
+        if join is None:
+            continue
+        return a, a_output, b, c, join
+    return None
+
+
+def apply_rewrite(wf, rewrite):
+    a, a_output, b, c, join = rewrite
+    by_name = node_index(wf)
+    conns = wf["connections"]
+
+    # A now feeds C directly as well as B
+    conns[a]["main"][a_output].append({"node": c, "type": "main", "index": 0})
+    conns[b]["main"][0] = [t for t in conns[b]["main"][0] if t["node"] != c]
+
+    merge_name = f"Merge {b}"
+    join_pred = predecessors(wf)[join][0]
+    for outputs in conns[join_pred]["main"]:
+        for t in outputs or []:
+            if t["node"] == join:
+                t.update({"node": merge_name, "index": 0})
+    conns[b]["main"][0].append({"node": merge_name, "type": "main", "index": 1})
+    conns[merge_name] = {"main": [[{"node": join, "type": "main", "index": 0}]]}
+    x, y = by_name[join]["position"]
+    wf["nodes"].append({
+        "parameters": {
+            "mode": "chooseBranch",
+            "chooseBranchMode": "waitForAll",
+            "output": "specifiedInput",
+            "useDataOfInput": 1
+        },
+        "type": MERGE_TYPE,
+        "typeVersion": 3.2,
+        "position": [x - 200, y],
+        "id": gen_id(),
+        "name": merge_name,
+        "notesInFlow": True,
+        "notes": f"Joins the parallel {b} branch"
+    })
+    return merge_name
+
+
+def node_weights(wf, execution=None):
+    if execution:
+        return {name: sum(ts) / len(ts) for name, ts in node_timings(execution).items() if ts}
+    weights = {}
+    for node in wf["nodes"]:
+        if node["type"] in LLM_TYPES | LLM_CHAIN_TYPES:
+            weights[node["name"]] = DEFAULT_WEIGHTS["llm"]
+        elif node["type"] in (HTTP_TYPE, GOOGLE_DOCS_TYPE, GOOGLE_DRIVE_TYPE, CODE_TYPE):
+            weights[node["name"]] = DEFAULT_WEIGHTS["io"]
+        else:
+            weights[node["name"]] = DEFAULT_WEIGHTS["other"]
+    return weights
+
+
+def critical_path(wf, weights):
+    """Longest weighted path through the main graph, ignoring loop back-edges."""
+    succ, pred = successors(wf), predecessors(wf)
+    subs = sub_nodes(wf)
+    # Start from triggers so loop back-edges (not forward edges) are the ones dropped
+    nodes = sorted((n["name"] for n in wf["nodes"] if n["name"] not in subs), key=lambda n: bool(pred[n]))
+
+    # Drop back-edges found by an iterative DFS so the rest is a DAG
+    state, dag = {}, {n: [] for n in nodes}
+    for root in nodes:
+        if root in state:
+            continue
+        stack = [(root, iter(succ.get(root, [])))]
+        state[root] = "open"
+        while stack:
+            name, it = stack[-1]
+            nxt = next(it, None)
+            if nxt is None:
+                state[name] = "done"
+                stack.pop()
+            elif state.get(nxt) == "open":
+                continue
+            else:
+                dag[name].append(nxt)
+                if nxt not in state:
+                    state[nxt] = "open"
+                    stack.append((nxt, iter(succ.get(nxt, []))))
+
+    indegree = {n: 0 for n in dag}
+    for targets in dag.values():
+        for t in targets:
+            indegree[t] = indegree.get(t, 0) + 1
+    order = [n for n, d in indegree.items() if d == 0]
+    best = {n: weights.get(n, 0) for n in order}
+    prev = {}
+    for name in order:
+        for t in dag.get(name, []):
+            cand = best[name] + weights.get(t, 0)
+            if cand > best.get(t, -1):
+                best[t], prev[t] = cand, name
+            indegree[t] -= 1
+            if indegree[t] == 0:
+                order.append(t)
+    if not best:
+        return 0, []
+    end = max(best, key=best.get)
+    path = [end]
+    while path[-1] in prev:
+        path.append(prev[path[-1]])
+    return best[end], path[::-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workflow")
+    parser.add_argument("--execution", help="Execution export for node weights")
+    parser.add_argument("--apply", action="store_true", help="Write the rewritten workflow")
+    parser.add_argument("-o", "--output", help="Output path with --apply (default: overwrite input)")
+    parser.add_argument("--min-reduction", type=float, default=0.05,
+                        help="Smallest projected critical-path reduction --apply writes (fraction, default 0.05)")
+    args = parser.parse_args()
+
+    wf = load_workflow(args.workflow)
+    execution = load_execution(args.execution) if args.execution else None
+    weights = node_weights(wf, execution)
+    before, before_path = critical_path(wf, weights)
+
+    rewrites = []
+    while True:
+        rewrite = find_rewrite(wf)
+        if not rewrite:
+            break
+        merge = apply_rewrite(wf, rewrite)
+        rewrites.append(rewrite)
+        a, _, b, c, join = rewrite
+        print(f"  ~ {a} -> {b} -> {c}: {c} does not read {b}; run in parallel, joined at {merge} -> {join}")
+
+    after, after_path = critical_path(wf, weights)
+    print(f"\n{len(rewrites)} sequential edge(s) without a data dependency")
+    print(f"Critical path before: {before / 1000:.1f}s ({len(before_path)} nodes)")
+    print(f"Critical path after:  {after / 1000:.1f}s ({len(after_path)} nodes)")
+    reduction = (before - after) / before if before else 0
+    if before:
+        print(f"Projected reduction:  {(before - after) / 1000:.1f}s ({reduction:.1%})")
+
+    if args.apply and rewrites and reduction < args.min_reduction:
+        print(f"\n❌ Projected reduction {reduction:.1%} is below --min-reduction {args.min_reduction:.0%}; not writing.")
+        sys.exit(1)
+    elif args.apply and rewrites:
+        save_workflow(wf, args.output or args.workflow)
+        print(f"\n✅ Wrote {args.output or args.workflow}. Re-import into n8n.")
+    elif rewrites:
+        print("\nDry run: re-run with --apply to write the rewritten workflow.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Pin recorded node outputs so a dev run starts mid-pipeline.
+
+Takes an execution export and a "start from" node, and writes a copy of the
+workflow whose pinData holds the recorded output of every upstream node.
+Pinned nodes don't execute, so a manual run goes straight from Webhook1 to
+the start node with the exact data the real run had.
+
+Fixtures are trimmed to what the start node and everything downstream of it
+actually read:
+  - $('X').item/first()/last()/all()[i].json.a.b and $node["X"].json.a.b
+    keep only X's json.a.b
+  - $json.a / $input.first().json.a keep field a of the direct predecessor
+  - anything unparseable ($('X').all(), $input.all(), items, .binary) keeps
+    the node's full output
+  - a path that runs past a string or list (json.message.content.length)
+    keeps that value whole
+Upstream nodes nothing reads keep their item count with empty json.
+If anything that runs live reads a node by a computed name ($node[nodeName],
+$(name)), every pinned node keeps its full output.
+
+IF / Switch nodes that reach the start node through a non-first output are
+left unpinned (pinData only feeds output 0); they re-run on the pinned data.
+Upstream nodes inside a loop with the start node are left unpinned too.
+
+Usage:
+  python pin_execution_data.py execution_2764_full.json --start "1st Scoring Agent2"
+  python pin_execution_data.py execution_2764_full.json --start "Scoring7" \\
+      --workflow "PROD Skywide Content v23.json" -o "PROD v23 (from Scoring7).json"
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+from n8n_utils import (
+    iter_edges, load_execution, load_workflow, node_index, predecessors,
+    reachable, run_output, save_workflow, sub_nodes, successors,
+)
+
+WHOLE = "*"
+
+REF_PATTERN = re.compile(r"""\$(?:\(\s*(['"])(?P<call>.+?)\1\s*\)|node\[\s*(['"])(?P<index>.+?)\3\s*\])""")
+ITEMS_PATTERN = re.compile(r"""\$items\(\s*(['"])(.+?)\1""")
+ACCESSOR_PATTERN = re.compile(
+    r"""(?:\s*\.\s*(?:item|first\(\s*\)|last\(\s*\)|all\(\s*\)\s*\[\s*\d+\s*\]|itemMatching\([^()]*\))"""
+    r"""|\s*\[\s*\d+\s*\])*\s*\.\s*json\b""")
+INPUT_PATTERN = re.compile(
+    r"""\$json\b|\$input\s*\.\s*(?:item|first\(\s*\)|last\(\s*\)|all\(\s*\)\s*\[\s*\d+\s*\])\s*\.\s*json\b""")
+INPUT_WHOLE_PATTERN = re.compile(r"""\$input\s*\.\s*all\(\s*\)(?!\s*\[)|\bitems\b|\$binary\b""")
+DYNAMIC_PATTERN = re.compile(r"""\$(?:\(|node\[|items\()\s*(?![\s'")])""")
+SEGMENT_PATTERN = re.compile(r"""\s*(?:\.\s*([A-Za-z_$][\w$]*)|\[\s*(['"])(.+?)\2\s*\])""")
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _strings(v)
+
+
+def _path_at(text, pos):
+    """Field path following a `.json` accessor, e.g. ('body', 'request_id')."""
+    path = []
+    while True:
+        m = SEGMENT_PATTERN.match(text, pos)
+        if not m:
+            break
+        # `.json.text.trim()` reads text, not a field called trim
+        if text[m.end():].lstrip().startswith("("):
+            break
+        path.append(m.group(1) or m.group(3))
+        pos = m.end()
+    return tuple(path)
+
+
+def referenced_fields(wf, readers):
+    """Map node name -> set of json paths (or WHOLE) that `readers` read from it."""
+    by_name = node_index(wf)
+    pred = predecessors(wf)
+    fields = {}
+    for reader in readers:
+        for text in _strings(by_name[reader].get("parameters", {})):
+            for m in REF_PATTERN.finditer(text):
+                name = m.group("call") or m.group("index")
+                acc = ACCESSOR_PATTERN.match(text, m.end())
+                fields.setdefault(name, set()).add(_path_at(text, acc.end()) if acc else WHOLE)
+            for m in ITEMS_PATTERN.finditer(text):
+                fields.setdefault(m.group(2), set()).add(WHOLE)
+            # $json & co. read whichever node feeds the reader directly
+            uses = {_path_at(text, m.end()) for m in INPUT_PATTERN.finditer(text)}
+            if INPUT_WHOLE_PATTERN.search(text):
+                uses.add(WHOLE)
+            for source in pred.get(reader, []):
+                fields.setdefault(source, set()).update(uses)
+    return fields
+
+
+def dynamic_readers(wf, readers):
+    """Readers that pick a node by a computed name, so any node may be read."""
+    by_name = node_index(wf)
+    return {reader for reader in readers
+            if any(DYNAMIC_PATTERN.search(text) for text in _strings(by_name[reader].get("parameters", {})))}
+
+
+def trim(data, paths):
+    """Keep only the given paths of a json object.
+
+    A path can't be followed into a string or list (`.content.length`), so
+    those values are kept whole.
+    """
+    if WHOLE in paths or () in paths or not isinstance(data, dict):
+        return data
+    rest = {}
+    for path in paths:
+        rest.setdefault(path[0], set()).add(path[1:])
+    return {key: trim(data[key], tails) for key, tails in rest.items() if key in data}
+
+
+def pinned_fields(wf, pinned, live):
+    """(fields to keep per node, live nodes reading by computed name -> everything pinned kept whole)."""
+    dynamic = dynamic_readers(wf, live)
+    if dynamic:
+        return {name: {WHOLE} for name in pinned}, dynamic
+    return referenced_fields(wf, live), dynamic
+
+
+def pin_outputs(execution, names, fields, run=-1):
+    """pinData for `names`: each node's recorded items trimmed to the fields read from it."""
+    run_data = execution["data"]["resultData"]["runData"]
+    pin_data = {}
+    for name in names:
+        runs = run_data[name]
+        index = run if run >= 0 else len(runs) + run
+        items = run_output(execution, name, max(0, min(index, len(runs) - 1)))
+        pin_data[name] = [{"json": trim(item.get("json", {}), fields.get(name, set()))} for item in items]
+    return pin_data
+
+
+def downstream_of(wf, start):
+    """The start node, everything after it, and the sub-nodes those use."""
+    nodes = reachable(start, successors(wf)) | {start}
+    subs = sub_nodes(wf)
+    conn_types = {t for outputs in wf.get("connections", {}).values() for t in outputs if t.startswith("ai_")}
+    for conn_type in conn_types:
+        for source, _, target, _ in iter_edges(wf, conn_type):
+            if source in subs and target in nodes:
+                nodes.add(source)
+    return nodes
+
+
+def pin_plan(wf, start, run_data):
+    """(nodes to pin, upstream nodes left unpinned with a reason, downstream nodes)."""
+    pred = predecessors(wf)
+    upstream = reachable(start, pred) - sub_nodes(wf)
+    downstream = downstream_of(wf, start)
+    toward_start = upstream | {start}
+    pinned, skipped = [], {}
+    for name in sorted(upstream):
+        if name in downstream:
+            skipped[name] = "in a loop with the start node"
+            continue
+        if not run_data.get(name):
+            skipped[name] = "did not run in this execution"
+            continue
+        outputs = wf["connections"].get(name, {}).get("main") or []
+        used = {i for i, targets in enumerate(outputs) for t in targets or [] if t["node"] in toward_start}
+        if used - {0}:
+            skipped[name] = f"reaches the start node through output {max(used)}"
+            continue
+        pinned.append(name)
+    return pinned, skipped, downstream
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("execution", help="Execution export (e.g. execution_2764_full.json)")
+    parser.add_argument("--start", required=True, help="First node that should really execute")
+    parser.add_argument("--workflow", help="Workflow to pin into (default: the export's own workflowData)")
+    parser.add_argument("--run", type=int, default=-1, help="Which recorded run of looped nodes to pin (default: last)")
+    parser.add_argument("--full", action="store_true", help="Pin full outputs, no trimming")
+    parser.add_argument("-o", "--output", help="Output path (default: '<workflow or export> (from <start>).json')")
+    args = parser.parse_args()
+
+    execution = load_execution(args.execution)
+    wf = load_workflow(args.workflow) if args.workflow else execution["workflowData"]
+    run_data = execution["data"]["resultData"]["runData"]
+    if args.start not in node_index(wf):
+        print(f"❌ Start node '{args.start}' not found in the workflow")
+        sys.exit(1)
+
+    pinned, skipped, downstream = pin_plan(wf, args.start, run_data)
+    # Unpinned upstream nodes run live too, so their reads count
+    fields, dynamic = pinned_fields(wf, pinned, downstream | set(skipped))
+    if dynamic and not args.full:
+        print(f"WARNING: {', '.join(sorted(dynamic))} read nodes by a computed name; pinning full outputs")
+    if args.full:
+        fields = {name: {WHOLE} for name in pinned}
+    pin_data = pin_outputs(execution, pinned, fields, args.run)
+    recorded = pin_outputs(execution, pinned, {name: {WHOLE} for name in pinned}, args.run)
+    full_bytes, pinned_bytes = 0, 0
+    for name in pinned:
+        full_bytes += len(json.dumps(recorded[name]))
+        pinned_bytes += len(json.dumps(pin_data[name]))
+        paths = fields.get(name, set())
+        read = "full" if WHOLE in paths or () in paths else ", ".join(".".join(p) for p in sorted(paths)) or "-"
+        print(f"  📌 {name}: {len(pin_data[name])} item(s), keeps {read}")
+
+    for name, reason in sorted(skipped.items()):
+        print(f"  ! {name}: not pinned, {reason}")
+    for name in sorted(set(fields) - set(pin_data) - downstream - set(skipped) - {args.start}):
+        if name in node_index(wf):
+            print(f"  WARNING: downstream reads '{name}', which is not upstream of {args.start}")
+
+    wf["pinData"] = pin_data
+    output = args.output or f"{os.path.splitext(args.workflow or args.execution)[0]} (from {args.start}).json"
+    save_workflow(wf, output)
+    print(f"\n✅ Pinned {len(pin_data)} node(s) -> {output}")
+    if full_bytes:
+        print(f"Fixtures: {pinned_bytes / 1024:.0f}KB pinned vs {full_bytes / 1024:.0f}KB recorded "
+              f"({pinned_bytes / full_bytes:.0%})")
+    print(f"Run the workflow manually in n8n; execution starts live at '{args.start}'.")
+
+
+if __name__ == "__main__":
+    main()
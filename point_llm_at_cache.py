@@ -0,0 +1,139 @@
+"""
+Point a workflow's LLM calls at llm_cache_proxy.py for test mode.
+
+Writes a "(CACHED)" copy of the workflow:
+  - OpenAI Chat Model sub-nodes get options.baseURL = <proxy>/openai/v1
+  - OpenAI message nodes and Anthropic Chat Model sub-nodes switch to the
+    cache credentials (same API key, Base URL set to the proxy), since they
+    have no per-node base URL
+  - Perplexity nodes become HTTP Request nodes posting the same messages to
+    <proxy>/perplexity/chat/completions with the perplexityApi credential,
+    so downstream nodes still see the raw API response
+
+Create the two cache credentials in n8n once:
+  OpenAI    "LLM Cache (OpenAI)"     Base URL http://<host>:8787/openai/v1
+  Anthropic "LLM Cache (Anthropic)"  Base URL http://<host>:8787/anthropic
+
+Usage:
+  python point_llm_at_cache.py "PROD Skywide Content v23.json" --proxy http://host.docker.internal:8787
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import urllib.parse
+
+from n8n_utils import HTTP_TYPE, PERPLEXITY_TYPE, load_workflow, save_workflow
+
+DEFAULT_PROXY = "http://localhost:8787"
+OPENAI_MESSAGE_TYPE = "@n8n/n8n-nodes-langchain.openAi"
+OPENAI_CHAT_TYPE = "@n8n/n8n-nodes-langchain.lmChatOpenAi"
+ANTHROPIC_CHAT_TYPE = "@n8n/n8n-nodes-langchain.lmChatAnthropic"
+
+EXPRESSION_PATTERN = re.compile(r"\{\{(.+?)\}\}", re.DOTALL)
+
+
+def credential_arg(value):
+    """'<id>:<name>' or just '<name>' -> n8n credential reference."""
+    cred_id, _, name = value.partition(":")
+    return {"id": cred_id, "name": name} if name else {"name": cred_id}
+
+
+def _guard_braces(text):
+    """Escape literal {{ / }} so they don't end the surrounding ={{ }} expression."""
+    return text.replace("{{", "\\u007b\\u007b").replace("}}", "\\u007d\\u007d")
+
+
+def _template_literal(text):
+    return _guard_braces(text.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${"))
+
+
+def js_string(value):
+    """An n8n parameter value as a JS expression: '=' templates become template literals."""
+    if not isinstance(value, str) or not value.startswith("="):
+        # Unprefixed values are literal in n8n, even when they contain {{ }}
+        return _guard_braces(json.dumps(value))
+    parts, last = [], 0
+    template = value[1:]
+    for m in EXPRESSION_PATTERN.finditer(template):
+        parts.append(_template_literal(template[last:m.start()]) + "${" + m.group(1).strip() + "}")
+        last = m.end()
+    return "`" + "".join(parts) + _template_literal(template[last:]) + "`"
+
+
+def perplexity_to_http(node, proxy):
+    """Same request, sent through the proxy by an HTTP Request node."""
+    params = node["parameters"]
+    messages = [f"{{ role: {json.dumps(m.get('role') or 'user')}, content: {js_string(m.get('content', ''))} }}"
+                for m in (params.get("messages") or {}).get("message", [])]
+    body = [f"model: {js_string(params.get('model', 'sonar-pro'))}",
+            "messages: [\n    " + ",\n    ".join(messages) + "\n  ]"]
+    for key, value in (params.get("options") or {}).items():
+        body.append(f"{key}: {json.dumps(value)}")
+    node.update({
+        "parameters": {
+            "method": "POST",
+            "url": f"{proxy}/perplexity/chat/completions",
+            "authentication": "predefinedCredentialType",
+            "nodeCredentialType": "perplexityApi",
+            "sendBody": True,
+            "specifyBody": "json",
+            "jsonBody": "={{ JSON.stringify({\n  " + ",\n  ".join(body) + "\n}) }}",
+            "options": {"timeout": 300000},
+        },
+        "type": HTTP_TYPE,
+        "typeVersion": 4.2,
+        "notesInFlow": True,
+        "notes": "Perplexity via LLM cache proxy",
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workflow")
+    parser.add_argument("-o", "--output", help="Output path (default: '<workflow> (CACHED).json')")
+    parser.add_argument("--proxy", default=DEFAULT_PROXY, help="Proxy URL as seen from the n8n instance")
+    parser.add_argument("--openai-credential", type=credential_arg, default=credential_arg("LLM Cache (OpenAI)"),
+                        help="'<id>:<name>' of the OpenAI credential whose Base URL is the proxy")
+    parser.add_argument("--anthropic-credential", type=credential_arg,
+                        default=credential_arg("LLM Cache (Anthropic)"),
+                        help="'<id>:<name>' of the Anthropic credential whose Base URL is the proxy")
+    args = parser.parse_args()
+
+    wf = load_workflow(args.workflow)
+    proxy = args.proxy.rstrip("/")
+    if any(n.get("notes") == "Perplexity via LLM cache proxy" for n in wf["nodes"]) or \
+            any(proxy in json.dumps(n.get("parameters", {})) for n in wf["nodes"] if n["type"] == OPENAI_CHAT_TYPE):
+        print("WARNING: Workflow already points at the LLM cache. Skipping.")
+        sys.exit(0)
+
+    counts = {"baseURL": 0, "credential": 0, "perplexity": 0}
+    for node in wf["nodes"]:
+        if node["type"] == OPENAI_CHAT_TYPE:
+            node["parameters"].setdefault("options", {})["baseURL"] = f"{proxy}/openai/v1"
+            counts["baseURL"] += 1
+        elif node["type"] == OPENAI_MESSAGE_TYPE:
+            node["credentials"] = {"openAiApi": dict(args.openai_credential)}
+            counts["credential"] += 1
+        elif node["type"] == ANTHROPIC_CHAT_TYPE:
+            node["credentials"] = {"anthropicApi": dict(args.anthropic_credential)}
+            counts["credential"] += 1
+        elif node["type"] == PERPLEXITY_TYPE:
+            perplexity_to_http(node, proxy)
+            counts["perplexity"] += 1
+        else:
+            continue
+        print(f"  ~ {node['name']}")
+
+    output = args.output or f"{os.path.splitext(args.workflow)[0]} (CACHED).json"
+    save_workflow(wf, output)
+    print(f"\n✅ {counts['baseURL']} base URL(s), {counts['credential']} credential swap(s), "
+          f"{counts['perplexity']} Perplexity node(s) -> {output}")
+    print(f"Start the proxy first: python llm_cache_proxy.py serve  (reachable from n8n at {proxy})")
+    if urllib.parse.urlparse(proxy).hostname not in ("localhost", "127.0.0.1"):
+        print("WARNING: the proxy binds 127.0.0.1 by default; pass serve --host <interface n8n can reach>")
+
+
+if __name__ == "__main__":
+    main()
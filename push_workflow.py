@@ -0,0 +1,300 @@
+"""
+Push local workflow files to n8n through its public REST API, only when
+they differ from the server copy.
+
+For each file the server copy is fetched (GET /api/v1/workflows/<id>) and
+compared node by node: each node is hashed (sha256 of the canonical JSON of
+every field except id, webhookId, position and notes), plus one hash each
+for the connections and the settings. So disabled, onError, retryOnFail,
+executeOnce, alwaysOutputData and the like count as changes. id and
+webhookId are n8n's own and never do; an edited note doesn't on its own
+but goes out with the next push, and a moved node is pushed as "moved". If nothing differs the workflow
+is left alone; otherwise a single PUT sends the updated definition (name,
+nodes, connections, settings) to the existing workflow, so its id, tags,
+active state and execution history are kept. pinData and meta are
+local-only and are never sent.
+
+Targets are given as FILE=ID. A file without "=ID" uses its own "id", or
+else the server workflow with the same name. Workflows are validated
+(workflow_validator.py) before anything is sent.
+
+Credentials come from N8N_BASE_URL and N8N_API_KEY (or --base-url /
+--api-key), the same variables the Next.js app uses; without N8N_BASE_URL
+the base URL falls back to https://n8n.skywide.bg like /api/proxy-n8n.
+
+--serve-mock runs a local stand-in for the /api/v1/workflows endpoints,
+seeded from the FILE=ID arguments, to try a push without touching n8n.
+
+Usage:
+  python push_workflow.py "DEV Skywide Content (Word Count Fix).json=t3LNiuZIghvobde3" --dry-run
+  python push_workflow.py "PROD Skywide Content v23.json=<id>" "GBP Post Automation v2.json"
+  python push_workflow.py --serve-mock 5679 "DEV Skywide  Content.json=t3LNiuZIghvobde3"
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from n8n_utils import json_hash, load_workflow, node_hashes
+from workflow_validator import WorkflowValidationError, check_workflow
+
+# Same fallback as src/app/api/proxy-n8n/route.ts
+DEFAULT_BASE_URL = "https://n8n.skywide.bg"
+API_PATH = "/api/v1/workflows"
+PAGE_SIZE = 100
+
+# The public API rejects any other top-level or settings keys with a 400
+PUT_FIELDS = ("name", "nodes", "connections", "settings", "staticData")
+SETTINGS_FIELDS = {
+    "saveExecutionProgress", "saveManualExecutions", "saveDataErrorExecution", "saveDataSuccessExecution",
+    "executionTimeout", "errorWorkflow", "timezone", "executionOrder", "callerPolicy", "callerIds",
+    "timeSavedPerExecution", "availableInMCP",
+}
+
+
+def _settings(wf):
+    return {k: v for k, v in (wf.get("settings") or {}).items() if k in SETTINGS_FIELDS}
+
+
+def workflow_delta(local, remote):
+    """What a push would change: {'added', 'removed', 'changed', 'moved', 'connections', 'settings'}."""
+    mine, theirs = node_hashes(local), node_hashes(remote)
+    return {
+        "added": sorted(set(mine) - set(theirs)),
+        "removed": sorted(set(theirs) - set(mine)),
+        "changed": sorted(n for n in set(mine) & set(theirs) if mine[n][0] != theirs[n][0]),
+        "moved": sorted(n for n in set(mine) & set(theirs) if mine[n][0] == theirs[n][0] and mine[n][1] != theirs[n][1]),
+        "connections": json_hash(local.get("connections") or {}) != json_hash(remote.get("connections") or {}),
+        "settings": json_hash(_settings(local)) != json_hash(_settings(remote)),
+        "name": bool(local.get("name")) and local.get("name") != remote.get("name"),
+    }
+
+
+def put_body(local, remote):
+    body = {
+        "name": local.get("name") or remote.get("name"),
+        "nodes": local["nodes"],
+        "connections": local.get("connections") or {},
+        "settings": _settings(local) if "settings" in local else _settings(remote),
+    }
+    if local.get("staticData") is not None:
+        body["staticData"] = local["staticData"]
+    return body
+
+
+class N8nApi:
+    def __init__(self, base_url, api_key):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+
+    def _request(self, method, path, body=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.base_url + API_PATH + path, data=data, method=method)
+        req.add_header("X-N8N-API-KEY", self.api_key)
+        req.add_header("Accept", "application/json")
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"{method} {path} -> {e.code}: {e.read().decode('utf-8', 'replace')[:300]}") from None
+
+    def get(self, workflow_id):
+        return self._request("GET", f"/{urllib.parse.quote(workflow_id)}")
+
+    def find_by_name(self, name):
+        """Workflow id with this exact name, paging through the list endpoint."""
+        cursor = None
+        while True:
+            query = f"?limit={PAGE_SIZE}" + (f"&cursor={urllib.parse.quote(cursor)}" if cursor else "")
+            page = self._request("GET", query)
+            for wf in page.get("data", []):
+                if wf.get("name") == name:
+                    return wf["id"]
+            cursor = page.get("nextCursor")
+            if not cursor:
+                return None
+
+    def put(self, workflow_id, body):
+        return self._request("PUT", f"/{urllib.parse.quote(workflow_id)}", body)
+
+
+def parse_target(arg):
+    path, _, workflow_id = arg.partition("=")
+    if workflow_id and not os.path.exists(path) and os.path.exists(arg):
+        return arg, None
+    return path, workflow_id or None
+
+
+def push_one(api, path, workflow_id, dry_run):
+    """Push one file; returns (status, message lines). status: pushed / unchanged / would-push / failed."""
+    lines = []
+    try:
+        local = load_workflow(path)
+        try:
+            check_workflow(local, path)
+        except WorkflowValidationError as e:
+            return "failed", [f"❌ {path}: {e}"]
+        workflow_id = workflow_id or local.get("id") or (local.get("name") and api.find_by_name(local["name"]))
+        if not workflow_id:
+            return "failed", [f"❌ {path}: no workflow id (use FILE=ID; the file has no id or matching name)"]
+        remote = api.get(workflow_id)
+        delta = workflow_delta(local, remote)
+        label = f"{path} -> {workflow_id} ({remote.get('name')})"
+        if not any(delta.values()):
+            return "unchanged", [f"= {label}: up to date, nothing sent"]
+
+        for name in delta["added"]:
+            lines.append(f"  + {name}")
+        for name in delta["removed"]:
+            lines.append(f"  - {name}")
+        for name in delta["changed"]:
+            lines.append(f"  ~ {name}")
+        if delta["moved"]:
+            lines.append(f"  ~ {len(delta['moved'])} node(s) moved on the canvas")
+        for field in ("connections", "settings", "name"):
+            if delta[field]:
+                lines.append(f"  ~ {field}")
+
+        body = put_body(local, remote)
+        size = len(json.dumps(body, ensure_ascii=False).encode("utf-8"))
+        summary = (f"{len(delta['added'])} added, {len(delta['removed'])} removed, "
+                   f"{len(delta['changed'])} changed of {len(local['nodes'])} node(s); {size / 1024:.0f}KB")
+        if dry_run:
+            return "would-push", [f"~ {label}: would push ({summary})"] + lines
+        api.put(workflow_id, body)
+        return "pushed", [f"✅ {label}: pushed ({summary})"] + lines
+    except Exception as e:
+        return "failed", [f"❌ {path}: {e}"] + lines
+
+
+class MockN8nApi(BaseHTTPRequestHandler):
+    """In-memory stand-in for GET/PUT /api/v1/workflows, with the public API's key check."""
+    workflows = {}
+    api_key = "mock"
+    lock = threading.Lock()
+    puts = 0
+
+    def _reply(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self):
+        if self.headers.get("X-N8N-API-KEY") != self.api_key:
+            self._reply(401, {"message": "unauthorized"})
+            return None
+        parsed = urllib.parse.urlparse(self.path)
+        if not parsed.path.startswith(API_PATH):
+            self._reply(404, {"message": "not found"})
+            return None
+        return parsed, urllib.parse.unquote(parsed.path[len(API_PATH):].strip("/"))
+
+    def do_GET(self):
+        route = self._route()
+        if route is None:
+            return
+        parsed, workflow_id = route
+        with self.lock:
+            if workflow_id:
+                if workflow_id not in self.workflows:
+                    self._reply(404, {"message": "Not Found"})
+                else:
+                    self._reply(200, self.workflows[workflow_id])
+                return
+            query = urllib.parse.parse_qs(parsed.query)
+            limit = int(query.get("limit", [PAGE_SIZE])[0])
+            start = int(query.get("cursor", ["0"])[0])
+            ids = sorted(self.workflows)
+            page = [{"id": i, "name": self.workflows[i].get("name")} for i in ids[start:start + limit]]
+            more = start + limit < len(ids)
+            self._reply(200, {"data": page, "nextCursor": str(start + limit) if more else None})
+
+    def do_PUT(self):
+        route = self._route()
+        if route is None:
+            return
+        _, workflow_id = route
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        extra = set(body) - set(PUT_FIELDS) or set(body.get("settings") or {}) - SETTINGS_FIELDS
+        if extra or not {"name", "nodes", "connections", "settings"} <= set(body):
+            self._reply(400, {"message": f"request/body must NOT have additional properties: {sorted(extra)}"})
+            return
+        with self.lock:
+            if workflow_id not in self.workflows:
+                self._reply(404, {"message": "Not Found"})
+                return
+            current = self.workflows[workflow_id]
+            current.update(body)
+            current["versionId"] = str(uuid.uuid4())
+            MockN8nApi.puts += 1
+            self._reply(200, current)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_mock(port, targets, api_key):
+    for path, workflow_id in targets:
+        wf = load_workflow(path)
+        workflow_id = workflow_id or wf.get("id") or uuid.uuid4().hex[:16]
+        MockN8nApi.workflows[workflow_id] = {
+            "id": workflow_id, "name": wf.get("name") or os.path.splitext(os.path.basename(path))[0],
+            "active": wf.get("active", False), "nodes": wf["nodes"], "connections": wf.get("connections", {}),
+            "settings": wf.get("settings", {}), "staticData": wf.get("staticData"), "tags": wf.get("tags", []),
+        }
+        print(f"  + {workflow_id}: {MockN8nApi.workflows[workflow_id]['name']} ({len(wf['nodes'])} nodes)")
+    MockN8nApi.api_key = api_key
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockN8nApi)
+    print(f"Mock n8n API on http://127.0.0.1:{server.server_port}{API_PATH} (X-N8N-API-KEY: {api_key})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"{MockN8nApi.puts} PUT(s) received")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="+", help="FILE or FILE=WORKFLOW_ID")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be pushed, send nothing")
+    parser.add_argument("--base-url", default=(os.environ.get("N8N_BASE_URL") or DEFAULT_BASE_URL).rstrip("/"))
+    parser.add_argument("--api-key", default=os.environ.get("N8N_API_KEY"))
+    parser.add_argument("--workers", type=int, default=4, help="Workflows fetched/pushed at once")
+    parser.add_argument("--serve-mock", type=int, metavar="PORT", help="Run a mock n8n API seeded with the targets")
+    args = parser.parse_args()
+    targets = [parse_target(t) for t in args.targets]
+
+    if args.serve_mock is not None:
+        serve_mock(args.serve_mock, targets, args.api_key or "mock")
+        return
+    if not args.api_key:
+        print("❌ Set N8N_API_KEY or pass --api-key")
+        sys.exit(1)
+
+    api = N8nApi(args.base_url, args.api_key)
+    with ThreadPoolExecutor(max_workers=max(1, min(args.workers, len(targets)))) as pool:
+        results = list(pool.map(lambda t: push_one(api, t[0], t[1], args.dry_run), targets))
+
+    counts = {}
+    for status, lines in results:
+        counts[status] = counts.get(status, 0) + 1
+        print("\n".join(lines))
+    print("\n" + ", ".join(f"{n} {status}" for status, n in counts.items())
+          + (" (dry run, nothing sent)" if args.dry_run else ""))
+    sys.exit(1 if counts.get("failed") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Score-vs-iteration analysis for the improvement loops.
+
+Each loop is a chain of scoring passes gated by "80 +?" IFs:
+
+  1st Scoring Agent2 -> 80+ ?2 -> 1st Improvement LLM2 -> 2nd Scoring Agent2
+    -> 80 +?4 -> Max Iterations2 -> Check Max Iterations2 -> Improvement LLM2
+    -> Scoring7 -> 80 +?5 -> Max Iterations2 -> ...
+
+Loops are found from the workflow graph (a Check IF behind a $runIndex
+counter Set whose feeding IFs test overallScore), so the same code covers
+Check Max Iterations2 and Check Max Iterations3. For every execution export,
+each scoring agent's overallScore (message.content, object or JSON string:
+the fields fix_nodes.py reads) is collected in start-time order into one
+trace per article: iteration 0 is the 1st Scoring Agent, 1 the 2nd, 2+ the
+in-loop scorer.
+
+The model per loop:
+  steps        per step k -> k+1: gain mean / p50 / p10 / p90, share of
+               articles that pass at k+1
+  fit          gain ~ intercept + slope * score (diminishing returns)
+  reach_gain   optimistic gain per remaining iteration (p90 of loop gains,
+               raised to p95 / max if the gap rule alone cuts off too many)
+  min_gain     largest plateau cutoff whose simulated false exits (articles
+               cut off that would still have passed) stay under
+               --max-false-exit; null when even a 0 cutoff doesn't. The
+               plateau is only judged from the 2nd in-loop check on, so a
+               first improvement pass that scores flat or lower is not cut
+
+With fewer than --min-traces traces the defaults below are kept and flagged
+("source": "default"); apply_early_exit.py refuses to apply those. The model
+is written as JSON for apply_early_exit.py.
+
+Usage:
+  python score_iterations.py execution_2764_full.json exports/*.json
+  python score_iterations.py exports/*.json -o iteration_model.json --max-false-exit 0.05
+"""
+import argparse
+import json
+import statistics
+import sys
+from datetime import datetime, timezone
+
+from n8n_utils import (IF_TYPE, SET_TYPE, iter_executions, load_workflow, node_index, percentile, predecessors,
+                       reachable, successors)
+
+DEFAULT_MIN_GAIN = 1.0
+DEFAULT_REACH_GAIN = 5.0
+MIN_TRACES = 10
+MIN_GAIN_CANDIDATES = [0.5 * i for i in range(0, 11)]
+
+
+def _is_score_gate(node):
+    return node.get("type") == IF_TYPE and "overallScore" in json.dumps(node.get("parameters", {}))
+
+
+def _gate_target(node):
+    """Pass threshold of an "80 +?" IF (v1 number condition or v2 filter)."""
+    conditions = node.get("parameters", {}).get("conditions", {})
+    for c in conditions.get("number") or []:
+        if "overallScore" in str(c.get("value1")):
+            return float(c.get("value2", 0))
+    for c in conditions.get("conditions") or []:
+        if "overallScore" in str(c.get("leftValue")):
+            return float(c.get("rightValue", 0))
+    return None
+
+
+def _max_runs(check):
+    for c in check.get("parameters", {}).get("conditions", {}).get("conditions") or []:
+        if "runs" in str(c.get("leftValue")) and str(c.get("rightValue", "")).lstrip("=").strip().isdigit():
+            return int(str(c["rightValue"]).lstrip("="))
+    return None
+
+
+def improvement_loops(wf):
+    """Improvement loops in a workflow, one dict per Check Max Iterations IF."""
+    ix = node_index(wf)
+    pred, succ = predecessors(wf), successors(wf)
+    loops = []
+    for name, node in ix.items():
+        counters = [p for p in pred.get(name, []) if ix[p].get("type") == SET_TYPE
+                    and "$runIndex" in json.dumps(ix[p].get("parameters", {}))]
+        if node.get("type") != IF_TYPE or len(counters) != 1:
+            continue
+        counter = counters[0]
+        gates = [g for g in pred.get(counter, []) if _is_score_gate(ix[g])]
+        if not gates:
+            continue
+        body = reachable(name, succ)
+        scorer_of = {g: pred[g][0] for g in gates if pred.get(g)}
+        loop_gates = [g for g in gates if scorer_of.get(g) in body]
+        entry_gates = [g for g in gates if g not in loop_gates]
+        if len(loop_gates) != 1 or len(entry_gates) != 1:
+            continue
+        second = scorer_of[entry_gates[0]]
+        # Walk back from the 2nd scorer to the gate in front of the first improvement pass
+        first, first_gate, frontier = None, None, [second]
+        for _ in range(3):
+            frontier = [p for n in frontier for p in pred.get(n, [])]
+            gate = next((p for p in frontier if _is_score_gate(ix[p])), None)
+            if gate:
+                first_gate, first = gate, (pred.get(gate) or [None])[0]
+                break
+        loops.append({
+            "check": name,
+            "counter": counter,
+            "scorers": [s for s in (first, second, scorer_of[loop_gates[0]]) if s],
+            "first_scorer": first,
+            "improvers": [n for n in succ.get(name, []) if n in body][:1] +
+                         [n for n in pred.get(second, []) if n != first_gate][:1],
+            "first_target": _gate_target(ix[first_gate]) if first_gate else None,
+            "target": _gate_target(ix[loop_gates[0]]),
+            "max_runs": _max_runs(node),
+        })
+    return sorted(loops, key=lambda loop: loop["check"])
+
+
+def overall_score(item):
+    """overallScore from a scoring agent item, content as object or JSON string."""
+    content = ((item.get("json") or {}).get("message") or {}).get("content")
+    if isinstance(content, str):
+        try:
+            content = json.loads(content)
+        except ValueError:
+            return None
+    if isinstance(content, dict) and isinstance(content.get("overallScore"), (int, float)):
+        return float(content["overallScore"])
+    return None
+
+
+def score_traces(execution, loop):
+    """One list of scores per article that entered the loop's scoring chain."""
+    run_data = execution["data"]["resultData"]["runData"]
+    runs = []
+    for name in loop["scorers"]:
+        for run in run_data.get(name) or []:
+            items = ((run.get("data") or {}).get("main") or [[]])[0] or []
+            runs.append((run.get("startTime") or 0, name, [overall_score(item) for item in items]))
+    traces = []
+    for _, name, scores in sorted(runs, key=lambda r: r[0]):
+        if name == loop["first_scorer"] or not traces:
+            traces.append([])
+        if scores:
+            traces[-1].append(scores[0])
+    return [t for t in traces if t and all(s is not None for s in t)]
+
+
+def iteration_ms(execution, loop):
+    """Mean duration of one loop iteration (improver + scorer), if any ran."""
+    run_data = execution["data"]["resultData"]["runData"]
+    total = [sum(r.get("executionTime") or 0 for r in run_data.get(n) or []) for n in
+             (loop["improvers"][0] if loop["improvers"] else None, loop["scorers"][-1])]
+    count = len(run_data.get(loop["scorers"][-1]) or [])
+    return sum(total) / count if count else None
+
+
+def _target_at(loop, step):
+    return loop["first_target"] if step == 0 and loop["first_target"] is not None else loop["target"]
+
+
+def simulate(traces, loop, min_gain, reach_gain):
+    """Replay traces under the early-exit rule -> (iterations run, iterations saved, false exits).
+
+    The rule is checked where Check Max Iterations runs: after each score from
+    iteration 1 on that misses the target. The plateau part only from
+    iteration 2 on, once there is an in-loop pass to compare with.
+    """
+    ran = saved = false_exits = 0
+    max_runs = loop["max_runs"] or 4
+    min_gain = float("-inf") if min_gain is None else min_gain
+    for trace in traces:
+        stop = len(trace) - 1
+        for k in range(1, len(trace) - 1):
+            if trace[k] >= _target_at(loop, k):
+                break
+            remaining = max_runs - (k - 1)
+            plateau = k >= 2 and trace[k] - trace[k - 1] < min_gain
+            if plateau or _target_at(loop, k) - trace[k] > reach_gain * remaining:
+                stop = k
+                break
+        ran += stop
+        saved += len(trace) - 1 - stop
+        if stop < len(trace) - 1 and any(s >= loop["target"] for s in trace[stop + 1:]):
+            false_exits += 1
+    return ran, saved, false_exits
+
+
+def model_loop(loop, traces, durations, max_false_exit, min_traces):
+    steps, loop_gains, pairs = [], [], []
+    for k in range(1, max(map(len, traces), default=0)):
+        at = [t for t in traces if len(t) > k]
+        gains = [t[k] - t[k - 1] for t in at]
+        pairs.extend((t[k - 1], t[k] - t[k - 1]) for t in at)
+        if k >= 2:
+            loop_gains.extend(gains)
+        steps.append({
+            "step": k, "n": len(at), "mean_gain": round(statistics.mean(gains), 2),
+            "p50_gain": round(statistics.median(gains), 2), "p10_gain": round(percentile(gains, 10), 2),
+            "p90_gain": round(percentile(gains, 90), 2),
+            "pass_rate": round(sum(t[k] >= _target_at(loop, k) for t in at) / len(at), 3),
+        })
+    fit = None
+    if len(pairs) >= 3 and len({s for s, _ in pairs}) > 1:
+        slope, intercept = statistics.linear_regression([s for s, _ in pairs], [g for _, g in pairs])
+        fit = {"intercept": round(intercept, 3), "slope": round(slope, 4)}
+
+    looped = [t for t in traces if len(t) > 2]
+    source = "data" if len(looped) >= min_traces else "default"
+    reach_gain, min_gain = DEFAULT_REACH_GAIN, DEFAULT_MIN_GAIN
+    if source == "data":
+        # Strictest gap rule first (p90 exits most), relaxed to p95 and then the best observed gain until
+        # false exits fit the budget; then the largest plateau cutoff that still fits on top of it
+        for pct in (90, 95, 100):
+            reach_gain = max(percentile(loop_gains, pct), 0.5)
+            if simulate(traces, loop, float("-inf"), reach_gain)[2] / len(traces) <= max_false_exit:
+                break
+        min_gain = None
+        for candidate in MIN_GAIN_CANDIDATES:
+            if simulate(traces, loop, candidate, reach_gain)[2] / len(traces) <= max_false_exit:
+                min_gain = candidate
+    ran, saved, false_exits = simulate(traces, loop, min_gain, reach_gain)
+    return {
+        **loop,
+        "traces": len(traces),
+        "looped": len(looped),
+        "steps": steps,
+        "fit": fit,
+        "min_gain": min_gain,
+        "reach_gain": round(reach_gain, 2),
+        "source": source,
+        "iteration_ms": round(statistics.mean(durations)) if durations else None,
+        "simulated": {"iterations": ran + saved, "saved": saved, "false_exits": false_exits},
+    }
+
+
+def analyze(executions, workflow=None, max_false_exit=0.05, min_traces=MIN_TRACES):
+    loops, traces, durations = {}, {}, {}
+    for execution in executions:
+        for loop in improvement_loops(workflow or execution.get("workflowData") or {}):
+            loops.setdefault(loop["check"], loop)
+            traces.setdefault(loop["check"], []).extend(score_traces(execution, loop))
+            ms = iteration_ms(execution, loop)
+            if ms:
+                durations.setdefault(loop["check"], []).append(ms)
+    return {check: model_loop(loop, traces[check], durations.get(check, []), max_false_exit, min_traces)
+            for check, loop in sorted(loops.items())}
+
+
+def _print_model(model):
+    print(f"{model['check']}: target {model['target']:g} (entry {model['first_target']:g}), "
+          f"max {model['max_runs']} run(s), scorers {' -> '.join(model['scorers'])}")
+    print(f"  {model['traces']} article trace(s), {model['looped']} reached the loop")
+    if model["steps"]:
+        print(f"  {'step':>6} {'n':>5} {'mean':>7} {'p50':>7} {'p10':>7} {'p90':>7} {'pass':>6}")
+        for s in model["steps"]:
+            print(f"  {s['step'] - 1:>2} -> {s['step']:<2}{s['n']:>5} {s['mean_gain']:>+7.1f} {s['p50_gain']:>+7.1f} "
+                  f"{s['p10_gain']:>+7.1f} {s['p90_gain']:>+7.1f} {s['pass_rate']:>6.0%}")
+    if model["fit"]:
+        print(f"  gain ~ {model['fit']['intercept']:+.2f} {model['fit']['slope']:+.3f} x score")
+    label = "from data" if model["source"] == "data" else "DEFAULTS"
+    plateau = f"gain < {model['min_gain']:g}, or " if model["min_gain"] is not None else "no plateau cutoff, "
+    print(f"  early exit ({label}): {plateau}gap > {model['reach_gain']:g} x remaining runs")
+    sim = model["simulated"]
+    if sim["iterations"]:
+        cost = f", ~{sim['saved'] * model['iteration_ms'] / 1000:.0f}s" if model["iteration_ms"] else ""
+        print(f"  replayed: {sim['saved']} of {sim['iterations']} iteration(s) saved{cost}, "
+              f"{sim['false_exits']} false exit(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="Execution exports (single, list or API page)")
+    parser.add_argument("--workflow", help="Find loops in this workflow instead of each export's workflowData")
+    parser.add_argument("-o", "--output", help="Write the model JSON here (for apply_early_exit.py)")
+    parser.add_argument("--max-false-exit", type=float, default=0.05,
+                        help="Share of articles an exit may cut off that would still have passed")
+    parser.add_argument("--min-traces", type=int, default=MIN_TRACES,
+                        help="Looped articles needed before thresholds come from data")
+    args = parser.parse_args()
+
+    executions = []
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            found = list(iter_executions(json.load(f)))
+        if not found:
+            print(f"- {path}: no execution data, skipped")
+        executions.extend(found)
+    models = analyze(executions, load_workflow(args.workflow) if args.workflow else None,
+                     args.max_false_exit, args.min_traces)
+    if not models:
+        print("❌ No improvement loops found")
+        sys.exit(1)
+
+    print(f"{len(executions)} execution(s)\n")
+    for model in models.values():
+        _print_model(model)
+        if model["source"] == "default":
+            print(f"  WARNING: only {model['looped']} looped article(s) (< {args.min_traces}); keeping defaults")
+        print()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"generated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                       "executions": len(executions), "loops": models}, f, indent=2)
+        print(f"✅ Model written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
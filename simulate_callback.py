@@ -1,6 +1,11 @@
 import urllib.request
 import urllib.error
 import json
+import gzip
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
 # Local test URL
 url = "http://localhost:3000/api/test-callback"
@@ -24,23 +29,113 @@ payload = {
     "content_markdown": "# Test Content\nThis is a simulation."
 }
 
-def simulate_callback():
-    print(f"Simulating callback to {url}...")
-    
-    data = json.dumps(payload).encode('utf-8')
-    req = urllib.request.Request(url, data=data, method='POST')
-    req.add_header('Content-Type', 'application/json')
-    
+# Transport modes matching apply_callback_transport.py
+# plain:        the payload above as one uncompressed POST (what production sends today)
+# gzip:         the payload above, gzipped
+# batched:      one "final status" POST carrying audit, content and scoring
+# batched-gzip: batched, gzipped
+MODES = ("plain", "gzip", "batched", "batched-gzip")
+
+
+def build_requests(mode, base=payload):
+    """Return the list of (body_bytes, headers) a callback in this mode sends."""
+    audit = base["audit_data"]
+    scoring = {k: v for k, v in audit.items() if k not in ("issues", "fixes", "impact")}
+    if mode.startswith("batched"):
+        events = [dict(base, scoring=scoring)]
+    else:
+        events = [base]
+
+    requests = []
+    for event in events:
+        data = json.dumps(event).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if mode.endswith("gzip"):
+            data = gzip.compress(data)
+            headers['Content-Encoding'] = 'gzip'
+        requests.append((data, headers))
+    return requests
+
+
+def simulate_callback(mode="plain"):
+    print(f"Simulating callback to {url} ({mode})...")
+
+    for data, headers in build_requests(mode):
+        req = urllib.request.Request(url, data=data, method='POST')
+        for name, value in headers.items():
+            req.add_header(name, value)
+
+        try:
+            with urllib.request.urlopen(req) as response:
+                res_body = response.read().decode()
+                print(f"✅ SUCCESS ({response.status}): {res_body}")
+        except urllib.error.HTTPError as e:
+            res_body = e.read().decode()
+            print(f"❌ FAILED ({e.code}): {res_body}")
+        except Exception as e:
+            print(f"❌ Connection Error: {str(e)}")
+            print("Maybe the server is not running on localhost:3000?")
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    """Local stand-in for /api/test-callback: decodes the body like the route does."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if 'gzip' in (self.headers.get('Content-Encoding') or ''):
+            body = gzip.decompress(body)
+        json.loads(body)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{"success": true}')
+
+    def log_message(self, *args):
+        pass
+
+
+def benchmark(article_path="final_article.txt", runs=50):
+    """Payload bytes and request time per mode against a local receiver."""
     try:
-        with urllib.request.urlopen(req) as response:
-            res_body = response.read().decode()
-            print(f"✅ SUCCESS ({response.status}): {res_body}")
-    except urllib.error.HTTPError as e:
-        res_body = e.read().decode()
-        print(f"❌ FAILED ({e.code}): {res_body}")
-    except Exception as e:
-        print(f"❌ Connection Error: {str(e)}")
-        print("Maybe the server is not running on localhost:3000?")
+        with open(article_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except OSError:
+        content = payload["content_markdown"] * 500
+    base = dict(payload, content_markdown=content)
+
+    server = HTTPServer(('127.0.0.1', 0), _Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    local_url = f"http://127.0.0.1:{server.server_port}/api/test-callback"
+
+    print(f"Benchmark: {runs} callbacks per mode, article {len(content)} chars\n")
+    print(f"{'mode':<14}{'requests':>9}{'bytes/cb':>11}{'ms/cb':>9}")
+    results = {}
+    for mode in MODES:
+        reqs = build_requests(mode, base)
+        start = time.perf_counter()
+        for _ in range(runs):
+            # Encoding is part of the cost, so rebuild each time
+            for data, headers in build_requests(mode, base):
+                req = urllib.request.Request(local_url, data=data, method='POST', headers=headers)
+                with urllib.request.urlopen(req) as response:
+                    response.read()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / runs
+        size = sum(len(d) for d, _ in reqs)
+        results[mode] = (len(reqs), size, elapsed_ms)
+        print(f"{mode:<14}{len(reqs):>9}{size:>11}{elapsed_ms:>9.2f}")
+    server.shutdown()
+
+    before = results["plain"]
+    print()
+    for mode in ("gzip", "batched-gzip"):
+        after = results[mode]
+        print(f"{mode} vs plain: {before[1]} B -> {after[1]} B ({after[1] / before[1]:.0%}), "
+              f"{after[2] / before[2]:.0%} of the request time")
+    return results
+
 
 if __name__ == "__main__":
-    simulate_callback()
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(*sys.argv[2:3])
+    else:
+        simulate_callback(sys.argv[1] if len(sys.argv) > 1 else "plain")
@@ -0,0 +1,84 @@
+/**
+ * @jest-environment node
+ */
+import { gzipSync } from 'zlib';
+import { POST } from './route';
+import { supabaseAdmin } from '@/lib/supabase-admin';
+
+jest.mock('@/lib/supabase', () => ({ supabase: { from: jest.fn() } }));
+jest.mock('@/lib/supabase-admin', () => ({ supabaseAdmin: { from: jest.fn() } }));
+
+describe('POST /api/test-callback', () => {
+    const update = jest.fn();
+    const eq = jest.fn();
+    const select = jest.fn();
+
+    beforeEach(() => {
+        jest.clearAllMocks();
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        (supabaseAdmin.from as jest.Mock).mockReturnValue({ update });
+        update.mockReturnValue({ eq });
+        eq.mockReturnValue({ select });
+        select.mockResolvedValue({ data: [{ request_id: 'req-1' }], error: null });
+    });
+
+    afterEach(() => {
+        jest.restoreAllMocks();
+    });
+
+    test('accepts a gzipped final status and merges scoring into the audit', async () => {
+        const payload = {
+            request_id: 'req-1',
+            status: 'completed',
+            audit_data: JSON.stringify({ alignment_score: 86.6, issues: 'None' }),
+            content_markdown: '# Article',
+            scoring: { overallScore: 84, alignment_score: 10, seoOptimization: 80 },
+        };
+        const request = new Request('http://localhost/api/test-callback', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' },
+            body: gzipSync(Buffer.from(JSON.stringify(payload), 'utf-8')),
+        });
+
+        const response = await POST(request);
+
+        expect(response.status).toBe(200);
+        expect(await response.json()).toEqual({ success: true, updated: 1 });
+        expect(supabaseAdmin.from).toHaveBeenCalledWith('test_results');
+        expect(update).toHaveBeenCalledWith({
+            // The audit wins over scoring on shared keys
+            audit_data: { overallScore: 84, alignment_score: 86.6, seoOptimization: 80, issues: 'None' },
+            score: 87,
+            status: 'completed',
+            content_markdown: '# Article',
+        });
+        expect(eq).toHaveBeenCalledWith('request_id', 'req-1');
+    });
+
+    test('still accepts a plain JSON callback', async () => {
+        const request = new Request('http://localhost/api/test-callback', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ request_id: 'req-1', audit_data: { score: 71.2 } }),
+        });
+
+        const response = await POST(request);
+
+        expect(response.status).toBe(200);
+        expect(update).toHaveBeenCalledWith({ audit_data: { score: 71.2 }, score: 71, status: 'completed' });
+    });
+
+    test('rejects a gzipped body without request_id', async () => {
+        jest.spyOn(console, 'error').mockImplementation(() => { });
+        const request = new Request('http://localhost/api/test-callback', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' },
+            body: gzipSync(Buffer.from(JSON.stringify({ status: 'completed' }), 'utf-8')),
+        });
+
+        const response = await POST(request);
+
+        expect(response.status).toBe(400);
+        expect(update).not.toHaveBeenCalled();
+    });
+});
@@ -1,15 +1,26 @@
 import { NextResponse } from 'next/server';
+import { gunzipSync } from 'zlib';
 import { supabase } from '@/lib/supabase';
 import { supabaseAdmin } from '@/lib/supabase-admin';
 
+// n8n can send the final status gzipped (Content-Encoding: gzip) to cut payload size
+async function readBody(request: Request) {
+    const encoding = request.headers.get('content-encoding') || '';
+    if (encoding.includes('gzip')) {
+        const compressed = Buffer.from(await request.arrayBuffer());
+        return JSON.parse(gunzipSync(compressed).toString('utf-8'));
+    }
+    return request.json();
+}
+
 // Helper to update the database
 export async function POST(request: Request) {
     try {
-        const body = await request.json();
+        const body = await readBody(request);
         console.log('--- TEST CALLBACK RECEIVED ---');
         console.log('Body:', JSON.stringify(body, null, 2));
 
-        const { request_id, audit_data, status: explicitStatus, content_markdown } = body;
+        const { request_id, audit_data, status: explicitStatus, content_markdown, scoring } = body;
 
         if (!request_id) {
             console.error('Callback error: Missing request_id');
@@ -28,6 +39,11 @@ export async function POST(request: Request) {
             }
         }
 
+        // Batched "final status" callbacks carry scoring alongside the audit
+        if (scoring && typeof scoring === 'object' && (!processedAudit || typeof processedAudit === 'object')) {
+            processedAudit = { ...scoring, ...(processedAudit || {}) };
+        }
+
         // Extract score if possible and ensure it's an integer for the DB
         const rawScore = processedAudit?.alignment_score || processedAudit?.score || 0;
         const score = Math.round(Number(rawScore));
@@ -0,0 +1,17 @@
+"""Make the root-level scripts importable from tests/ and share the recorded execution."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from n8n_utils import load_execution  # noqa: E402
+
+EXECUTION_2764 = os.path.join(ROOT, "execution_2764_full.json")
+
+
+@pytest.fixture(scope="session")
+def execution_2764():
+    return load_execution(EXECUTION_2764)
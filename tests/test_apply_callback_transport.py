@@ -0,0 +1,63 @@
+import copy
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from apply_callback_transport import field_to_js, gzip_send_test_callback, gzip_send_test_result
+from conftest import ROOT
+from n8n_utils import load_workflow, node_index
+
+
+def _node(filename, name):
+    return copy.deepcopy(node_index(load_workflow(os.path.join(ROOT, filename)))[name])
+
+
+def _assert_valid_js(code, tmp_path):
+    if not shutil.which("node"):
+        pytest.skip("node not installed")
+    path = tmp_path / "code.js"
+    # Code node bodies run inside an async function
+    path.write_text("async function codeNode() {\n" + code + "\n}\n", encoding="utf-8")
+    subprocess.run(["node", "--check", str(path)], check=True)
+
+
+def test_send_test_result_keeps_error_logging_and_return_fields(tmp_path):
+    node = _node("TEST Skywide Content (Prompt Review).json", "Send Test Result")
+    assert gzip_send_test_result(node, "gzip")
+    code = node["parameters"]["jsCode"]
+    for field in ("content_length:", "word_count:", "overall_score:", "scoring_source:", "sent_bytes:"):
+        assert field in code
+    assert "console.error('Callback failed:', error.message);" in code
+    assert "Buffer.byteLength(json, 'utf-8')" in code
+    assert "json.length" not in code
+    _assert_valid_js(code, tmp_path)
+
+    # Re-running swaps the transport instead of stacking a second send block
+    assert gzip_send_test_result(node, "batched")
+    assert node["parameters"]["jsCode"].count("// === Send (transport:") == 1
+    assert "const COMPRESS = false;" in node["parameters"]["jsCode"]
+
+
+def test_send_test_callback_runs_per_item(tmp_path):
+    node = _node("Dev Testing Workflow (4).json", "Send Test Callback")
+    assert gzip_send_test_callback(node, "gzip")
+    assert node["parameters"]["mode"] == "runOnceForEachItem"
+    code = node["parameters"]["jsCode"]
+    assert "\"request_id\": $('Webhook1').item.json.body.request_id" in code
+    assert "return { json: result };" in code
+    _assert_valid_js(code, tmp_path)
+
+
+def test_field_to_js():
+    assert field_to_js("completed") == '"completed"'
+    assert field_to_js("={{ $json.score }}") == "$json.score"
+    assert field_to_js("=Score: {{ $json.score }}") is None
+    assert field_to_js("={{ $json.a }} / {{ $json.b }}") is None
+
+    node = _node("Dev Testing Workflow (4).json", "Send Test Callback")
+    node["parameters"]["bodyParameters"]["parameters"][0]["value"] = "=id {{ $json.id }}"
+    before = copy.deepcopy(node)
+    assert not gzip_send_test_callback(node, "gzip")
+    assert node == before
@@ -0,0 +1,50 @@
+import copy
+import json
+import os
+
+import pytest
+
+from apply_claim_cache import POST_CACHE_NAME, PRE_CACHE_NAME, apply
+from conftest import ROOT
+from inject_fact_checkers import POST_DRAFT_NAME, PRE_DRAFT_NAME, inject
+from n8n_utils import load_workflow, node_index, predecessors
+from workflow_validator import check_workflow
+
+TEST = os.path.join(ROOT, "TEST Skywide Content (Prompt Review).json")
+
+
+@pytest.fixture(scope="module")
+def test_wf():
+    return load_workflow(TEST)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_checkers_go_through_the_cache(test_wf, parallel):
+    wf = copy.deepcopy(test_wf)
+    if parallel:
+        inject(wf, parallel=True)
+    assert len(apply(wf, "http://n8n-host:8788/")) == 2
+    check_workflow(wf, "claim cache")
+    by_name, pred = node_index(wf), predecessors(wf)
+
+    # The Pre-Draft checker is gone and nothing reads it any more
+    assert PRE_DRAFT_NAME not in by_name
+    assert f"$('{PRE_DRAFT_NAME}')" not in json.dumps(wf["nodes"])
+    assert pred[PRE_CACHE_NAME] == ["Parse Creative Brief (LLM)"]
+    assert by_name[PRE_CACHE_NAME]["parameters"]["url"] == "http://n8n-host:8788/fact-check"
+    strategist = by_name["Keyword Strategist"]["parameters"]["jsCode"]
+    assert f"raw = $('{PRE_CACHE_NAME}').first().json;\n  factCheckReport = raw.report ||" in strategist
+    if parallel:
+        draft = by_name["OpenAI Draft (GPT-4O)1"]["parameters"]["messages"]["values"][0]["content"]
+        assert f"$('{PRE_CACHE_NAME}').first().json.report" in draft
+
+    # The Post-Draft checker still rewrites the draft, behind the cache, with the cache's report
+    assert pred[POST_DRAFT_NAME] == [POST_CACHE_NAME]
+    assert pred[POST_CACHE_NAME] == ["Data Check & Research Gaps1"]
+    prompt = by_name[POST_DRAFT_NAME]["parameters"]["messages"]["message"][-1]["content"]
+    assert f"{{{{ $('{POST_CACHE_NAME}').first().json.report }}}}" in prompt
+    assert "fact_check_report" not in prompt
+
+    again = copy.deepcopy(wf)
+    assert apply(again) == []
+    assert again == wf
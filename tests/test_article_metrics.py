@@ -0,0 +1,38 @@
+from article_metrics import Corpus
+
+ARTICLE = """Meta Title: Cement removal guide
+# Cement Removal for Pipes
+
+Cement removal starts with a camera inspection. Moreover, it is quick.
+
+## Choosing a Cement Removal Method
+
+Hydro jetting clears most lines in one visit.
+
+### Costs
+
+Expect a fair quote.
+
+Call us for cement removal today.
+"""
+
+
+def test_metrics():
+    corpus = Corpus()
+    corpus.add(ARTICLE, "Cement", "a.md", 40, "cement removal, hydro jetting, trenchless")
+    corpus.add("# Only\n\n#### Deep heading\n\nShort text here.", "Short", "b.md")
+    article, short = corpus.metrics()
+
+    # Meta lines don't count; headings do
+    assert article["words"] == 39 and article["ratio"] == 0.97
+    assert (article["h1"], article["h2"], article["h3"]) == (1, 1, 1)
+    assert article["sentences"] == 5
+    # H1, first 50 words, an H2 and the final paragraph all carry the primary keyword
+    assert article["primary_count"] == 4 and article["density"] == 10.26
+    assert not any(flag.startswith("primary not in") for flag in article["flags"])
+    assert article["secondary_used"] == 1 and article["secondary"] == 2
+    assert article["banned"] == 1
+    assert (article["flesch"], article["fk_grade"]) == (63.8, 5.8)
+
+    assert short["target"] is None and "ratio" not in short
+    assert short["flags"] == ["H4 under H1"]
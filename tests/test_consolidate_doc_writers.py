@@ -0,0 +1,52 @@
+import json
+import os
+import re
+
+import pytest
+
+from conftest import ROOT
+from consolidate_doc_writers import BUILD_NAME, ROUTER_NAME, TEST_EXIT_NAME, WRITER_NAME, consolidate
+from n8n_utils import load_workflow, node_index, predecessors
+from workflow_validator import check_workflow
+
+PROD = "PROD Skywide Content v23.json"
+TEST = "TEST Skywide Content (Prompt Review).json"
+OLD_DOC_REF = re.compile(r"""\$\(['"](?:Create|Update) a document""")
+
+
+def _consolidated(filename):
+    wf = load_workflow(os.path.join(ROOT, filename))
+    pairs = consolidate(wf)
+    assert len(pairs) == 6
+    check_workflow(wf, filename)
+    return wf
+
+
+def _route(wf, tag):
+    """Nodes the Route Doc Completion output for one path tag goes to."""
+    router = node_index(wf)[ROUTER_NAME]
+    rules = router["parameters"]["rules"]["values"]
+    index = next(i for i, rule in enumerate(rules) if rule["conditions"]["conditions"][0]["rightValue"] == tag)
+    return [t["node"] for t in wf["connections"][ROUTER_NAME]["main"][index]]
+
+
+@pytest.mark.parametrize("filename", [PROD, TEST])
+def test_consolidate(filename):
+    wf = _consolidated(filename)
+    assert not OLD_DOC_REF.search(json.dumps([n.get("parameters") for n in wf["nodes"]], ensure_ascii=False))
+    assert not any(n["name"].startswith(("Create a document", "Update a document")) for n in wf["nodes"])
+    assert _route(wf, "17") == ["Signal Completion (Update a document17)"]
+    assert wf["connections"][BUILD_NAME]["main"][0][0]["node"] == WRITER_NAME
+
+    with pytest.raises(ValueError, match="already consolidated"):
+        consolidate(wf)
+
+
+def test_test_exits_collapse_into_one():
+    before = load_workflow(os.path.join(ROOT, TEST))
+    assert sum(n["name"].startswith("Is Test Exit ") for n in before["nodes"]) == 6
+    wf = _consolidated(TEST)
+    exits = [n["name"] for n in wf["nodes"] if n["name"].startswith("Is Test Exit")]
+    assert exits == [TEST_EXIT_NAME]
+    assert sorted(predecessors(wf)[TEST_EXIT_NAME]) == sorted(f"Doc Content {t}" for t in ("15", "6", "16", "7", "0", "17"))
+    assert [t["node"] for t in wf["connections"][TEST_EXIT_NAME]["main"][1]] == [BUILD_NAME]
@@ -0,0 +1,28 @@
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+from e2e_latency_harness import Results, _CallbackReceiver, node_timeline
+from simulate_callback import build_requests, payload
+
+
+def test_receiver_marks_done_on_the_callback_post():
+    results = Results()
+    _CallbackReceiver.results = results
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CallbackReceiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for data, headers in build_requests("gzip", dict(payload, request_id="r1")):
+            request = urllib.request.Request(f"http://127.0.0.1:{server.server_port}/api/test-callback",
+                                             data=data, headers=headers, method="POST")
+            urllib.request.urlopen(request, timeout=5).read()
+    finally:
+        server.shutdown()
+    assert set(results.callback_done) == {"r1"}
+
+
+def test_node_timeline(execution_2764):
+    timeline, end_ms = node_timeline(execution_2764)
+    assert len(timeline) == 161
+    assert end_ms == 1822440
+    assert [t[0] for t in timeline] == sorted(t[0] for t in timeline)
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+
+from fact_claim_cache import ClaimCache, extract_claims, fact_check, fact_check_inputs, normalise_claim
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+TEXT = ("Per 38 C.F.R. § 3.321, extraschedular ratings need an exceptional disability picture. "
+        "Around 70 percent of claims are decided within 125 days.")
+
+
+def test_normalisation_equivalences():
+    assert normalise_claim("Per 38 C.F.R. § 3.321, ratings apply.") == normalise_claim("per 38 CFR §3.321 ratings apply")
+    assert normalise_claim("About 70 percent of claims.") == normalise_claim("About 70% of claims")
+    assert normalise_claim("It costs $1,500 a year [2].") == normalise_claim("it costs $1500 a year")
+    assert normalise_claim("However, the **VA** rates it at 30%.") == normalise_claim("The VA rates it at 30 %")
+    assert normalise_claim("The rate is 30%.") != normalise_claim("The rate is 40%.")
+
+
+class StubVerifier:
+    def __init__(self, status="supported"):
+        self.status = status
+        self.sent = []
+
+    def __call__(self, claims):
+        self.sent.extend(c["claim"] for c in claims)
+        return {c["key"]: {"status": self.status, "verdict": "Stub.", "sources": []} for c in claims}, 1
+
+
+def test_hit_miss_and_expiry(tmp_path):
+    cache = ClaimCache(str(tmp_path / "claims.sqlite"))
+    verify = StubVerifier()
+    first = fact_check(TEXT, "Injured Veterans", cache, verify, NOW)
+    assert first["stats"]["claims"] == 2 and first["stats"]["sent"] == 2
+    assert first["report"].count("verified now") == 2
+
+    # Reworded trivia still hits; another client does not
+    reworded = "Per 38 CFR §3.321 extraschedular ratings need an exceptional disability picture."
+    again = fact_check(reworded, " injured  veterans", cache, verify, NOW + timedelta(days=1))
+    assert again["stats"]["cached"] == 1 and again["stats"]["sent"] == 0
+    assert fact_check(reworded, "Other Client", cache, verify, NOW)["stats"]["sent"] == 1
+
+    # Supported verdicts live 90 days
+    stale = fact_check(TEXT, "Injured Veterans", cache, verify, NOW + timedelta(days=91))
+    assert stale["stats"]["expired"] == 2 and stale["stats"]["sent"] == 2
+
+
+def test_unverified_expires_first(tmp_path):
+    cache = ClaimCache(str(tmp_path / "claims.sqlite"))
+    fact_check(TEXT, "Injured Veterans", cache, StubVerifier("unverified"), NOW)
+    later = fact_check(TEXT, "Injured Veterans", cache, StubVerifier(), NOW + timedelta(days=8))
+    assert later["stats"]["expired"] == 2
+
+
+def test_claims_without_a_verdict_are_not_cached(tmp_path):
+    cache = ClaimCache(str(tmp_path / "claims.sqlite"))
+    result = fact_check(TEXT, "Injured Veterans", cache, lambda claims: ({}, 1), NOW)
+    assert result["report"].count("NOT CHECKED") == 2
+    assert cache.lookup("Injured Veterans", extract_claims(TEXT), NOW)[0] == {}
+
+
+def test_fact_check_inputs(execution_2764):
+    client, texts = fact_check_inputs(execution_2764)
+    brief = execution_2764["data"]["resultData"]["runData"]["Webhook1"][0]["data"]["main"][0][0]["json"]["body"]
+    assert client == "Helping Hands Family"
+    assert len(texts) == 4
+    assert all(t.startswith(brief["creative_brief"]) for t in texts)
+    assert len(texts[2]) > len(brief["creative_brief"])
@@ -0,0 +1,46 @@
+from inject_adaptive_backoff import inject, observed_waits, wait_llm_pairs
+from n8n_utils import WAIT_TYPE, node_index
+
+
+def _edge(node):
+    return {"node": node, "type": "main", "index": 0}
+
+
+def _wf():
+    """Webhook -> Wait A -> LLM; Webhook -> Wait B -> Set (not an LLM, so skipped)."""
+    return {
+        "nodes": [
+            {"name": "Webhook", "type": "n8n-nodes-base.webhook", "position": [0, 0], "parameters": {}},
+            {"name": "Wait A", "type": WAIT_TYPE, "position": [200, 0], "parameters": {}},
+            {"name": "LLM", "type": "@n8n/n8n-nodes-langchain.openAi", "position": [400, 0], "parameters": {},
+             "retryOnFail": True, "maxTries": 5, "waitBetweenTries": 5000},
+            {"name": "Wait B", "type": WAIT_TYPE, "position": [200, 200], "parameters": {}},
+            {"name": "Set", "type": "n8n-nodes-base.set", "position": [400, 200], "parameters": {}},
+        ],
+        "connections": {
+            "Webhook": {"main": [[_edge("Wait A"), _edge("Wait B")]]},
+            "Wait A": {"main": [[_edge("LLM")]]},
+            "Wait B": {"main": [[_edge("Set")]]},
+        },
+    }
+
+
+def test_only_replaced_waits_are_counted():
+    wf = _wf()
+    pairs = wait_llm_pairs(wf)
+    assert pairs == [("Wait A", "LLM", "Webhook")]
+    execution = {"id": "1", "data": {"resultData": {"runData": {
+        "Wait A": [{"executionTime": 5000}], "Wait B": [{"executionTime": 30000}]}}}}
+    waits, per_execution = observed_waits([execution], {wait for wait, _, _ in pairs})
+    assert waits == [5000]
+    assert per_execution == [("1", 5000)]
+
+
+def test_inject_drops_node_level_retries():
+    wf = _wf()
+    inject(wf, wait_llm_pairs(wf), 5000, 4)
+    llm = node_index(wf)["LLM"]
+    assert llm["onError"] == "continueErrorOutput"
+    assert not {"retryOnFail", "maxTries", "waitBetweenTries"} & set(llm)
+    assert "Wait A" not in node_index(wf) and "Wait B" in node_index(wf)
+    assert wf["connections"]["LLM"]["main"][1] == [_edge("Backoff LLM")]
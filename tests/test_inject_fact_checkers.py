@@ -0,0 +1,28 @@
+import copy
+import os
+
+from conftest import ROOT
+from inject_fact_checkers import MERGE_NAME, PRE_DRAFT_NAME, REPORT_MARKER, WORKFLOW, inject
+from n8n_utils import load_workflow, node_index, predecessors
+from workflow_validator import check_workflow
+
+
+def test_parallel_rewire_on_the_test_workflow():
+    wf = load_workflow(os.path.join(ROOT, WORKFLOW))
+    inject(wf, parallel=True)
+    check_workflow(wf)
+    names = [n["name"] for n in wf["nodes"]]
+    assert len(names) == len(set(names))
+
+    pred = predecessors(wf)
+    assert pred[PRE_DRAFT_NAME] == ["Parse Creative Brief (LLM)"]
+    # The serial layout's Keyword Strategist keeps an input
+    assert pred["Keyword Strategist"] == ["Parse Creative Brief (LLM)"]
+    assert sorted(pred[MERGE_NAME]) == sorted(["Clean1", PRE_DRAFT_NAME])
+    system = next(v["content"] for v in node_index(wf)["OpenAI Draft (GPT-4O)1"]["parameters"]["messages"]["values"]
+                  if v.get("role") == "system")
+    assert system.count(REPORT_MARKER) == 1
+    assert "$('Pre-Draft Fact Checker')" in system.split(REPORT_MARKER)[1]
+
+    again = inject(copy.deepcopy(wf), parallel=True)
+    assert again == wf
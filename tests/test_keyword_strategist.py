@@ -0,0 +1,20 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+from keyword_strategist import check_parity, evaluate, load_rows, webhook_body
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="node not installed")
+def test_parity_with_the_js_node_on_recorded_requests(execution_2764):
+    rows = load_rows(os.path.join(ROOT, "latest_full_row.json"))
+    rows += load_rows(os.path.join(ROOT, "all_content_requests.json"))[:5]
+    bodies = [webhook_body(r) for r in rows]
+    bodies.append(execution_2764["data"]["resultData"]["runData"]["Webhook1"][0]["data"]["main"][0][0]["json"])
+    bodies.append({"primary_keywords": " , what is aba therapy,, aba therapy meaning , "})
+
+    results = evaluate(bodies, workers=1)
+    assert results[0]["result"]["json"]["keyword_strategy"]["primary"] == "implantation symptoms"
+    assert check_parity(bodies, results) == []
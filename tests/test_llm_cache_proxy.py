@@ -0,0 +1,36 @@
+from llm_cache_proxy import cache_key, recorded_params, request_key, seed_from_execution
+
+BODY = {
+    "model": "claude-sonnet-4-20250514",
+    "max_tokens": 4096,
+    "thinking": {"type": "enabled", "budget_tokens": 1024},
+    "system": "You are a writer.",
+    "messages": [{"role": "user", "content": "Draft the article."}],
+    "stream": False,
+}
+
+
+def test_every_generation_parameter_is_in_the_key():
+    key = request_key("anthropic", BODY)
+    assert request_key("anthropic", dict(BODY, max_tokens=8192)) != key
+    assert request_key("anthropic", dict(BODY, thinking={"type": "enabled", "budget_tokens": 2048})) != key
+    assert request_key("anthropic", dict(BODY, top_k=5)) != key
+    # Transport-only fields don't split the cache
+    assert request_key("anthropic", dict(BODY, stream=None, metadata={"user_id": "x"})) == key
+
+
+def test_recorded_options_key_like_the_request():
+    options = {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 8192,
+        "invocation_kwargs": {"max_tokens": 4096, "thinking": {"budget_tokens": 1024, "type": "enabled"}},
+        "anthropic_api_url": "https://api.anthropic.com",
+        "client_options": {"fetchOptions": {}},
+    }
+    prompt = "System: You are a writer.\nHuman: Draft the article."
+    assert cache_key("anthropic", options["model"], recorded_params(options), prompt) == request_key("anthropic", BODY)
+
+
+def test_seed(execution_2764, tmp_path):
+    added, _ = seed_from_execution(execution_2764, str(tmp_path))
+    assert added > 0
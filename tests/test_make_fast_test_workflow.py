@@ -0,0 +1,22 @@
+import copy
+
+from make_fast_test_workflow import FAST_MODELS, transform
+from n8n_utils import GOOGLE_DOCS_TYPE, SET_TYPE, WAIT_TYPE, model_of, node_index
+from workflow_validator import validate_workflow
+
+
+def test_transform_prod_workflow(execution_2764):
+    wf = copy.deepcopy(execution_2764["workflowData"])
+    changes = transform(wf, FAST_MODELS, 1)
+    ix = node_index(wf)
+
+    assert changes["waits"] and not any(n["type"] == WAIT_TYPE for n in wf["nodes"])
+    assert {"Check Max Iterations2", "Check Max Iterations3"} <= set(changes["loops"])
+    runs = [c for c in ix["Check Max Iterations2"]["parameters"]["conditions"]["conditions"]
+            if c["leftValue"].strip() == "={{ $json.runs }}"]
+    assert runs[0]["rightValue"] == 1
+    assert not any(n["type"] == GOOGLE_DOCS_TYPE for n in wf["nodes"])
+    assert all(ix[name]["type"] == SET_TYPE for name in changes["stubs"])
+    assert changes["llm"]
+    assert {model_of(ix[name]) for name in changes["llm"]} <= set(FAST_MODELS.values())
+    assert validate_workflow(wf)[0] == []
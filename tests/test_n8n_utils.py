@@ -0,0 +1,92 @@
+import copy
+
+from n8n_utils import (bypass_node, execution_wall_ms, iter_executions, node_hashes, node_timings, percentile,
+                       predecessors, reachable, run_output, successors)
+
+
+def _wf():
+    """A -> B -> C, A -> D, C -> A (loop back) plus an ai_* sub-node M -> B."""
+    return {
+        "nodes": [{"name": n} for n in "ABCDM"],
+        "connections": {
+            "A": {"main": [[{"node": "B", "type": "main", "index": 0}, {"node": "D", "type": "main", "index": 0}]]},
+            "B": {"main": [[{"node": "C", "type": "main", "index": 0}]]},
+            "C": {"main": [[], [{"node": "A", "type": "main", "index": 0}]]},
+            "M": {"ai_languageModel": [[{"node": "B", "type": "ai_languageModel", "index": 0}]]},
+        },
+    }
+
+
+def test_successors_and_predecessors():
+    wf = _wf()
+    assert successors(wf) == {"A": ["B", "D"], "B": ["C"], "C": ["A"], "D": [], "M": []}
+    assert predecessors(wf) == {"A": ["C"], "B": ["A"], "C": ["B"], "D": ["A"], "M": []}
+    assert successors(wf, "ai_languageModel")["M"] == ["B"]
+
+
+def test_reachable_follows_loops_and_excludes_start():
+    succ = successors(_wf())
+    assert reachable("B", succ) == {"A", "C", "D"}
+    assert reachable("D", succ) == set()
+    assert reachable("D", predecessors(_wf())) == {"A", "B", "C"}
+
+
+def test_bypass_node_rewires_sources_to_targets():
+    wf = _wf()
+    bypass_node(wf, "B")
+    assert "B" not in {n["name"] for n in wf["nodes"]}
+    assert "B" not in wf["connections"]
+    assert successors(wf)["A"] == ["C", "D"]
+    assert predecessors(wf)["C"] == ["A"]
+
+
+def test_bypass_node_copies_targets():
+    wf = _wf()
+    wf["connections"]["D"] = {"main": [[{"node": "B", "type": "main", "index": 0}]]}
+    bypass_node(wf, "B")
+    a, d = wf["connections"]["A"]["main"][0], wf["connections"]["D"]["main"][0]
+    assert a[0] == d[0] == {"node": "C", "type": "main", "index": 0}
+    assert a[0] is not d[0]
+
+
+def test_node_timings(execution_2764):
+    timings = node_timings(execution_2764)
+    assert len(timings) == 81
+    assert sum(len(runs) for runs in timings.values()) == 161
+    assert timings["Pre-Draft Fact Checker"] == [57497, 50032]
+    assert timings["1st Scoring Agent3"] == [12873, 4870]
+
+
+def test_execution_wall_ms(execution_2764):
+    assert execution_wall_ms(execution_2764) == 1822440
+    stripped = copy.copy(execution_2764)
+    stripped.pop("stoppedAt")
+    assert execution_wall_ms(stripped) == 0
+
+
+def test_run_output(execution_2764):
+    body = run_output(execution_2764, "Webhook1")[0]["json"]["body"]
+    assert body["client_name"] == "Helping Hands Family"
+    assert run_output(execution_2764, "Webhook1", run=5) == []
+    assert run_output(execution_2764, "No Such Node") == []
+
+
+def test_percentile():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 5
+    assert percentile([7], 99) == 7
+
+
+def test_iter_executions(execution_2764):
+    assert list(iter_executions(execution_2764)) == [execution_2764]
+    assert list(iter_executions({"data": [execution_2764, {"id": "no run data"}]})) == [execution_2764]
+
+
+def test_node_hashes_ignore_position_and_id():
+    wf = {"nodes": [{"name": "A", "id": "1", "type": "t", "parameters": {"x": 1}, "position": [0, 0]}]}
+    moved = {"nodes": [{"name": "A", "id": "2", "type": "t", "parameters": {"x": 1}, "position": [9, 9]}]}
+    edited = {"nodes": [{"name": "A", "id": "1", "type": "t", "parameters": {"x": 2}, "position": [0, 0]}]}
+    assert node_hashes(wf)["A"][0] == node_hashes(moved)["A"][0]
+    assert node_hashes(wf)["A"][0] != node_hashes(edited)["A"][0]
+    assert node_hashes(moved)["A"][1] == [9, 9]
@@ -0,0 +1,35 @@
+import copy
+
+from n8n_utils import node_index
+from node_metrics import NodeMetricsStore, workflow_version
+
+NODE = "Pre-Draft Fact Checker"
+
+
+def test_ingest_and_regressions(execution_2764, tmp_path):
+    store = NodeMetricsStore(str(tmp_path / "metrics.sqlite"))
+    version, added = store.ingest(execution_2764, "execution_2764_full.json")
+    assert added > 0
+    assert store.ingest(execution_2764, "execution_2764_full.json") == (version, 0)
+    assert store.db.execute("SELECT COUNT(*) FROM node_runs").fetchone()[0] == added
+
+    slower = copy.deepcopy(execution_2764)
+    slower["id"] = "2765"
+    slower["startedAt"] = "2030-01-01T00:00:00.000Z"
+    node_index(slower["workflowData"])[NODE]["parameters"]["model"] = "sonar-reasoning-pro"
+    for run in slower["data"]["resultData"]["runData"][NODE]:
+        run["executionTime"] *= 3
+    new_version, _ = store.ingest(slower, "slower.json")
+    assert new_version != version
+
+    flagged = store.regressions()
+    assert [(old, new, node) for _, old, new, node, _, _ in flagged] == [(version, new_version, NODE)]
+
+
+def test_moving_a_node_keeps_the_version(execution_2764):
+    wf = copy.deepcopy(execution_2764["workflowData"])
+    version = workflow_version(wf)
+    node_index(wf)[NODE]["position"] = [12345, 678]
+    assert workflow_version(wf) == version
+    node_index(wf)[NODE]["disabled"] = True
+    assert workflow_version(wf) != version
@@ -0,0 +1,34 @@
+import os
+
+from conftest import ROOT
+from n8n_utils import load_workflow
+from parallelise_workflow import ANY_NODE, apply_rewrite, find_rewrite, node_dependencies
+
+
+def _code(js):
+    return {"parameters": {"jsCode": js}}
+
+
+def test_node_dependencies():
+    refs, paired, uses_input = node_dependencies(_code('const a = $("A").first().json; const b = $(\'B\').item.json;'))
+    assert refs == {"A", "B"}
+    assert paired == {"B"}
+    assert not uses_input
+
+    refs, paired, _ = node_dependencies(_code("for (const n of names) { $node[n].json; }"))
+    assert ANY_NODE in refs and ANY_NODE in paired
+
+
+def test_prod_rewrites_keep_paired_item_reads():
+    wf = load_workflow(os.path.join(ROOT, "PROD Skywide Content v23.json"))
+    moved = []
+    while True:
+        rewrite = find_rewrite(wf)
+        if not rewrite:
+            break
+        assert rewrite[4] is not None, "rewrites always join back in"
+        apply_rewrite(wf, rewrite)
+        moved.append(rewrite[2])
+    # "Update a document" reads $('Document Export Sanitization3').item
+    assert "Document Export Sanitization3" not in moved
+    assert "Startup Update" not in moved and "Keyword Validator" not in moved
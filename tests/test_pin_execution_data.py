@@ -0,0 +1,60 @@
+import os
+
+from conftest import ROOT
+from n8n_utils import CODE_TYPE, load_workflow
+from pin_execution_data import WHOLE, pin_outputs, pin_plan, pinned_fields, referenced_fields, trim
+
+START = "1st Scoring Agent2"
+
+
+def _pin(execution, wf):
+    run_data = execution["data"]["resultData"]["runData"]
+    pinned, skipped, downstream = pin_plan(wf, START, run_data)
+    fields, dynamic = pinned_fields(wf, pinned, downstream | set(skipped))
+    recorded = pin_outputs(execution, pinned, {name: {WHOLE} for name in pinned})
+    return pin_outputs(execution, pinned, fields), recorded, downstream, dynamic
+
+
+def _resolve(data, path):
+    """Follow a json path as far as JS would before reading a property of a leaf."""
+    for key in path:
+        if not isinstance(data, dict):
+            break
+        data = data.get(key)
+    return data
+
+
+def test_trim_keeps_leaf_when_path_runs_past_it():
+    data = {"message": {"content": "Final article", "role": "assistant"}, "other": 1}
+    assert trim(data, {("message", "content", "length")}) == {"message": {"content": "Final article"}}
+    assert trim(data, {("message", "content"), ("message",)}) == {"message": data["message"]}
+    assert trim(data, {("missing", "x")}) == {}
+
+
+def test_downstream_reads_survive_pinning(execution_2764):
+    wf = execution_2764["workflowData"]
+    pin_data, recorded, downstream, dynamic = _pin(execution_2764, wf)
+    assert not dynamic
+    checked = 0
+    for name, paths in referenced_fields(wf, downstream).items():
+        for path in paths - {WHOLE}:
+            for pinned, full in zip(pin_data.get(name, []), recorded.get(name, [])):
+                assert _resolve(pinned["json"], path) == _resolve(full["json"], path), (name, path)
+                checked += 1
+    assert checked
+
+
+def test_computed_node_names_pin_full_outputs(execution_2764):
+    # Send Test Result loops over $node[nodeName] for its tryNodes / scoringNodes
+    wf = load_workflow(os.path.join(ROOT, "TEST Skywide Content (Prompt Review).json"))
+    pin_data, recorded, _, dynamic = _pin(execution_2764, wf)
+    assert "Send Test Result" in dynamic
+    assert pin_data == recorded
+    # Its fallback article source and the Code node's input fields are intact
+    article = pin_data["Document Export Sanitization"][0]["json"]["message"]["content"]
+    assert isinstance(article, str) and len(article) > 100
+    code_readers = {n["name"] for n in wf["nodes"] if n["type"] == CODE_TYPE}
+    for name, paths in referenced_fields(wf, code_readers).items():
+        for path in paths - {WHOLE}:
+            for pinned, full in zip(pin_data.get(name, []), recorded.get(name, [])):
+                assert _resolve(pinned["json"], path) == _resolve(full["json"], path), (name, path)
@@ -0,0 +1,51 @@
+import copy
+import json
+
+from push_workflow import push_one, workflow_delta
+
+
+def test_delta_ignores_server_side_fields(execution_2764):
+    local = execution_2764["workflowData"]
+    remote = copy.deepcopy(local)
+    for node in remote["nodes"]:
+        node["id"] = "server-" + node["id"]
+        node["webhookId"] = "abc"
+    assert not any(workflow_delta(local, remote).values())
+
+    remote["nodes"][0]["parameters"] = dict(remote["nodes"][0]["parameters"], edited=True)
+    remote["nodes"][1]["position"] = [0, 0]
+    delta = workflow_delta(local, remote)
+    assert delta["changed"] == [local["nodes"][0]["name"]]
+    assert delta["moved"] == [local["nodes"][1]["name"]]
+
+
+class FakeApi:
+    def __init__(self, remote):
+        self.remote = remote
+        self.puts = []
+
+    def get(self, workflow_id):
+        return self.remote
+
+    def put(self, workflow_id, body):
+        self.puts.append(body)
+
+
+def test_runtime_flags_are_pushed(execution_2764, tmp_path):
+    remote = execution_2764["workflowData"]
+    name = remote["nodes"][0]["name"]
+    for field, value in (("disabled", True), ("retryOnFail", True)):
+        local = copy.deepcopy(remote)
+        local["nodes"][0][field] = value
+        path = tmp_path / f"{field}.json"
+        path.write_text(json.dumps(local), encoding="utf-8")
+        api = FakeApi(remote)
+        status, lines = push_one(api, str(path), "wf-1", dry_run=False)
+        assert status == "pushed", lines
+        assert f"  ~ {name}" in lines
+        assert api.puts[0]["nodes"][0][field] is True
+
+    # Notes alone are not a change
+    local = copy.deepcopy(remote)
+    local["nodes"][0]["notes"] = "checked"
+    assert not any(workflow_delta(local, remote).values())
@@ -0,0 +1,110 @@
+import copy
+import os
+import random
+import sys
+
+import pytest
+
+from apply_early_exit import apply_loop, early_exit_conditions, exit_nodes, loop_thresholds, main
+from conftest import ROOT
+from n8n_utils import load_workflow, node_index
+from score_iterations import analyze, improvement_loops, simulate
+
+PROD = os.path.join(ROOT, "PROD Skywide Content v23.json")
+
+
+@pytest.fixture(scope="module")
+def prod():
+    return load_workflow(PROD)
+
+
+def _loop(wf, check):
+    return next(loop for loop in improvement_loops(wf) if loop["check"] == check)
+
+
+def _execution(trace, loop):
+    """runData for one article: the 1st, 2nd and in-loop scorer runs in start-time order."""
+    run_data, clock = {}, 0
+    for k, score in enumerate(trace):
+        scorer = loop["scorers"][min(k, 2)]
+        clock += 60000
+        run_data.setdefault(scorer, []).append({
+            "startTime": clock, "executionTime": 20000,
+            "data": {"main": [[{"json": {"message": {"content": {"overallScore": round(score, 1)}}}}]]},
+        })
+        if k >= 2:
+            run_data.setdefault(loop["improvers"][0], []).append({"startTime": clock - 40000, "executionTime": 40000})
+    return {"data": {"resultData": {"runData": run_data}}}
+
+
+def _synthetic_traces(loop, count=60, seed=7):
+    """Start 55-80, diminishing noisy gains per pass, stopping at the target or after max_runs in-loop passes."""
+    rng = random.Random(seed)
+    traces = []
+    for _ in range(count):
+        trace = [rng.uniform(55, 80)]
+        while trace[-1] < loop["target"] and len(trace) < 2 + loop["max_runs"]:
+            trace.append(trace[-1] + rng.gauss(6 - 0.06 * (trace[-1] - 60), 2.5))
+        traces.append(trace)
+    return traces
+
+
+def test_synthetic_60_executions(prod):
+    loop = _loop(prod, "Check Max Iterations3")
+    traces = _synthetic_traces(loop)
+    model = analyze([_execution(t, loop) for t in traces], prod)["Check Max Iterations3"]
+    assert model["source"] == "data"
+    assert model["traces"] == 60
+    sim = model["simulated"]
+    assert sim["saved"] > 0
+    assert sim["false_exits"] / model["traces"] <= 0.05
+    assert model["iteration_ms"] == 60000
+
+
+def test_plateau_skips_the_first_improvement_pass(prod):
+    loop = _loop(prod, "Check Max Iterations3")
+    # Flat, then lower first pass; both still reach 73 in the loop
+    assert simulate([[60, 60, 75], [60, 58, 66, 74]], loop, 1.0, 100) == (5, 0, 0)
+    # A flat in-loop pass is a plateau
+    assert simulate([[60, 65, 65, 80]], loop, 1.0, 100) == (2, 1, 1)
+
+    plateau = early_exit_conditions(loop, 1.0, 5.0)[0]
+    assert plateau["id"] == "early_exit_plateau"
+    assert plateau["leftValue"].startswith("={{ $runIndex > 0 && ")
+
+
+def test_thresholds_need_data_or_both_flags():
+    assert loop_thresholds(None) is None
+    assert loop_thresholds({"source": "default", "min_gain": 1.0, "reach_gain": 5.0, "looped": 3}) is None
+    assert loop_thresholds(None, min_gain=1.0) is None
+    assert loop_thresholds(None, reach_gain=6.0) is None
+    assert loop_thresholds(None, 1.0, 6.0) == (1.0, 6.0, "given thresholds")
+    assert loop_thresholds(None, reach_gain=6.0, no_plateau=True) == (None, 6.0, "given thresholds")
+    model = {"source": "data", "min_gain": 0.5, "reach_gain": 7.2, "looped": 40}
+    assert loop_thresholds(model) == (0.5, 7.2, "40 looped article(s)")
+    assert loop_thresholds(model, reach_gain=9.0) == (0.5, 9.0, "40 looped article(s)")
+
+
+def test_prod_early_exits_end_the_path(prod):
+    wf = copy.deepcopy(prod)
+    for loop in improvement_loops(wf):
+        assert exit_nodes(wf, loop) == []
+        apply_loop(wf, loop, 1.0, 5.0, "note")
+        apply_loop(wf, loop, 1.0, 5.0, "note")
+        ids = [c["id"] for c in node_index(wf)[loop["check"]]["parameters"]["conditions"]["conditions"]]
+        assert ids.count("early_exit_plateau") == 1 and ids.count("early_exit_gap") == 1
+
+
+def test_dead_end_exits_are_refused(monkeypatch, tmp_path, capsys):
+    output = tmp_path / "early exit.json"
+    argv = ["apply_early_exit.py", PROD, "-o", str(output), "--no-plateau", "--reach-gain", "8"]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code == 1
+    assert "true output is empty" in capsys.readouterr().out
+    assert not output.exists()
+
+    monkeypatch.setattr(sys, "argv", argv + ["--allow-dead-end"])
+    main()
+    assert output.exists()
@@ -0,0 +1,85 @@
+import asyncio
+import urllib.parse
+from argparse import Namespace
+
+import watch_test_results
+
+
+class FakeTable:
+    """test_results behind the PostgREST filters the watcher uses."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def get(self, query):
+        self.queries.append(query)
+        params = dict(urllib.parse.parse_qsl(query))
+        rows = list(self.rows)
+        if "created_at" in params:
+            since = params["created_at"].removeprefix("gte.")
+            rows = [r for r in rows if r["created_at"] >= since]
+        for column in ("id", "request_id"):
+            if column in params:
+                wanted = params[column].removeprefix("in.(").removesuffix(")").split(",")
+                rows = [r for r in rows if r[column] in wanted]
+        if "status" in params:
+            rows = [r for r in rows if r["status"] != params["status"].removeprefix("neq.")]
+        rows.sort(key=lambda r: (r["created_at"], r["id"]))
+        return [dict(r) for r in rows[:int(params.get("limit", len(rows)))]]
+
+
+def _row(n, created_at, status="completed", request_id=None):
+    return {"id": f"id-{n:02d}", "request_id": request_id or f"req-{n:02d}", "path_id": 1, "status": status,
+            "score": 80, "article_title": "", "created_at": created_at}
+
+
+def _watcher(table, **kwargs):
+    watcher = watch_test_results.TestResultsWatcher("http://supabase.test", "key", batch_size=2,
+                                                    since="2026-01-01T00:00:00+00:00", **kwargs)
+    watcher._get = table.get
+    return watcher
+
+
+def test_cursor_pages_through_new_rows():
+    table = FakeTable([_row(n, f"2026-01-01T00:00:{n:02d}+00:00") for n in range(7)])
+    watcher = _watcher(table)
+    assert [r["id"] for r in watcher.poll()] == [f"id-{n:02d}" for n in range(7)]
+    assert watcher.cursor == "2026-01-01T00:00:06+00:00"
+    assert watcher.poll() == []
+
+    table.rows.append(_row(7, "2026-01-01T00:00:07+00:00"))
+    assert [r["id"] for r in watcher.poll()] == ["id-07"]
+
+
+def test_rows_sharing_one_created_at():
+    table = FakeTable([_row(n, "2026-01-01T00:00:05+00:00") for n in range(5)])
+    watcher = _watcher(table)
+    assert sorted(r["id"] for r in watcher.poll()) == [f"id-{n:02d}" for n in range(5)]
+    table.rows.append(_row(5, "2026-01-01T00:00:05+00:00"))
+    assert [r["id"] for r in watcher.poll()] == ["id-05"]
+    assert watcher.poll() == []
+
+
+def test_request_ids_exit_once_done(monkeypatch, capsys):
+    # Rows inserted before the watcher started, one still pending
+    table = FakeTable([_row(1, "2026-01-01T00:00:01+00:00"), _row(2, "2026-01-01T00:00:02+00:00", "pending"),
+                       _row(3, "2026-01-01T00:00:03+00:00")])
+    calls = []
+
+    def get(self, query):
+        calls.append(query)
+        if len(calls) > 2:
+            table.rows[1]["status"] = "completed"
+        return table.get(query)
+
+    monkeypatch.setenv("NEXT_PUBLIC_SUPABASE_URL", "http://supabase.test")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "key")
+    monkeypatch.setattr(watch_test_results.TestResultsWatcher, "_get", get)
+    args = Namespace(select=watch_test_results.DEFAULT_SELECT, batch_size=50, min_interval=0.01, max_interval=0.01,
+                     since=None, request_id=["req-01", "req-02"], until_idle=None)
+    asyncio.run(asyncio.wait_for(watch_test_results.run(args), timeout=5))
+    out = capsys.readouterr().out
+    assert f"from {watch_test_results.EPOCH}" in out
+    assert "req-01" in out and "req-02" in out and "req-03" not in out
+    assert "2 result(s)" in out
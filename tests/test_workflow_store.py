@@ -0,0 +1,45 @@
+import sys
+
+import pytest
+
+from workflow_store import WorkflowStore, main
+
+
+def test_execution_export_round_trips(execution_2764, tmp_path):
+    store = WorkflowStore(str(tmp_path / "store"))
+    version, _, _ = store.add(execution_2764, "execution_2764_full.json")
+    restored = WorkflowStore(str(tmp_path / "store")).checkout(version)
+    assert restored == execution_2764
+    assert list(restored) == list(execution_2764)
+    assert store.blame("Webhook1")[0][0]["version"] == version
+
+
+def test_workflow_dedupes_unchanged_nodes(execution_2764, tmp_path):
+    store = WorkflowStore(str(tmp_path / "store"))
+    wf = execution_2764["workflowData"]
+    store.add(wf, "v1")
+    edited = dict(wf, nodes=[dict(n, notes="edited") if n["name"] == "Webhook1" else n for n in wf["nodes"]])
+    _, new_objects, existed = store.add(edited, "v2")
+    assert not existed
+    assert new_objects == 1
+
+
+def test_nameless_node_is_refused(tmp_path):
+    store = WorkflowStore(str(tmp_path / "store"))
+    wf = {"name": "broken", "nodes": [{"id": "abc", "type": "n8n-nodes-base.set", "parameters": {}}],
+          "connections": {}}
+    with pytest.raises(ValueError, match="abc"):
+        store.add(wf, "broken.json")
+    assert store.index() == []
+
+
+def test_unknown_ref_exits_with_the_labels(execution_2764, tmp_path, monkeypatch, capsys):
+    store_dir = str(tmp_path / "store")
+    WorkflowStore(store_dir).add(execution_2764["workflowData"], "v1.json", "v23")
+    for command in (["checkout", "v99", "-o", str(tmp_path / "out.json")], ["diff", "v23", "nope"]):
+        monkeypatch.setattr(sys, "argv", ["workflow_store.py", "--store", store_dir, *command])
+        with pytest.raises(SystemExit) as exit_info:
+            main()
+        assert exit_info.value.code == 1
+        out = capsys.readouterr().out
+        assert "not found" in out and "Labels: v23" in out
@@ -0,0 +1,51 @@
+import sys
+
+import pytest
+
+import workflow_validator
+from n8n_utils import IF_TYPE, SET_TYPE
+from workflow_validator import validate_workflow
+
+
+def _loop(counter_value, check_left):
+    """Webhook -> Count -> Check; Check's false output loops back to Count."""
+    return {
+        "nodes": [
+            {"name": "Webhook", "type": "n8n-nodes-base.webhook", "parameters": {}},
+            {"name": "Count", "type": SET_TYPE, "parameters": {
+                "assignments": {"assignments": [{"name": "runs", "value": counter_value}]}}},
+            {"name": "Check", "type": IF_TYPE, "parameters": {
+                "conditions": {"conditions": [{"leftValue": check_left, "rightValue": 3}]}}},
+            {"name": "Done", "type": SET_TYPE, "parameters": {}},
+        ],
+        "connections": {
+            "Webhook": {"main": [[{"node": "Count", "type": "main", "index": 0}]]},
+            "Count": {"main": [[{"node": "Check", "type": "main", "index": 0}]]},
+            "Check": {"main": [[{"node": "Done", "type": "main", "index": 0}],
+                               [{"node": "Count", "type": "main", "index": 0}]]},
+        },
+    }
+
+
+def test_iteration_guards():
+    assert validate_workflow(_loop("={{ $runIndex }}", "={{ $json.runs }}"))[0] == []
+    assert validate_workflow(_loop("={{ ($json.runs || 0) + 1 }}", "={{ $json.runs }}"))[0] == []
+    # Words that merely look like counting don't guard anything
+    for value, left in [("retry later", "={{ $json.iterations }}"),
+                        ("={{ $json.runs }}", "={{ $json.runs }}"),
+                        ("={{ ($json.runs || 0) + 1 }}", "={{ $('Count').all().length }}")]:
+        errors, _ = validate_workflow(_loop(value, left))
+        assert errors == ["unguarded cycle through Check, Count"]
+
+
+def test_main_skips_unreadable_files(tmp_path, monkeypatch, capsys):
+    broken = tmp_path / "broken.json"
+    broken.write_text("", encoding="utf-8")
+    utf16 = tmp_path / "utf16.json"
+    utf16.write_text("{}", encoding="utf-16")
+    monkeypatch.setattr(sys, "argv", ["workflow_validator.py", str(broken), str(utf16)])
+    with pytest.raises(SystemExit) as exit_info:
+        workflow_validator.main()
+    assert exit_info.value.code == 0
+    out = capsys.readouterr().out
+    assert out.count("unreadable JSON") == 2
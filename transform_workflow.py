@@ -6,6 +6,8 @@ import json
 import uuid
 import sys
 
+from workflow_validator import check_workflow
+
 def gen_id():
     return str(uuid.uuid4())
 
@@ -235,6 +237,7 @@ def main():
     print("  + Error handling chain (3 nodes)")
 
     # ========== Write ==========
+    check_workflow(wf, filepath)
     with open(filepath, "w", encoding="utf-8") as f:
         json.dump(wf, f, indent=2, ensure_ascii=False)
 
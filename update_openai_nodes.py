@@ -1,5 +1,7 @@
 import json
 
+from workflow_validator import check_workflow
+
 file_path = r'c:\Users\A.hydar\Documents\production\Skywide-project-main\DEV Skywide  Content (TEST v23).json'
 
 target_node_names = [
@@ -43,6 +45,7 @@ try:
                 
                 updated_count += 1
 
+    check_workflow(data, file_path)
     with open(file_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
 
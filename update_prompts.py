@@ -1,5 +1,7 @@
 import json
 
+from workflow_validator import check_workflow
+
 input_file = "DEV Skywide  Content (21).json"
 output_file = "DEV Skywide  Content (22).json"
 
@@ -58,6 +60,7 @@ for node in workflow['nodes']:
 
 workflow['name'] = "DEV Skywide  Content (22)"
 
+check_workflow(workflow, output_file)
 with open(output_file, 'w', encoding='utf-8') as f:
     json.dump(workflow, f, indent=2)
 
@@ -0,0 +1,172 @@
+"""
+Cursor-based watcher for test_results.
+
+Instead of re-fetching `order=created_at.desc&limit=1` in a loop, the watcher
+keeps a created_at cursor and only asks for what changed:
+
+  new rows:       created_at=gte.<cursor>&order=created_at.asc,id.asc&limit=<batch>
+  finished rows:  id=in.(<pending ids>)&status=neq.pending
+
+both with a narrowed `select`. Rows are inserted as 'pending' by the A/B test
+modal and updated in place by /api/test-callback (there is no updated_at
+column), hence the second query for rows still being tracked. The cursor
+uses gte and skips ids already seen at the cursor timestamp, because rows
+inserted together share one created_at and `gt` would drop the rest of them
+at a batch boundary.
+
+Poll interval starts at --min-interval, grows x1.5 on every poll that finds
+nothing, and resets as soon as something changes.
+
+Reads NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY from the
+environment, like the Next.js API routes.
+
+Usage:
+  python watch_test_results.py                         # follow new results from now
+  python watch_test_results.py --since 2026-10-01T00:00:00Z --until-idle 600
+  python watch_test_results.py --request-id <uuid> --request-id <uuid>   # exits once both are done
+"""
+import argparse
+import asyncio
+import json
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime, timezone
+
+from n8n_utils import supabase_credentials
+
+DEFAULT_SELECT = "id,request_id,path_id,article_title,status,score,created_at"
+PENDING = "pending"
+EPOCH = "1970-01-01T00:00:00+00:00"
+IN_CHUNK = 100  # ids per id=in.(...) request, keeps URLs short
+
+
+class TestResultsWatcher:
+    def __init__(self, base_url=None, api_key=None, select=DEFAULT_SELECT, batch_size=50,
+                 min_interval=2.0, max_interval=30.0, since=None, request_ids=None):
+        columns = set(select.split(","))
+        # The watcher itself needs these to advance the cursor and track rows
+        self.select = ",".join(dict.fromkeys(select.split(",") + [c for c in ("id", "status", "created_at")
+                                                                   if c not in columns]))
+        if not (base_url and api_key):
+            base_url, api_key = supabase_credentials()
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        # Tracked request ids may already have rows, so their cursor starts at the beginning
+        self.cursor = since or (EPOCH if request_ids else datetime.now(timezone.utc).isoformat())
+        self.seen_at_cursor = set()
+        self.request_ids = set(request_ids or [])
+        self.pending = {}
+        self.requests_made = 0
+
+    def _get(self, query):
+        req = urllib.request.Request(f"{self.base_url}/rest/v1/test_results?{query}")
+        req.add_header("apikey", self.api_key)
+        req.add_header("Authorization", f"Bearer {self.api_key}")
+        self.requests_made += 1
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return json.loads(response.read().decode())
+
+    def _fetch_new(self):
+        """All rows created since the cursor, a batch at a time."""
+        rows = []
+        while True:
+            # Over-fetch by the rows already seen at the cursor so ties can't stall paging
+            limit = self.batch_size + len(self.seen_at_cursor)
+            query = (f"select={self.select}&created_at=gte.{urllib.parse.quote(self.cursor)}"
+                     f"&order=created_at.asc,id.asc&limit={limit}")
+            if self.request_ids:
+                query += f"&request_id=in.({','.join(sorted(self.request_ids))})"
+            batch = self._get(query)
+            fresh = [r for r in batch if r["id"] not in self.seen_at_cursor]
+            for row in fresh:
+                if row["created_at"] != self.cursor:
+                    self.cursor, self.seen_at_cursor = row["created_at"], set()
+                self.seen_at_cursor.add(row["id"])
+            rows.extend(fresh)
+            if len(batch) < limit or not fresh:
+                return rows
+
+    def _fetch_finished(self):
+        """Tracked rows that have left 'pending' since the last poll."""
+        ids = sorted(self.pending)
+        rows = []
+        for i in range(0, len(ids), IN_CHUNK):
+            chunk = ",".join(ids[i:i + IN_CHUNK])
+            rows.extend(self._get(f"select={self.select}&id=in.({chunk})&status=neq.{PENDING}"))
+        return rows
+
+    def poll(self):
+        """One watch cycle: returns rows that reached a final status."""
+        done = []
+        for row in self._fetch_new():
+            if row.get("status") == PENDING:
+                self.pending[row["id"]] = row
+            else:
+                done.append(row)
+        if self.pending:
+            for row in self._fetch_finished():
+                self.pending.pop(row["id"], None)
+                done.append(row)
+        return done
+
+    async def watch(self, until_idle=None):
+        """Yield each test result once it is no longer pending."""
+        interval = self.min_interval
+        idle_since = time.monotonic()
+        tracked = len(self.pending)
+        while True:
+            done = await asyncio.to_thread(self.poll)
+            for row in done:
+                yield row
+            if done or len(self.pending) != tracked:
+                interval = self.min_interval
+                idle_since = time.monotonic()
+            else:
+                interval = min(interval * 1.5, self.max_interval)
+            tracked = len(self.pending)
+            if until_idle is not None and not self.pending and time.monotonic() - idle_since >= until_idle:
+                return
+            await asyncio.sleep(interval)
+
+
+async def run(args):
+    watcher = TestResultsWatcher(select=args.select, batch_size=args.batch_size,
+                                 min_interval=args.min_interval, max_interval=args.max_interval,
+                                 since=args.since, request_ids=args.request_id)
+    print(f"Watching test_results from {watcher.cursor} (select={watcher.select})")
+    started = time.monotonic()
+    finished, finished_ids = 0, set()
+    async for row in watcher.watch(until_idle=args.until_idle):
+        finished += 1
+        finished_ids.add(row.get("request_id"))
+        icon = "✅" if row.get("status") == "completed" else "❌"
+        print(f"{icon} {row.get('request_id')} [{row.get('path_id')}] {row.get('status')} "
+              f"score={row.get('score')} {row.get('article_title') or ''}")
+        if args.request_id and finished_ids >= set(args.request_id) and not watcher.pending:
+            break
+    print(f"\n{finished} result(s) in {time.monotonic() - started:.0f}s using {watcher.requests_made} request(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", help="ISO timestamp to start the cursor at "
+                                        "(default: now, or the epoch with --request-id)")
+    parser.add_argument("--request-id", action="append", help="Only track these request ids (repeatable)")
+    parser.add_argument("--select", default=DEFAULT_SELECT, help="Columns to fetch")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--min-interval", type=float, default=2.0)
+    parser.add_argument("--max-interval", type=float, default=30.0)
+    parser.add_argument("--until-idle", type=float, help="Stop after this many seconds with nothing pending or new")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Deduplicating version store for workflow snapshots.
+
+Instead of full copies (DEV Skywide Content.BACKUP*.json, the numbered
+(20)-(23) series, PROD v23 / v23_version2 ...), each distinct node body is
+stored once, keyed by the sha256 of its canonical JSON. A version is a small
+manifest: the node hashes in order, their canvas positions (kept out of the
+body so moving a node doesn't duplicate it) and one object holding
+everything else (connections, settings, pinData...).
+
+Most versions of a node differ by a prompt edit, so bodies are grouped by
+node name and xz-compressed together in 16 pack files: successive versions
+of a prompt compress against each other, which is where most of the saving
+over full copies comes from.
+
+  .workflow_store/packs/<0-f>.xz         node bodies / rest objects by node name
+  .workflow_store/versions/<id>.json     manifests
+  .workflow_store/index.json             versions in the order they were added
+
+Execution exports are stored whole: their workflowData is deduplicated like
+any workflow and the rest of the export (runData, timings...) is stored as
+one more object, so checkout gives back the full export. Files that aren't
+workflows (e.g. backup_real.json, a database dump) are stored as a single
+compressed object. A workflow with a nameless node is refused: bodies are
+grouped, diffed and blamed by node name.
+
+Usage:
+  python workflow_store.py add "PROD Skywide Content v23.json" "PROD Skywide Content v23_version2.json" --label v23
+  python workflow_store.py list
+  python workflow_store.py checkout <version> -o restored.json
+  python workflow_store.py diff <version> <version>
+  python workflow_store.py blame "Keyword Strategist"
+  python workflow_store.py stats
+"""
+import argparse
+import hashlib
+import json
+import lzma
+import os
+import sys
+from datetime import datetime, timezone
+
+from n8n_utils import save_workflow
+
+STORE_DIR = ".workflow_store"
+PACK_PREFIX = 1  # hex chars of the family hash -> 16 pack files
+REST_FAMILY = "__rest__"
+BLOB_FAMILY = "__blob__"
+EXECUTION_FAMILY = "__execution__"
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class WorkflowStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.packs_dir = os.path.join(root, "packs")
+        self._packs, self._dirty = {}, set()
+        self.versions = os.path.join(root, "versions")
+        self.index_path = os.path.join(root, "index.json")
+
+    # ---- objects ----
+
+    def _pack_path(self, family):
+        bucket = hashlib.sha1(family.encode("utf-8")).hexdigest()[:PACK_PREFIX]
+        return os.path.join(self.packs_dir, f"{bucket}.xz")
+
+    def _pack(self, family):
+        path = self._pack_path(family)
+        if path not in self._packs:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    self._packs[path] = json.loads(lzma.decompress(f.read()).decode("utf-8"))
+            else:
+                self._packs[path] = {}
+        return path, self._packs[path]
+
+    def put_object(self, value, family):
+        """Store a JSON value once under its family (node name); returns its hash."""
+        digest = hashlib.sha256(_canonical(value).encode("utf-8")).hexdigest()
+        path, pack = self._pack(family)
+        bodies = pack.setdefault(family, {})
+        if digest not in bodies:
+            # Original key order is kept in the stored body, only the hash is canonical
+            bodies[digest] = value
+            self._dirty.add(path)
+        return digest
+
+    def get_object(self, digest, family):
+        return self._pack(family)[1][family][digest]
+
+    def flush(self):
+        os.makedirs(self.packs_dir, exist_ok=True)
+        for path in self._dirty:
+            data = json.dumps(self._packs[path], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            with open(path + ".tmp", "wb") as f:
+                f.write(lzma.compress(data, preset=6))
+            os.replace(path + ".tmp", path)
+        self._dirty.clear()
+
+    # ---- versions ----
+
+    def index(self):
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_index(self, entries):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+
+    def _put_workflow(self, wf):
+        """Store a workflow's node bodies and remainder; returns (nodes, rest hash)."""
+        unnamed = [node.get("id") or f"#{i}" for i, node in enumerate(wf["nodes"])
+                   if not isinstance(node.get("name"), str) or not node["name"]]
+        if unnamed:
+            raise ValueError(f"node(s) without a name: {', '.join(map(str, unnamed))}")
+        nodes = []
+        for node in wf["nodes"]:
+            # Position is a placeholder here so key order survives checkout
+            body = {k: (None if k == "position" else v) for k, v in node.items()}
+            nodes.append([node["name"], self.put_object(body, node["name"]), node.get("position")])
+        # Everything but the nodes, with a placeholder so key order survives checkout
+        rest = self.put_object({k: (None if k == "nodes" else v) for k, v in wf.items()}, REST_FAMILY)
+        return nodes, rest
+
+    def add(self, data, source, label=None, flush=True):
+        """Record a snapshot. Returns (version id, new objects written, already stored).
+
+        Raises ValueError for a workflow with a nameless node; nothing is recorded.
+        """
+        before = self.object_count()
+        if isinstance(data, dict) and isinstance(data.get("workflowData"), dict) and "nodes" not in data \
+                and isinstance(data["workflowData"].get("nodes"), list):
+            nodes, rest = self._put_workflow(data["workflowData"])
+            execution = self.put_object({k: (None if k == "workflowData" else v) for k, v in data.items()},
+                                        EXECUTION_FAMILY)
+            manifest = {"kind": "execution", "name": data["workflowData"].get("name"), "nodes": nodes,
+                        "rest": rest, "execution": execution}
+        elif isinstance(data, dict) and isinstance(data.get("nodes"), list):
+            nodes, rest = self._put_workflow(data)
+            manifest = {"kind": "workflow", "name": data.get("name"), "nodes": nodes, "rest": rest}
+        else:
+            manifest = {"kind": "blob", "name": None, "nodes": [], "rest": self.put_object(data, BLOB_FAMILY)}
+
+        version = hashlib.sha256(_canonical(manifest).encode("utf-8")).hexdigest()[:12]
+        entries = self.index()
+        existing = next((e for e in entries if e["version"] == version), None)
+        if existing is None:
+            os.makedirs(self.versions, exist_ok=True)
+            with open(os.path.join(self.versions, f"{version}.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            entries.append({
+                "version": version,
+                "source": source,
+                "label": label,
+                "name": manifest["name"],
+                "nodes": len(manifest["nodes"]),
+                "bytes": len(json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")),
+                "added": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            })
+            self._write_index(entries)
+        if flush:
+            self.flush()
+        return version, self.object_count() - before, existing is not None
+
+    def resolve(self, ref):
+        """Version id (or unique prefix), label or source path -> index entry."""
+        entries = self.index()
+        exact = [e for e in entries if ref in (e["version"], e["label"], e["source"])]
+        if exact:
+            # A label or path added more than once means its latest version
+            return exact[-1]
+        matches = [e for e in entries if e["version"].startswith(ref)]
+        if len(matches) != 1:
+            raise KeyError(f"'{ref}' matches {len(matches)} versions")
+        return matches[0]
+
+    def manifest(self, version):
+        with open(os.path.join(self.versions, f"{version}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def checkout(self, version):
+        manifest = self.manifest(version)
+        if manifest["kind"] == "blob":
+            return self.get_object(manifest["rest"], BLOB_FAMILY)
+        if manifest["kind"] == "execution":
+            export = dict(self.get_object(manifest["execution"], EXECUTION_FAMILY))
+            export["workflowData"] = self._checkout_workflow(manifest)
+            return export
+        return self._checkout_workflow(manifest)
+
+    def _checkout_workflow(self, manifest):
+        # Copies: the pack cache must not pick up the restored positions
+        rest = dict(self.get_object(manifest["rest"], REST_FAMILY))
+        nodes = []
+        for name, digest, position in manifest["nodes"]:
+            node = dict(self.get_object(digest, name))
+            if "position" in node:
+                node["position"] = position
+            nodes.append(node)
+        rest["nodes"] = nodes
+        return rest
+
+    def blame(self, node_name):
+        """[(entry, hash)] for each version where the node's body changed (None = removed)."""
+        history, last = [], object()
+        for entry in self.index():
+            manifest = self.manifest(entry["version"])
+            if manifest["kind"] == "blob":
+                continue
+            bodies = {name: digest for name, digest, _ in manifest["nodes"]}
+            digest = bodies.get(node_name)
+            if digest != last and (digest is not None or history):
+                history.append((entry, digest))
+            last = digest
+        return history
+
+    def object_count(self):
+        """Distinct stored objects (loads every pack)."""
+        if os.path.isdir(self.packs_dir):
+            for name in os.listdir(self.packs_dir):
+                path = os.path.join(self.packs_dir, name)
+                if name.endswith(".xz") and path not in self._packs:
+                    with open(path, "rb") as f:
+                        self._packs[path] = json.loads(lzma.decompress(f.read()).decode("utf-8"))
+        return sum(len(bodies) for pack in self._packs.values() for bodies in pack.values())
+
+    def disk_bytes(self):
+        total = 0
+        for folder, _, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(folder, f)) for f in files)
+        return total
+
+
+def _label(entry):
+    return f"{entry['version']} {entry['label'] or ''} ({entry['source']})".replace("  ", " ")
+
+
+def _resolve(store, ref):
+    try:
+        return store.resolve(ref)
+    except KeyError:
+        labels = sorted({e["label"] for e in store.index() if e["label"]})
+        print(f"❌ Version or label '{ref}' not found in the store")
+        print(f"   Labels: {', '.join(labels) if labels else '(none)'}; see `list` for version ids")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", default=STORE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Record snapshot file(s)")
+    add.add_argument("files", nargs="+")
+    add.add_argument("--label")
+    sub.add_parser("list", help="List versions")
+    checkout = sub.add_parser("checkout", help="Write a version back out as a full workflow file")
+    checkout.add_argument("version")
+    checkout.add_argument("-o", "--output", required=True)
+    diff = sub.add_parser("diff", help="Nodes added, removed and changed between two versions")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    blame = sub.add_parser("blame", help="Versions in which a node changed")
+    blame.add_argument("node")
+    sub.add_parser("stats", help="Snapshot bytes vs store bytes")
+    args = parser.parse_args()
+    store = WorkflowStore(args.store)
+
+    if args.command == "add":
+        for path in args.files:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            try:
+                version, new_objects, existed = store.add(data, path, args.label, flush=False)
+            except ValueError as e:
+                print(f"  ❌ {path}: {e}, not stored")
+                continue
+            if existed:
+                print(f"  = {path}: identical to version {version}")
+            else:
+                print(f"  + {path}: version {version}, {new_objects} new object(s)")
+        store.flush()
+    elif args.command == "list":
+        for entry in store.index():
+            print(f"{entry['version']}  {entry['added']}  {entry['nodes']:>4} nodes  "
+                  f"{entry['bytes'] / 1024:>7.0f}KB  {entry['label'] or '-':<12} {entry['source']}")
+    elif args.command == "checkout":
+        entry = _resolve(store, args.version)
+        data = store.checkout(entry["version"])
+        if isinstance(data, dict) and "nodes" in data:
+            # History is restored as it was, even if it wouldn't pass today's validator
+            save_workflow(data, args.output, validate=False)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"✅ {_label(entry)} -> {args.output}")
+    elif args.command == "diff":
+        old, new = (store.manifest(_resolve(store, r)["version"])["nodes"] for r in (args.old, args.new))
+        old_map = {name: digest for name, digest, _ in old}
+        new_map = {name: digest for name, digest, _ in new}
+        for name in sorted(set(old_map) | set(new_map)):
+            if name not in new_map:
+                print(f"  - {name}")
+            elif name not in old_map:
+                print(f"  + {name}")
+            elif old_map[name] != new_map[name]:
+                print(f"  ~ {name}")
+    elif args.command == "blame":
+        history = store.blame(args.node)
+        if not history:
+            print(f"'{args.node}' is not in any stored version")
+            sys.exit(1)
+        for entry, digest in history:
+            change = "removed" if digest is None else f"body {digest[:12]}"
+            print(f"  {_label(entry)}: {change}")
+    else:
+        entries = store.index()
+        raw = sum(e["bytes"] for e in entries)
+        stored = store.disk_bytes()
+        print(f"{len(entries)} version(s), {store.object_count()} object(s)")
+        print(f"Snapshots: {raw / 1024 / 1024:.1f}MB as full copies, {stored / 1024 / 1024:.2f}MB in {args.store}"
+              + (f" ({raw / stored:.0f}x smaller)" if stored else ""))
+
+
+if __name__ == "__main__":
+    main()
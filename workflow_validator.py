@@ -0,0 +1,198 @@
+"""
+Structural validator for n8n workflow graphs.
+
+One pass over the indexed graph (O(nodes + edges)), a few milliseconds per
+workflow. It runs before every write made through n8n_utils.save_workflow
+and the Python writer scripts that call check_workflow. The JS writers
+(fix_pipeline.js, patch_models.js, modify_n8n.js, ...) don't call it: run
+this script on their output before importing it into n8n.
+
+Errors (the write is refused):
+  - duplicate node names
+  - connections from or to nodes that don't exist
+  - cycles with no iteration guard: a node in the loop reading $runIndex
+    (improvement and backoff loops), or a `($json.x || 0) + 1` counter that
+    an IF in the same loop compares (QA loops' retryCount / runs)
+
+Warnings (printed, write goes ahead):
+  - nodes no trigger can reach
+  - IF nodes with a missing or unconnected true/false branch
+
+Usage:
+  python workflow_validator.py "PROD Skywide Content v23.json" [more.json ...]
+  python workflow_validator.py *.json      # files that aren't workflows are skipped
+"""
+import json
+import re
+import sys
+import time
+
+from n8n_utils import IF_TYPE, load_workflow
+
+STICKY_TYPE = "n8n-nodes-base.stickyNote"
+TRIGGER_TYPES = {"n8n-nodes-base.webhook", "n8n-nodes-base.errorTrigger", "n8n-nodes-base.executeWorkflowTrigger"}
+
+# A loop is intended when something in it counts its passes (or it is a batch loop)
+RUN_INDEX = re.compile(r"\$runIndex\b")
+COUNTER_INCREMENT = re.compile(r"\(\s*\$json\.(\w+)\s*\|\|\s*0\s*\)\s*\+\s*1")
+LOOP_TYPES = {"n8n-nodes-base.splitInBatches"}
+BRANCH_TYPES = {IF_TYPE, "n8n-nodes-base.switch", "n8n-nodes-base.filter"}
+
+
+class WorkflowValidationError(ValueError):
+    pass
+
+
+def _is_trigger(node):
+    return node["type"] in TRIGGER_TYPES or node["type"].lower().endswith("trigger")
+
+
+def _cycles(names, succ):
+    """Strongly connected components that contain a cycle (iterative Tarjan)."""
+    index, low, on_stack, stack = {}, {}, set(), []
+    found, counter = [], 0
+    for root in names:
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            name, i = work.pop()
+            if i == 0:
+                index[name] = low[name] = counter
+                counter += 1
+                stack.append(name)
+                on_stack.add(name)
+            targets = succ.get(name, [])
+            if i < len(targets):
+                work.append((name, i + 1))
+                nxt = targets[i]
+                if nxt not in index:
+                    work.append((nxt, 0))
+                elif nxt in on_stack:
+                    low[name] = min(low[name], index[nxt])
+                continue
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[name])
+            if low[name] == index[name]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == name:
+                        break
+                if len(component) > 1 or name in targets:
+                    found.append(component)
+    return found
+
+
+def _guarded(component, by_name):
+    """True if the loop counts its passes and something in it can stop on the count."""
+    texts = {n: json.dumps(by_name[n].get("parameters", {})) for n in component}
+    if any(by_name[n]["type"] in LOOP_TYPES or RUN_INDEX.search(texts[n]) for n in component):
+        return True
+    counters = {field for n in component for field in COUNTER_INCREMENT.findall(texts[n])}
+    return any(by_name[n]["type"] in BRANCH_TYPES and re.search(rf"json\.{field}\b", texts[n])
+               for n in component for field in counters)
+
+
+def validate_workflow(wf):
+    """Return (errors, warnings) as lists of messages."""
+    errors, warnings = [], []
+    nodes = [n for n in wf.get("nodes", []) if n.get("type") != STICKY_TYPE]
+    by_name = {}
+    for node in nodes:
+        if node["name"] in by_name:
+            errors.append(f"duplicate node name '{node['name']}'")
+        by_name[node["name"]] = node
+
+    succ = {name: [] for name in by_name}
+    if_outputs = {}
+    for source, outputs in (wf.get("connections") or {}).items():
+        if source not in by_name:
+            errors.append(f"connections from missing node '{source}'")
+            continue
+        for conn_type, groups in (outputs or {}).items():
+            for idx, targets in enumerate(groups or []):
+                for t in targets or []:
+                    if t.get("node") not in by_name:
+                        errors.append(f"'{source}' {conn_type}[{idx}] -> missing node '{t.get('node')}'")
+                        continue
+                    if conn_type == "main":
+                        succ[source].append(t["node"])
+                if conn_type == "main" and by_name[source]["type"] == IF_TYPE and targets:
+                    if_outputs.setdefault(source, set()).add(idx)
+
+    for name, node in by_name.items():
+        if node["type"] == IF_TYPE:
+            missing = {0, 1} - if_outputs.get(name, set())
+            if missing:
+                branches = " and ".join("true" if i == 0 else "false" for i in sorted(missing))
+                warnings.append(f"IF '{name}' has no {branches} branch")
+
+    # Reachability from triggers, with sub-nodes reached through their root
+    roots = [name for name, node in by_name.items() if _is_trigger(node)]
+    seen, stack = set(roots), list(roots)
+    while stack:
+        for nxt in succ[stack.pop()]:
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    ai_targets = {}
+    for source, outputs in (wf.get("connections") or {}).items():
+        for conn_type, groups in (outputs or {}).items():
+            if conn_type != "main" and source in by_name:
+                ai_targets.setdefault(source, []).extend(
+                    t["node"] for targets in groups or [] for t in targets or [] if t.get("node") in by_name)
+    for name in by_name:
+        if name not in seen and not any(t in seen for t in ai_targets.get(name, [])):
+            warnings.append(f"'{name}' is unreachable from any trigger")
+
+    for component in _cycles(list(by_name), succ):
+        if not _guarded(component, by_name):
+            errors.append(f"unguarded cycle through {', '.join(sorted(component))}")
+    return errors, warnings
+
+
+def check_workflow(wf, label="workflow"):
+    """Validate before a write: print warnings, raise WorkflowValidationError on errors."""
+    errors, warnings = validate_workflow(wf)
+    for msg in warnings:
+        print(f"  WARNING ({label}): {msg}")
+    if errors:
+        for msg in errors:
+            print(f"  ❌ ({label}): {msg}")
+        raise WorkflowValidationError(f"{label}: {len(errors)} structural error(s), not written")
+    return warnings
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    failed = False
+    for path in sys.argv[1:]:
+        try:
+            wf = load_workflow(path)
+        except (OSError, ValueError) as e:
+            print(f"- {path}: unreadable JSON ({e}), skipped")
+            continue
+        if not isinstance(wf, dict) or "nodes" not in wf:
+            print(f"- {path}: not a workflow, skipped")
+            continue
+        start = time.perf_counter()
+        errors, warnings = validate_workflow(wf)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{'❌' if errors else '✅'} {path}: {len(wf.get('nodes', []))} nodes, "
+              f"{len(errors)} error(s), {len(warnings)} warning(s) in {elapsed:.1f}ms")
+        for msg in errors:
+            print(f"  ❌ {msg}")
+        for msg in warnings:
+            print(f"  WARNING: {msg}")
+        failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()